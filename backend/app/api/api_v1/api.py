@@ -1,13 +1,20 @@
 from fastapi import APIRouter
-from app.api.api_v1.endpoints import auth, products, orders, users, reviews, newsletter, contact, admin
+from app.api.api_v1.endpoints import auth, products, orders, users, reviews, newsletter, contact, admin, images, recommendations, webhooks, cart, discounts, wishlist, recently_viewed
 
 api_router = APIRouter()
 
 api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
 api_router.include_router(products.router, prefix="/products", tags=["products"])
 api_router.include_router(orders.router, prefix="/orders", tags=["orders"])
+api_router.include_router(cart.router, prefix="/cart", tags=["cart"])
+api_router.include_router(discounts.router, prefix="/discounts", tags=["discounts"])
+api_router.include_router(wishlist.router, prefix="/wishlist", tags=["wishlist"])
+api_router.include_router(recently_viewed.router, prefix="/recently-viewed", tags=["recently viewed"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(reviews.router, prefix="/reviews", tags=["reviews"])
 api_router.include_router(newsletter.router, prefix="/newsletter", tags=["newsletter"])
 api_router.include_router(contact.router, prefix="/contact", tags=["contact"])
 api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
+api_router.include_router(images.router, prefix="/images", tags=["images"])
+api_router.include_router(recommendations.router, prefix="/recommendations", tags=["recommendations"])
+api_router.include_router(webhooks.router, prefix="/webhooks", tags=["webhooks"])
@@ -6,6 +6,9 @@ from app.core.database import get_db
 from app.models.product import Product
 from app.models.order import Order
 from app.models.user import User
+from app.services import order_events, webhooks
+from app.services.scoring import recompute_product_scores
+from app.api.api_v1.endpoints.auth import get_current_admin
 
 router = APIRouter()
 
@@ -188,6 +191,12 @@ async def toggle_product_featured(
         "is_featured": product.is_featured
     }
 
+@router.post("/products/scores")
+async def recompute_scores(current_user: User = Depends(get_current_admin)):
+    """Recompute trending scores and the bestseller / new-arrival flags now"""
+    result = await recompute_product_scores()
+    return {"message": "Product scores recomputed", **result}
+
 @router.put("/orders/{order_id}/status")
 async def update_order_status(
     order_id: int,
@@ -202,7 +211,15 @@ async def update_order_status(
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
+    previous_status = order.status
     order.status = status_data.get("status")
+    webhooks.emit(db, webhooks.ORDER_STATUS_CHANGED, {
+        "order_id": order.id,
+        "order_number": order.order_number,
+        "previous_status": previous_status,
+        "status": order.status,
+    })
+    await order_events.broker.publish(db, order_events.order_status_event(order, previous_status))
     await db.commit()
     
     return {
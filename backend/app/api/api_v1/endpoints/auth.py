@@ -1,15 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from typing import Optional
 from datetime import timedelta
 from app.core.database import get_db
 from app.models.user import User
 from app.schemas.auth import UserRegister, UserResponse, Token
 from app.core.security import verify_password, get_password_hash, create_access_token, verify_token
+from app.services import cart as cart_service
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login", auto_error=False)
 
 
 async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
@@ -34,6 +37,28 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
     return user
 
 
+async def get_optional_user(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> Optional[User]:
+    """Authenticated user if a valid token was sent, otherwise None (guest)"""
+    email = verify_token(token) if token else None
+    if email is None:
+        return None
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalar_one_or_none()
+
+
+async def get_current_admin(current_user: User = Depends(get_current_user)):
+    """Require an authenticated admin user"""
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+    return current_user
+
+
 @router.post("/register", response_model=UserResponse)
 async def register(user_data: UserRegister, db: AsyncSession = Depends(get_db)):
     """Register a new user"""
@@ -66,8 +91,12 @@ async def register(user_data: UserRegister, db: AsyncSession = Depends(get_db)):
 
 
 @router.post("/login", response_model=Token)
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
-    """Login user and return access token"""
+async def login(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    cart_token: Optional[str] = Header(None, alias="X-Cart-Token"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Login user and return access token; a guest cart sent along is merged into the user's cart"""
     # Get user by email
     query = select(User).where(User.email == form_data.username)
     result = await db.execute(query)
@@ -86,6 +115,10 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSessi
             detail="Inactive user"
         )
     
+    if cart_token:
+        await cart_service.merge_guest_cart(db, user, cart_token)
+        await db.commit()
+    
     access_token_expires = timedelta(minutes=30)
     access_token = create_access_token(
         data={"sub": user.email}, expires_delta=access_token_expires
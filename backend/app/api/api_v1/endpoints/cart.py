@@ -0,0 +1,85 @@
+from fastapi import APIRouter, Depends, Header, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import Optional
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.serialization import fast_response
+from app.models.product import Product
+from app.models.user import User
+from app.schemas.cart import CartItemUpdate, CartResponse
+from app.services import cart as cart_service
+from app.api.api_v1.endpoints.auth import get_optional_user
+
+router = APIRouter()
+
+CART_TOKEN_HEADER = "X-Cart-Token"
+
+
+@router.get("/", response_model=CartResponse)
+async def get_cart(
+    cart_token: Optional[str] = Header(None, alias=CART_TOKEN_HEADER),
+    db: AsyncSession = Depends(get_db),
+    current_user: Optional[User] = Depends(get_optional_user)
+):
+    """Current cart, repriced and checked against stock"""
+    cart = await cart_service.get_cart(db, current_user, cart_token)
+    data = await cart_service.revalidate(db, cart)
+    await db.commit()
+    return fast_response(CartResponse, data)
+
+
+@router.put("/items/{product_id}", response_model=CartResponse)
+async def set_cart_item(
+    product_id: int,
+    item: CartItemUpdate,
+    cart_token: Optional[str] = Header(None, alias=CART_TOKEN_HEADER),
+    db: AsyncSession = Depends(get_db),
+    current_user: Optional[User] = Depends(get_optional_user)
+):
+    """Set the quantity of a product in the cart; guests get a cart token on their first call"""
+    cart = await cart_service.get_or_create_cart(db, current_user, cart_token)
+    if item.quantity > 0:
+        price = await db.scalar(select(Product.price).where(Product.id == product_id, Product.is_active == True))
+        if price is None:
+            raise HTTPException(status_code=404, detail="Product not found")
+        is_new_line = all(line[0] != product_id for line in cart.items)
+        if is_new_line and len(cart.items) >= settings.CART_MAX_LINES:
+            raise HTTPException(status_code=400, detail=f"A cart holds at most {settings.CART_MAX_LINES} products")
+        cart_service.set_quantity(cart, current_user, product_id, item.quantity, price if is_new_line else None)
+    else:
+        cart_service.set_quantity(cart, current_user, product_id, 0)
+    await db.commit()
+    data = await cart_service.revalidate(db, cart)
+    return fast_response(CartResponse, data, headers={CART_TOKEN_HEADER: cart.token})
+
+
+@router.delete("/items/{product_id}", response_model=CartResponse)
+async def remove_cart_item(
+    product_id: int,
+    cart_token: Optional[str] = Header(None, alias=CART_TOKEN_HEADER),
+    db: AsyncSession = Depends(get_db),
+    current_user: Optional[User] = Depends(get_optional_user)
+):
+    """Remove a product from the cart"""
+    cart = await cart_service.get_cart(db, current_user, cart_token)
+    if cart is None:
+        raise HTTPException(status_code=404, detail="Cart not found")
+    cart_service.set_quantity(cart, current_user, product_id, 0)
+    await db.commit()
+    return fast_response(CartResponse, await cart_service.revalidate(db, cart))
+
+
+@router.delete("/")
+async def clear_cart(
+    cart_token: Optional[str] = Header(None, alias=CART_TOKEN_HEADER),
+    db: AsyncSession = Depends(get_db),
+    current_user: Optional[User] = Depends(get_optional_user)
+):
+    """Empty the cart"""
+    cart = await cart_service.get_cart(db, current_user, cart_token)
+    if cart is not None:
+        await db.delete(cart)
+    await db.commit()
+    return {"message": "Cart cleared"}
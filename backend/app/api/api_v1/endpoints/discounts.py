@@ -0,0 +1,159 @@
+from collections import Counter
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional
+
+from app.core.database import get_db
+from app.models.discount import Discount
+from app.models.user import User
+from app.schemas.discount import (
+    DiscountApplication, DiscountApplyRequest, DiscountApplyResponse, DiscountCreate, DiscountResponse,
+    DiscountUpdate, DiscountValidateRequest, DiscountValidateResponse, PublicDiscount, check_rule
+)
+from app.services import discounts
+from app.api.api_v1.endpoints.auth import get_current_admin, get_optional_user
+
+router = APIRouter()
+
+
+@router.post("/validate", response_model=DiscountValidateResponse)
+async def validate_discount(
+    request: DiscountValidateRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: Optional[User] = Depends(get_optional_user)
+):
+    """Check that a code exists, is live and can still be used by this customer"""
+    try:
+        rule = await discounts.validate_code(db, request.code, current_user)
+    except discounts.DiscountError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    discount = await db.get(Discount, rule.id)
+    return {"is_valid": True, "discount": discount}
+
+
+@router.post("/apply", response_model=DiscountApplyResponse)
+async def apply_discount(
+    request: DiscountApplyRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: Optional[User] = Depends(get_optional_user)
+):
+    """Price a cart and return the best discount for it; nothing is redeemed until the order is placed"""
+    quantities = Counter()
+    for item in request.cart_items:
+        quantities[item.product_id] += item.quantity
+    lines = await discounts.load_cart_lines(db, quantities)
+    try:
+        application = await discounts.best_discount(db, lines, current_user, request.code)
+    except discounts.DiscountError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if application is None:
+        return {"discount": None}
+    
+    subtotal = round(sum(line.unit_price * line.quantity for line in lines), 2)
+    rule = application.rule
+    return {"discount": DiscountApplication(
+        discount_id=rule.id,
+        code=rule.code,
+        name=rule.name,
+        type=rule.type,
+        value=rule.value,
+        applied_amount=application.amount,
+        original_amount=subtotal,
+        final_amount=round(subtotal - application.amount, 2),
+        free_shipping=application.free_shipping
+    )}
+
+
+@router.get("/available", response_model=List[PublicDiscount])
+async def available_discounts(db: AsyncSession = Depends(get_db)):
+    """Public codes that are live and not used up"""
+    now = datetime.now(timezone.utc)
+    result = await db.execute(
+        select(Discount).where(
+            Discount.is_active == True,
+            Discount.is_public == True,
+            Discount.code.isnot(None),
+            or_(Discount.valid_from.is_(None), Discount.valid_from <= now),
+            or_(Discount.valid_until.is_(None), Discount.valid_until >= now),
+            or_(Discount.usage_limit.is_(None), Discount.usage_count < Discount.usage_limit)
+        ).order_by(Discount.valid_until.desc(), Discount.id)
+    )
+    return result.scalars().all()
+
+
+@router.get("/", response_model=List[DiscountResponse])
+async def list_discounts(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin)
+):
+    """All discount rules"""
+    result = await db.execute(select(Discount).order_by(Discount.id.desc()))
+    return result.scalars().all()
+
+
+@router.post("/", response_model=DiscountResponse, status_code=status.HTTP_201_CREATED)
+async def create_discount(
+    discount_data: DiscountCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin)
+):
+    """Create a discount rule"""
+    discount = Discount(**discount_data.model_dump(), usage_count=0)
+    db.add(discount)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Discount code already exists")
+    await db.refresh(discount)
+    discounts.invalidate_index()
+    return discount
+
+
+@router.put("/{discount_id}", response_model=DiscountResponse)
+async def update_discount(
+    discount_id: int,
+    discount_data: DiscountUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin)
+):
+    """Update a discount rule; code, type and usage count are fixed once created"""
+    discount = await db.get(Discount, discount_id)
+    if not discount:
+        raise HTTPException(status_code=404, detail="Discount not found")
+    changes = discount_data.model_dump(exclude_unset=True)
+    try:
+        check_rule(
+            discount.type,
+            changes.get("value", discount.value),
+            changes.get("valid_from", discount.valid_from),
+            changes.get("valid_until", discount.valid_until),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    for field, value in changes.items():
+        setattr(discount, field, value)
+    await db.commit()
+    await db.refresh(discount)
+    discounts.invalidate_index()
+    return discount
+
+
+@router.delete("/{discount_id}")
+async def delete_discount(
+    discount_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin)
+):
+    """Deactivate a discount; redemptions stay on record"""
+    discount = await db.get(Discount, discount_id)
+    if not discount:
+        raise HTTPException(status_code=404, detail="Discount not found")
+    discount.is_active = False
+    await db.commit()
+    discounts.invalidate_index()
+    return {"message": "Discount deactivated", "discount_id": discount_id}
@@ -0,0 +1,91 @@
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func
+from pathlib import Path
+from typing import Optional
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.models.product import Product, ProductImage
+from app.models.user import User
+from app.schemas.product import ProductImageResponse
+from app.services import images
+from app.api.api_v1.endpoints.auth import get_current_admin
+
+router = APIRouter()
+
+
+@router.post("/upload", response_model=ProductImageResponse)
+async def upload_image(
+    product_id: int = Form(...),
+    alt_text: Optional[str] = Form(None),
+    is_primary: bool = Form(False),
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin)
+):
+    """Upload a product image and generate its responsive WebP/JPEG variants"""
+    if not (file.content_type or "").startswith("image/"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only image uploads are supported"
+        )
+    
+    product = await db.scalar(select(Product.id).where(Product.id == product_id))
+    if product is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    
+    output_dir = Path(settings.UPLOAD_DIR) / "products"
+    try:
+        source, content_hash = await images.save_upload(file, output_dir, settings.MAX_UPLOAD_SIZE)
+    except images.ImageTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    
+    try:
+        result = await images.run_in_pool(
+            images.generate_variants,
+            str(source),
+            str(output_dir),
+            content_hash[:16],
+            settings.IMAGE_VARIANT_WIDTHS
+        )
+    except images.InvalidImageError as e:
+        source.unlink(missing_ok=True)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    variants = [
+        {
+            "url": images.static_url(Path(variant["path"])),
+            "format": variant["format"],
+            "width": variant["width"],
+            "height": variant["height"],
+            "size": variant["size"],
+        }
+        for variant in result["variants"]
+    ]
+    # Largest JPEG is the universal fallback for clients that ignore srcset
+    fallback = max((v for v in variants if v["format"] == "jpg"), key=lambda v: v["width"])
+    
+    if is_primary:
+        await db.execute(
+            update(ProductImage).where(ProductImage.product_id == product_id).values(is_primary=False)
+        )
+    sort_order = await db.scalar(
+        select(func.count(ProductImage.id)).where(ProductImage.product_id == product_id)
+    )
+    
+    image = ProductImage(
+        product_id=product_id,
+        image_url=fallback["url"],
+        alt_text=alt_text,
+        sort_order=sort_order or 0,
+        is_primary=is_primary,
+        width=result["width"],
+        height=result["height"],
+        variants=variants
+    )
+    db.add(image)
+    await db.commit()
+    await db.refresh(image)
+    
+    return image
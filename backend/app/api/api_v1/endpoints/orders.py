@@ -1,15 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List
+from sqlalchemy import delete, func, select, tuple_
+from sqlalchemy.orm import aliased, selectinload
+from typing import Optional, Union
 from datetime import datetime
 import uuid
 
-from app.core.database import get_db
-from app.models.order import Order, OrderItem
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, get_db
+from app.core.serialization import fast_response
+from app.core.security import verify_token
+from app.models.cart import Cart
+from app.models.order import Order, OrderItem, OrderStatus
+from app.models.product import Product
 from app.models.user import User
-from app.schemas.order import OrderCreate, OrderResponse, OrderItemCreate
-from app.api.api_v1.endpoints.auth import get_current_user
+from app.schemas.order import (
+    OrderCreate, OrderResponse, OrderItemCreate, OrderHistoryResponse, OrderSummaryHistoryResponse
+)
+from app.services import discounts, webhooks
+from app.services.order_events import CLOSE, broker, order_status_event
+from app.api.api_v1.endpoints.auth import get_current_user, optional_oauth2_scheme
 
 router = APIRouter()
 
@@ -21,36 +35,103 @@ async def create_order(
 ):
     """Create a new order"""
     try:
+        # Price the order from the catalog, not from the client
+        product_ids = {item.product_id for item in order_data.items}
+        products_result = await db.execute(select(Product).where(Product.id.in_(product_ids)))
+        products = {product.id: product for product in products_result.scalars().all()}
+        missing = product_ids - products.keys()
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown products: {sorted(missing)}"
+            )
+        
+        shipping = order_data.shipping_address
+        billing = order_data.billing_address
+        subtotal = sum(products[item.product_id].price * item.quantity for item in order_data.items)
+        
+        # Best discount for the cart (the given code or an automatic rule); counted once the order exists
+        application = await discounts.best_discount(
+            db,
+            [
+                discounts.CartLine(item.product_id, products[item.product_id].category_id, item.quantity, products[item.product_id].price)
+                for item in order_data.items
+            ],
+            current_user,
+            order_data.discount_code
+        )
+        discount_amount = application.amount if application else 0.0
+        
         # Create order
         order = Order(
             order_number=f"CP{datetime.now().strftime('%Y%m%d')}{str(uuid.uuid4())[:6].upper()}",
             user_id=current_user.id,
-            status="pending",
-            total_amount=order_data.total_amount,
-            shipping_address=order_data.shipping_address,
-            billing_address=order_data.billing_address,
+            customer_email=shipping.get("email") or current_user.email,
+            customer_first_name=shipping.get("firstName") or current_user.first_name,
+            customer_last_name=shipping.get("lastName") or current_user.last_name,
+            customer_phone=shipping.get("phone"),
+            shipping_address_line1=shipping.get("street", ""),
+            shipping_address_line2=shipping.get("street2"),
+            shipping_city=shipping.get("city", ""),
+            shipping_postal_code=shipping.get("postalCode", ""),
+            shipping_country=shipping.get("country") or "Deutschland",
+            billing_same_as_shipping=billing is None,
+            billing_address_line1=billing.get("street") if billing else None,
+            billing_address_line2=billing.get("street2") if billing else None,
+            billing_city=billing.get("city") if billing else None,
+            billing_postal_code=billing.get("postalCode") if billing else None,
+            billing_country=billing.get("country") if billing else None,
+            subtotal=subtotal,
+            discount_amount=discount_amount,
+            discount_code=application.rule.code if application else None,
+            total_amount=round(subtotal - discount_amount, 2),
+            status=OrderStatus.PENDING,
             payment_method=order_data.payment_method,
-            notes=order_data.notes
+            customer_notes=order_data.notes
         )
         
-        db.add(order)
-        await db.flush()  # Get the order ID
-        
         # Create order items
         for item_data in order_data.items:
-            order_item = OrderItem(
-                order_id=order.id,
-                product_id=item_data.product_id,
+            product = products[item_data.product_id]
+            order.items.append(OrderItem(
+                product_id=product.id,
+                product_name=product.name,
+                product_sku=product.sku,
+                unit_price=product.price,
                 quantity=item_data.quantity,
-                price=item_data.price
-            )
-            db.add(order_item)
+                total_price=product.price * item_data.quantity
+            ))
         
+        db.add(order)
+        await db.flush()
+        if application:
+            await discounts.redeem(db, application, order, current_user)
+        webhooks.emit(db, webhooks.ORDER_CREATED, {
+            "order_id": order.id,
+            "order_number": order.order_number,
+            "user_id": order.user_id,
+            "status": order.status.value,
+            "discount_amount": order.discount_amount,
+            "total_amount": order.total_amount,
+            "items": [
+                {"product_id": item.product_id, "quantity": item.quantity, "unit_price": item.unit_price}
+                for item in order.items
+            ],
+        })
+        # The order replaces the customer's server-side cart
+        await db.execute(delete(Cart).where(Cart.user_id == current_user.id))
         await db.commit()
-        await db.refresh(order)
         
-        return order
+        result = await db.execute(
+            select(Order).options(selectinload(Order.items)).where(Order.id == order.id)
+        )
+        return result.scalar_one()
         
+    except HTTPException:
+        raise
+    except discounts.DiscountError as e:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         await db.rollback()
         raise HTTPException(
@@ -58,24 +139,115 @@ async def create_order(
             detail=f"Failed to create order: {str(e)}"
         )
 
-@router.get("/", response_model=List[OrderResponse])
+@router.get("/", response_model=Union[OrderHistoryResponse, OrderSummaryHistoryResponse])
 async def get_user_orders(
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(20, ge=1, le=100),
+    view: str = Query("full", pattern="^(full|summary)$"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get orders for the current user"""
-    try:
-        query = select(Order).where(Order.user_id == current_user.id).order_by(Order.created_at.desc())
-        result = await db.execute(query)
-        orders = result.scalars().all()
-        
-        return orders
-        
-    except Exception as e:
+    """Get the current user's orders, newest first, one page at a time
+
+    ``view=summary`` returns only number, status, total and item count.
+    """
+    if view == "summary":
+        item_count = (
+            select(func.coalesce(func.sum(OrderItem.quantity), 0))
+            .where(OrderItem.order_id == Order.id)
+            .scalar_subquery()
+        )
+        query = select(
+            Order.id, Order.order_number, Order.status, Order.total_amount, Order.created_at,
+            item_count.label("item_count")
+        )
+    else:
+        query = select(Order).options(selectinload(Order.items))
+    query = query.where(Order.user_id == current_user.id)
+    
+    if cursor is not None:
+        try:
+            cursor_id = int(cursor)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        # Compare against the stored timestamp of the cursor order rather than a re-bound value,
+        # which SQLite would compare as text
+        after = aliased(Order)
+        cursor_created_at = (
+            select(after.created_at)
+            .where(after.id == cursor_id, after.user_id == current_user.id)
+            .scalar_subquery()
+        )
+        query = query.where(tuple_(Order.created_at, Order.id) < tuple_(cursor_created_at, cursor_id))
+    
+    result = await db.execute(query.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit + 1))
+    orders = result.all() if view == "summary" else result.scalars().all()
+    next_cursor = str(orders[limit - 1].id) if len(orders) > limit else None
+    
+    if view == "summary":
+        return fast_response(OrderSummaryHistoryResponse, {
+            "orders": [dict(row._mapping) for row in orders[:limit]],
+            "next_cursor": next_cursor,
+        })
+    return fast_response(OrderHistoryResponse, {"orders": orders[:limit], "next_cursor": next_cursor})
+
+# Orders whose status can still change; their current state is sent when a stream opens
+OPEN_STATUSES = (OrderStatus.PENDING, OrderStatus.CONFIRMED, OrderStatus.PROCESSING, OrderStatus.SHIPPED)
+
+
+def _sse(event: str, data: dict) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n".encode()
+
+
+@router.get("/events")
+async def order_events(
+    token: Optional[str] = Query(None, description="Access token for EventSource clients, which cannot send headers"),
+    header_token: Optional[str] = Depends(optional_oauth2_scheme)
+):
+    """Stream status changes of the current user's orders as Server-Sent Events.
+
+    Opens with a ``snapshot`` of open orders, then sends ``order.status`` events
+    as they happen and a comment line every ORDER_EVENTS_HEARTBEAT seconds. The
+    stream holds no database connection while idle.
+    """
+    email = verify_token(header_token or token or "")
+    async with AsyncSessionLocal() as db:
+        user_id = await db.scalar(select(User.id).where(User.email == email, User.is_active == True)) if email else None
+    if user_id is None:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to fetch orders: {str(e)}"
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
         )
+    if broker.is_full:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Too many open order streams")
+    
+    async def stream():
+        # Subscribe before taking the snapshot so no change falls in between
+        with broker.subscribe(user_id) as queue:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(Order).where(Order.user_id == user_id, Order.status.in_(OPEN_STATUSES))
+                    .order_by(Order.created_at.desc()).limit(50)
+                )
+                snapshot = [order_status_event(order) for order in result.scalars()]
+            yield b"retry: 5000\n\n" + _sse("snapshot", {"orders": snapshot})
+            while True:
+                try:
+                    order_event = await asyncio.wait_for(queue.get(), settings.ORDER_EVENTS_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                if order_event is CLOSE:
+                    break
+                yield _sse(order_event.get("type", "order.status"), order_event)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 
 @router.get("/{order_id}", response_model=OrderResponse)
 async def get_order(
@@ -85,7 +257,7 @@ async def get_order(
 ):
     """Get a specific order by ID"""
     try:
-        query = select(Order).where(
+        query = select(Order).options(selectinload(Order.items)).where(
             Order.id == order_id,
             Order.user_id == current_user.id
         )
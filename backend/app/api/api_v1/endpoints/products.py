@@ -1,10 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import tempfile
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
+from sqlalchemy.orm import joinedload, selectinload
 from typing import List, Optional
+from app.core.config import settings
 from app.core.database import get_db
-from app.models.product import Product, ProductCategory
-from app.schemas.product import ProductResponse, ProductListResponse, CategoryResponse
+from app.core.serialization import fast_response
+from app.models.product import Product, ProductCategory, ProductSimilarity
+from app.models.user import User
+from app.schemas.product import (
+    ProductResponse, ProductListResponse, ProductBatchResponse, CategoryResponse, ProductCreate, ProductUpdate, ProductImportResult
+)
+from app.schemas.recommendation import RecommendationListResponse
+from app.services import product_import, webhooks
+from app.services.similarity import update_product_similarity
+from app.api.api_v1.endpoints.auth import get_current_admin
 
 router = APIRouter()
 
@@ -18,6 +30,7 @@ async def get_products(
     bestseller: Optional[bool] = None,
     new_arrival: Optional[bool] = None,
     search: Optional[str] = None,
+    sort: str = Query("newest", pattern="^(newest|trending)$"),
     db: AsyncSession = Depends(get_db)
 ):
     """Get products with filtering and pagination"""
@@ -53,16 +66,24 @@ async def get_products(
     total = count_result.scalar()
     
     # Apply pagination and get results
-    query = query.offset(skip).limit(limit).order_by(Product.created_at.desc())
+    query = (
+        query.options(selectinload(Product.category), selectinload(Product.images))
+        .offset(skip)
+        .limit(limit)
+    )
+    if sort == "trending":
+        query = query.order_by(Product.trending_score.desc(), Product.id.desc())
+    else:
+        query = query.order_by(Product.created_at.desc())
     result = await db.execute(query)
     products = result.scalars().all()
     
-    return ProductListResponse(
+    return fast_response(ProductListResponse, ProductListResponse(
         products=products,
         total=total,
         skip=skip,
         limit=limit
-    )
+    ))
 
 
 @router.get("/categories", response_model=List[CategoryResponse])
@@ -71,30 +92,205 @@ async def get_categories(db: AsyncSession = Depends(get_db)):
     query = select(ProductCategory).where(ProductCategory.is_active == True).order_by(ProductCategory.sort_order)
     result = await db.execute(query)
     categories = result.scalars().all()
-    return categories
+    return fast_response(List[CategoryResponse], categories)
+
+
+def _split(values: Optional[List[str]]) -> List[str]:
+    # Accepts both ?ids=1,2 and ?ids=1&ids=2
+    return list(dict.fromkeys(item.strip() for value in values or () for item in value.split(",") if item.strip()))
+
+
+@router.get("/batch", response_model=ProductBatchResponse)
+async def get_products_batch(
+    ids: Optional[List[str]] = Query(None, description="Product ids, comma separated or repeated"),
+    slugs: Optional[List[str]] = Query(None, description="Product slugs, comma separated or repeated"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get several products by id and/or slug in one request
+
+    Products come back in the requested order (ids first, then slugs), each
+    once; unknown or inactive ones are listed as missing.
+    """
+    slug_list = _split(slugs)
+    try:
+        id_list = [int(value) for value in _split(ids)]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Product ids must be integers")
+    if len(id_list) + len(slug_list) > settings.PRODUCT_BATCH_MAX:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.PRODUCT_BATCH_MAX} products per request"
+        )
+    if not id_list and not slug_list:
+        return fast_response(ProductBatchResponse, {"products": [], "missing_ids": [], "missing_slugs": []})
+    
+    # One round trip: images and category are joined in
+    result = await db.execute(
+        select(Product)
+        .options(joinedload(Product.category), joinedload(Product.images))
+        .where(Product.is_active == True, Product.id.in_(id_list) | Product.slug.in_(slug_list))
+    )
+    found = result.unique().scalars().all()
+    by_id = {product.id: product for product in found}
+    by_slug = {product.slug: product for product in found}
+    
+    products = {}
+    for product in [by_id.get(product_id) for product_id in id_list] + [by_slug.get(slug) for slug in slug_list]:
+        if product is not None:
+            products.setdefault(product.id, product)
+    return fast_response(ProductBatchResponse, {
+        "products": list(products.values()),
+        "missing_ids": [product_id for product_id in id_list if product_id not in by_id],
+        "missing_slugs": [slug for slug in slug_list if slug not in by_slug],
+    })
+
+
+@router.post("/import", response_model=ProductImportResult)
+async def import_products(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$", description="Defaults to the Content-Type"),
+    current_user: User = Depends(get_current_admin)
+):
+    """Create or update products from a CSV or NDJSON request body, matched by slug (admin only)
+
+    Invalid rows are skipped and listed with their row number; similar products
+    and sitemaps are refreshed once afterwards.
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "ndjson" if "ndjson" in content_type or "jsonl" in content_type else "csv"
+    
+    # Spooled to disk beyond a few MB, so a large catalog does not sit in memory
+    with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as body:
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > settings.PRODUCT_IMPORT_MAX_BYTES:
+                raise HTTPException(status_code=413, detail="Import file is too large")
+            body.write(chunk)
+        body.seek(0)
+        try:
+            report = await product_import.import_products(body, format)
+        except product_import.ImportFormatError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    if report.changed:
+        background_tasks.add_task(product_import.refresh_catalog_caches)
+    return report.result()
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
 async def get_product(product_id: int, db: AsyncSession = Depends(get_db)):
     """Get a specific product by ID"""
-    query = select(Product).where(Product.id == product_id, Product.is_active == True)
+    query = (
+        select(Product)
+        .options(selectinload(Product.category), selectinload(Product.images))
+        .where(Product.id == product_id, Product.is_active == True)
+    )
     result = await db.execute(query)
     product = result.scalar_one_or_none()
     
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
-    return product
+    return fast_response(ProductResponse, product)
 
 
 @router.get("/slug/{slug}", response_model=ProductResponse)
 async def get_product_by_slug(slug: str, db: AsyncSession = Depends(get_db)):
     """Get a specific product by slug"""
-    query = select(Product).where(Product.slug == slug, Product.is_active == True)
+    query = (
+        select(Product)
+        .options(selectinload(Product.category), selectinload(Product.images))
+        .where(Product.slug == slug, Product.is_active == True)
+    )
     result = await db.execute(query)
     product = result.scalar_one_or_none()
     
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
-    return product
+    return fast_response(ProductResponse, product)
+
+
+@router.get("/{product_id}/similar", response_model=RecommendationListResponse)
+async def get_similar_products(
+    product_id: int,
+    limit: int = Query(8, ge=1, le=50),
+    db: AsyncSession = Depends(get_db)
+):
+    """Products with the most similar name, description, material and category"""
+    result = await db.execute(
+        select(Product, ProductSimilarity.score)
+        .join(ProductSimilarity, ProductSimilarity.similar_product_id == Product.id)
+        .options(selectinload(Product.category), selectinload(Product.images))
+        .where(ProductSimilarity.product_id == product_id, Product.is_active == True)
+        .order_by(ProductSimilarity.score.desc())
+        .limit(limit)
+    )
+    items = [{"score": score, "product": product} for product, score in result.all()]
+    return fast_response(RecommendationListResponse, {
+        "product_id": product_id,
+        "algorithm": "similar_products",
+        "recommendations": items,
+        "total": len(items),
+    })
+
+
+async def _load_product(db: AsyncSession, product_id: int) -> Product:
+    result = await db.execute(
+        select(Product)
+        .options(selectinload(Product.category), selectinload(Product.images))
+        .where(Product.id == product_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one()
+
+
+@router.post("/", response_model=ProductResponse, status_code=201)
+async def create_product(
+    product_data: ProductCreate,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin)
+):
+    """Create a product (admin only)"""
+    if await db.scalar(select(Product.id).where(Product.slug == product_data.slug)):
+        raise HTTPException(status_code=409, detail="A product with this slug already exists")
+    
+    product = Product(**product_data.model_dump())
+    db.add(product)
+    await db.commit()
+    
+    background_tasks.add_task(update_product_similarity, product.id)
+    return await _load_product(db, product.id)
+
+
+@router.put("/{product_id}", response_model=ProductResponse)
+async def update_product(
+    product_id: int,
+    product_data: ProductUpdate,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin)
+):
+    """Update a product (admin only)"""
+    product = await db.get(Product, product_id)
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+    
+    previous_quantity = product.inventory_quantity
+    for field, value in product_data.model_dump(exclude_unset=True).items():
+        setattr(product, field, value)
+    if product.inventory_quantity != previous_quantity:
+        webhooks.emit(db, webhooks.PRODUCT_STOCK_CHANGED, {
+            "product_id": product.id,
+            "sku": product.sku,
+            "previous_quantity": previous_quantity,
+            "inventory_quantity": product.inventory_quantity,
+        })
+    await db.commit()
+    
+    background_tasks.add_task(update_product_similarity, product_id)
+    return await _load_product(db, product_id)
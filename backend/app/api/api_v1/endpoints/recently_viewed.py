@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.serialization import fast_response
+from app.models.user import User
+from app.schemas.activity import RecentlyViewedResponse
+from app.services import activity
+from app.api.api_v1.endpoints.auth import get_current_user
+
+router = APIRouter()
+
+
+@router.get("/", response_model=RecentlyViewedResponse)
+async def get_recently_viewed(
+    limit: int = Query(settings.RECENTLY_VIEWED_LIMIT, ge=1, le=settings.RECENTLY_VIEWED_LIMIT),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Recently viewed products, newest first, including views not written to the database yet"""
+    cards = await activity.get_recently_viewed(db, current_user.id, limit)
+    return fast_response(RecentlyViewedResponse, {"products": cards, "total": len(cards)})
+
+
+@router.post("/{product_id}", status_code=status.HTTP_202_ACCEPTED)
+async def record_view(
+    product_id: int,
+    current_user: User = Depends(get_current_user)
+):
+    """Record a product view; it is buffered and written in the next batch"""
+    activity.record_view(current_user.id, product_id)
+    return {"message": "View recorded"}
+
+
+@router.delete("/")
+async def clear_recently_viewed(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Forget the user's viewing history"""
+    await activity.clear_recently_viewed(db, current_user.id)
+    await db.commit()
+    return {"message": "Recently viewed products cleared"}
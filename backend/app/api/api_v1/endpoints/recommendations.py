@@ -0,0 +1,67 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.core.database import get_db
+from app.core.serialization import fast_response
+from app.models.product import Product
+from app.models.user import User
+from app.schemas.recommendation import RecommendationIndexStatus, RecommendationListResponse
+from app.services import recommendations
+from app.services.similarity import rebuild_similarity_index
+from app.api.api_v1.endpoints.auth import get_current_admin
+
+router = APIRouter()
+
+
+@router.get("/frequently-bought-together/{product_id}", response_model=RecommendationListResponse)
+async def frequently_bought_together(
+    product_id: int,
+    limit: int = Query(8, ge=1, le=50),
+    db: AsyncSession = Depends(get_db)
+):
+    """Products most often bought in the same order as this one ("customers also bought")"""
+    # Ask for a few extra neighbours to make up for ones that were deactivated since the last rebuild
+    neighbours = recommendations.customers_also_bought(product_id, limit + 5)
+    products = {}
+    if neighbours:
+        result = await db.execute(
+            select(Product)
+            .options(selectinload(Product.category), selectinload(Product.images))
+            .where(Product.id.in_([neighbour_id for neighbour_id, _ in neighbours]), Product.is_active == True)
+        )
+        products = {product.id: product for product in result.scalars()}
+    
+    items = [
+        {"score": score, "product": products[neighbour_id]}
+        for neighbour_id, score in neighbours
+        if neighbour_id in products
+    ][:limit]
+    return fast_response(RecommendationListResponse, {
+        "product_id": product_id,
+        "algorithm": "frequently_bought_together",
+        "recommendations": items,
+        "total": len(items),
+    })
+
+
+@router.get("/status", response_model=RecommendationIndexStatus)
+async def index_status(current_user: User = Depends(get_current_admin)):
+    """Size and age of the in-memory co-occurrence index"""
+    index = recommendations.get_index()
+    return RecommendationIndexStatus(products=len(index), orders=index.orders, built_at=index.built_at)
+
+
+@router.post("/rebuild", response_model=RecommendationIndexStatus)
+async def rebuild_index(current_user: User = Depends(get_current_admin)):
+    """Rebuild the co-occurrence index from the order history now"""
+    index = await recommendations.rebuild_index()
+    return RecommendationIndexStatus(products=len(index), orders=index.orders, built_at=index.built_at)
+
+
+@router.post("/similar/rebuild")
+async def rebuild_similar_products(current_user: User = Depends(get_current_admin)):
+    """Refit the content-based similarity index and rewrite the top-K table"""
+    pairs = await rebuild_similarity_index()
+    return {"message": "Similarity index rebuilt", "pairs": pairs}
@@ -6,6 +6,7 @@ from typing import List, Optional
 from datetime import datetime
 
 from app.core.database import get_db
+from app.core.serialization import fast_response
 from app.models.review import Review
 from app.models.product import Product
 from app.models.user import User
@@ -128,7 +129,7 @@ async def get_product_reviews(
             .order_by(Review.created_at.desc())
         )
         reviews = result.scalars().all()
-        return reviews
+        return fast_response(List[ReviewResponse], reviews)
 
     except Exception as e:
         raise HTTPException(
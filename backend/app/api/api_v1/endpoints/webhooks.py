@@ -0,0 +1,79 @@
+import secrets
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import List, Optional
+
+from app.core.database import get_db
+from app.models.user import User
+from app.models.webhook import DeliveryStatus, WebhookDelivery, WebhookEndpoint
+from app.schemas.webhook import (
+    WebhookDeliveryResponse, WebhookEndpointCreate, WebhookEndpointCreated, WebhookEndpointResponse
+)
+from app.api.api_v1.endpoints.auth import get_current_admin
+
+router = APIRouter()
+
+
+@router.post("/endpoints", response_model=WebhookEndpointCreated, status_code=201)
+async def create_endpoint(
+    endpoint_data: WebhookEndpointCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin)
+):
+    """Register a webhook endpoint; the signing secret is only returned here"""
+    endpoint = WebhookEndpoint(
+        url=str(endpoint_data.url),
+        events=endpoint_data.events,
+        secret=endpoint_data.secret or f"whsec_{secrets.token_hex(24)}",
+        max_concurrency=endpoint_data.max_concurrency,
+        is_active=True
+    )
+    db.add(endpoint)
+    await db.commit()
+    await db.refresh(endpoint)
+    return endpoint
+
+
+@router.get("/endpoints", response_model=List[WebhookEndpointResponse])
+async def list_endpoints(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin)
+):
+    """List registered webhook endpoints"""
+    result = await db.execute(select(WebhookEndpoint).order_by(WebhookEndpoint.id))
+    return result.scalars().all()
+
+
+@router.delete("/endpoints/{endpoint_id}")
+async def deactivate_endpoint(
+    endpoint_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin)
+):
+    """Stop delivering to an endpoint; its delivery history is kept"""
+    endpoint = await db.get(WebhookEndpoint, endpoint_id)
+    if not endpoint:
+        raise HTTPException(status_code=404, detail="Webhook endpoint not found")
+    endpoint.is_active = False
+    await db.commit()
+    return {"message": "Webhook endpoint deactivated", "endpoint_id": endpoint_id}
+
+
+@router.get("/deliveries", response_model=List[WebhookDeliveryResponse])
+async def list_deliveries(
+    endpoint_id: Optional[int] = None,
+    delivery_status: Optional[DeliveryStatus] = Query(None, alias="status"),
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin)
+):
+    """Recent deliveries, newest first"""
+    query = select(WebhookDelivery).order_by(WebhookDelivery.id.desc()).limit(limit)
+    if endpoint_id is not None:
+        query = query.where(WebhookDelivery.endpoint_id == endpoint_id)
+    if delivery_status is not None:
+        query = query.where(WebhookDelivery.status == delivery_status)
+    result = await db.execute(query)
+    return result.scalars().all()
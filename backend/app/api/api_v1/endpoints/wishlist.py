@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.core.serialization import fast_response
+from app.models.user import User
+from app.schemas.activity import WishlistChange, WishlistResponse
+from app.services import activity
+from app.api.api_v1.endpoints.auth import get_current_user
+
+router = APIRouter()
+
+
+@router.get("/", response_model=WishlistResponse)
+async def get_wishlist(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Wishlisted products as product cards"""
+    cards = await activity.get_wishlist(db, current_user.id)
+    return fast_response(WishlistResponse, {"wishlist": cards, "total": len(cards)})
+
+
+@router.post("/add")
+async def add_to_wishlist(
+    change: WishlistChange,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Add one or more products; products already on the wishlist are ignored"""
+    try:
+        added = await activity.add_to_wishlist(db, current_user.id, change.product_ids)
+    except activity.WishlistFullError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    await db.commit()
+    return {"success": True, "message": "Produkt zur Wunschliste hinzugefügt", "added": added}
+
+
+@router.delete("/remove")
+async def remove_from_wishlist(
+    change: WishlistChange,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Remove one or more products"""
+    removed = await activity.remove_from_wishlist(db, current_user.id, change.product_ids)
+    await db.commit()
+    return {"success": True, "message": "Produkt aus Wunschliste entfernt", "removed": removed}
+
+
+@router.delete("/clear")
+async def clear_wishlist(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Remove every product"""
+    removed = await activity.remove_from_wishlist(db, current_user.id)
+    await db.commit()
+    return {"success": True, "message": "Wunschliste geleert", "removed": removed}
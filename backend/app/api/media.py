@@ -0,0 +1,61 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
+from pathlib import Path
+
+import aiofiles
+
+from app.core.config import settings
+from app.services import images
+from app.services.image_cache import ImageCache
+
+router = APIRouter()
+
+STATIC_ROOT = Path("static").resolve()
+
+SOURCE_FORMATS = {".jpg": "JPEG", ".jpeg": "JPEG", ".png": "PNG", ".webp": "WEBP"}
+MEDIA_TYPES = {"JPEG": "image/jpeg", "PNG": "image/png", "WEBP": "image/webp"}
+
+image_cache = ImageCache(settings.IMAGE_CACHE_DIR, settings.IMAGE_CACHE_MAX_BYTES)
+
+
+@router.get("/img/{width}x{height}/{path:path}", include_in_schema=False)
+async def resized_image(width: int, height: int, path: str, request: Request):
+    """Serve a static image resized to fit width x height (0 keeps the aspect ratio free)"""
+    max_dimension = settings.IMAGE_RESIZE_MAX_DIMENSION
+    if not (0 <= width <= max_dimension and 0 <= height <= max_dimension) or width == height == 0:
+        raise HTTPException(status_code=400, detail="Invalid image size")
+    
+    source = (STATIC_ROOT / path).resolve()
+    if STATIC_ROOT not in source.parents or not source.is_file():
+        raise HTTPException(status_code=404, detail="Image not found")
+    
+    source_format = SOURCE_FORMATS.get(source.suffix.lower())
+    if source_format is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+    
+    # Prefer WebP when the browser accepts it; PNG stays PNG to keep transparency lossless elsewhere
+    accepts_webp = "image/webp" in request.headers.get("accept", "")
+    image_format = "WEBP" if accepts_webp else ("PNG" if source_format == "PNG" else "JPEG")
+    
+    try:
+        cached = await image_cache.get(source, width, height, image_format)
+        try:
+            async with aiofiles.open(cached, "rb") as f:
+                content = await f.read()
+        except FileNotFoundError:
+            # Workers share the cache directory; another one evicted the file after our lookup
+            cached = await image_cache.get(source, width, height, image_format)
+            async with aiofiles.open(cached, "rb") as f:
+                content = await f.read()
+    except images.InvalidImageError:
+        raise HTTPException(status_code=415, detail="Image cannot be decoded")
+    return Response(
+        content,
+        media_type=MEDIA_TYPES[image_format],
+        headers={
+            "Cache-Control": f"public, max-age={settings.IMAGE_RESIZE_MAX_AGE}",
+            "Vary": "Accept",
+            # The cache file name is a digest of the source file and the requested variant
+            "ETag": f'"{cached.stem}"',
+        }
+    )
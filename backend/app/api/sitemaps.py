@@ -0,0 +1,36 @@
+import re
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+from pathlib import Path
+
+from app.core.config import settings
+from app.services.sitemap import ensure_sitemaps
+
+router = APIRouter()
+
+SHARD_NAME = re.compile(r"^sitemap-[a-z]+(?:-\d+)?\.xml\.gz$")
+
+
+@router.get("/sitemap.xml", include_in_schema=False)
+async def sitemap_index():
+    """Sitemap index pointing at the gzipped shards"""
+    index_path = await ensure_sitemaps()
+    return FileResponse(
+        index_path,
+        media_type="application/xml",
+        headers={"Cache-Control": f"public, max-age={settings.SITEMAP_MAX_AGE}"}
+    )
+
+
+@router.get("/sitemaps/{name}", include_in_schema=False)
+async def sitemap_shard(name: str):
+    """A single gzipped sitemap shard"""
+    path = Path(settings.SITEMAP_DIR) / name
+    if not SHARD_NAME.match(name) or not path.is_file():
+        raise HTTPException(status_code=404, detail="Sitemap not found")
+    return FileResponse(
+        path,
+        media_type="application/gzip",
+        headers={"Cache-Control": f"public, max-age={settings.SITEMAP_MAX_AGE}"}
+    )
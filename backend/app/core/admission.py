@@ -0,0 +1,191 @@
+import asyncio
+import json
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+from app.core.metrics import registry
+
+
+# Traffic classes in priority order: queued requests of an earlier class are admitted first
+CRITICAL = "critical"
+STANDARD = "standard"
+BROWSE = "browse"
+PRIORITY = (CRITICAL, STANDARD, BROWSE)
+
+# Never queued or rejected: probes, scrapes, files that don't touch the database and
+# long-lived event streams, which would otherwise hold a slot for as long as they are open
+EXEMPT_PATHS = ("/health", "/metrics", "/static/", "/api/v1/orders/events")
+
+ADMISSION_IN_FLIGHT = registry.gauge(
+    "http_admission_in_flight",
+    "Requests currently admitted, by traffic class",
+    ("traffic_class",)
+)
+ADMISSION_QUEUED = registry.gauge(
+    "http_admission_queued",
+    "Requests waiting for admission, by traffic class",
+    ("traffic_class",)
+)
+ADMISSION_WAIT = registry.histogram(
+    "http_admission_wait_seconds",
+    "Time spent waiting for admission, by traffic class",
+    ("traffic_class",)
+)
+ADMISSION_REJECTED = registry.counter(
+    "http_admission_rejected_total",
+    "Requests shed with 503, by traffic class and reason (queue_full, timeout)",
+    ("traffic_class", "reason")
+)
+
+
+@dataclass
+class TrafficClass:
+    name: str
+    limit: int  # concurrent requests of this class
+    queue_size: int  # requests allowed to wait once the limit is reached
+    timeout: float  # seconds a request may wait before it is shed
+
+
+class AdmissionController:
+    """Concurrency limiter with one bounded FIFO queue per traffic class.
+
+    A request runs when both the shared ``capacity`` and its class ``limit``
+    have room. Freed slots go to the highest-priority class with waiters, so
+    lower classes can never take capacity a queued checkout is waiting for;
+    keeping their limits below ``capacity`` reserves headroom for critical traffic.
+    """
+
+    def __init__(self, capacity: int, classes: Iterable[TrafficClass]):
+        self.capacity = capacity
+        self.classes = {traffic_class.name: traffic_class for traffic_class in classes}
+        self.order = [name for name in PRIORITY if name in self.classes]
+        self.active = 0
+        self.active_by_class: Dict[str, int] = {name: 0 for name in self.classes}
+        self.queues: Dict[str, deque] = {name: deque() for name in self.classes}
+
+    def _dispatch(self):
+        for name in self.order:
+            queue = self.queues[name]
+            while queue and self.active < self.capacity and self.active_by_class[name] < self.classes[name].limit:
+                waiter = queue.popleft()
+                if waiter.done():
+                    continue
+                self._admit(name)
+                waiter.set_result(True)
+            if queue and self.active >= self.capacity:
+                # Out of shared capacity: lower classes must not overtake this one
+                break
+        for name, queue in self.queues.items():
+            ADMISSION_QUEUED.set(len(queue), traffic_class=name)
+
+    def _admit(self, name: str):
+        self.active += 1
+        self.active_by_class[name] += 1
+        ADMISSION_IN_FLIGHT.inc(traffic_class=name)
+
+    def release(self, name: str):
+        self.active -= 1
+        self.active_by_class[name] -= 1
+        ADMISSION_IN_FLIGHT.dec(traffic_class=name)
+        self._dispatch()
+
+    async def acquire(self, name: str) -> Optional[str]:
+        """Wait for a slot; returns None once admitted, or the reason the request was shed"""
+        traffic_class = self.classes[name]
+        queue = self.queues[name]
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        self._dispatch()
+        if waiter.done():
+            return None
+        if len(queue) > traffic_class.queue_size:
+            queue.remove(waiter)
+            waiter.cancel()
+            ADMISSION_REJECTED.inc(traffic_class=name, reason="queue_full")
+            return "queue_full"
+
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), traffic_class.timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # Admitted just as the timeout fired
+                return None
+            queue.remove(waiter)
+            waiter.cancel()
+            ADMISSION_REJECTED.inc(traffic_class=name, reason="timeout")
+            return "timeout"
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release(name)
+            else:
+                queue.remove(waiter)
+                waiter.cancel()
+            raise
+        finally:
+            ADMISSION_WAIT.observe(time.perf_counter() - started, traffic_class=name)
+        return None
+
+
+def classify(scope, critical_paths: Iterable[str], browse_paths: Iterable[str]) -> Optional[str]:
+    """Traffic class for a request, or None when it bypasses admission control"""
+    path = scope["path"]
+    if path.startswith(EXEMPT_PATHS):
+        return None
+    if path.startswith(tuple(critical_paths)):
+        return CRITICAL
+    # Only catalog reads are low priority; writes to the same routes are not
+    if scope["method"] in ("GET", "HEAD") and path.startswith(tuple(browse_paths)):
+        return BROWSE
+    return STANDARD
+
+
+class AdmissionMiddleware:
+    """Shed excess load with a fast 503 and Retry-After instead of queueing until timeouts"""
+
+    def __init__(
+        self,
+        app,
+        controller: AdmissionController,
+        critical_paths: Iterable[str] = (),
+        browse_paths: Iterable[str] = (),
+        retry_after: int = 5
+    ):
+        self.app = app
+        self.controller = controller
+        self.critical_paths = tuple(critical_paths)
+        self.browse_paths = tuple(browse_paths)
+        self.retry_after = retry_after
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        traffic_class = classify(scope, self.critical_paths, self.browse_paths)
+        if traffic_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        rejected = await self.controller.acquire(traffic_class)
+        if rejected is not None:
+            await self._reject(send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(traffic_class)
+
+    async def _reject(self, send):
+        body = json.dumps({"detail": "Service temporarily overloaded, please retry shortly"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,175 @@
+import time
+import zlib
+from typing import Iterable
+
+import anyio
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.metrics import registry, route_label
+from app.core.staticfiles import accepted_encodings
+
+
+# Bodies above this size are compressed in a worker thread instead of on the event loop
+THREAD_THRESHOLD = 256 * 1024
+
+# Long-lived streams of small events: a compressor per open connection costs more memory than it saves
+NEVER_COMPRESS = ("text/event-stream",)
+
+COMPRESSION_BYTES_IN = registry.counter(
+    "http_response_compression_bytes_in_total",
+    "Response bytes before compression, by route and encoding",
+    ("route", "encoding")
+)
+COMPRESSION_BYTES_OUT = registry.counter(
+    "http_response_compression_bytes_out_total",
+    "Response bytes after compression, by route and encoding",
+    ("route", "encoding")
+)
+COMPRESSION_CPU_SECONDS = registry.counter(
+    "http_response_compression_cpu_seconds_total",
+    "CPU time spent compressing responses, by route and encoding",
+    ("route", "encoding")
+)
+
+
+class _Compressor:
+    """Streaming gzip/brotli encoder with a common interface"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self.encoding == "br":
+            out = self._brotli.process(data)
+            return out + (self._brotli.finish() if final else self._brotli.flush())
+        out = self._zlib.compress(data)
+        return out + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """Compress eligible responses with brotli or gzip, including streamed ones.
+
+    Bodies sent in one message are only compressed above ``minimum_size``;
+    streamed bodies are compressed chunk by chunk and flushed after every chunk
+    so clients keep receiving data as it is produced. Responses that already
+    carry a Content-Encoding (e.g. precompressed static files) pass through.
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        content_types: Iterable[str] = ("application/json",)
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.content_types = tuple(content_types)
+
+    def _choose_encoding(self, scope):
+        encodings = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if "br" in encodings:
+            return "br"
+        if "gzip" in encodings:
+            return "gzip"
+        return None
+
+    def _compressible(self, headers: Headers) -> bool:
+        if "content-encoding" in headers or "content-range" in headers:
+            return False
+        media_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        if media_type in NEVER_COMPRESS:
+            return False
+        return any(
+            media_type == allowed or (allowed.endswith("/") and media_type.startswith(allowed))
+            for allowed in self.content_types
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self._choose_encoding(scope)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor = None
+        passthrough = False
+        bytes_in = bytes_out = 0
+        cpu_seconds = 0.0
+
+        async def _compress(data: bytes, final: bool) -> bytes:
+            nonlocal bytes_in, bytes_out, cpu_seconds
+            if len(data) > THREAD_THRESHOLD:
+                def _run():
+                    started = time.thread_time()
+                    return compressor.compress(data, final), time.thread_time() - started
+                out, elapsed = await anyio.to_thread.run_sync(_run)
+            else:
+                started = time.thread_time()
+                out = compressor.compress(data, final)
+                elapsed = time.thread_time() - started
+            bytes_in += len(data)
+            bytes_out += len(out)
+            cpu_seconds += elapsed
+            return out
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressor, passthrough
+            message_type = message["type"]
+
+            if message_type == "http.response.start":
+                start_message = message
+                headers = Headers(raw=message["headers"])
+                passthrough = message["status"] < 200 or message["status"] in (204, 304) or not self._compressible(headers)
+                if passthrough:
+                    await send(message)
+                return
+
+            if message_type != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                headers = MutableHeaders(raw=list(start_message["headers"]))
+                headers["content-encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if more_body:
+                    del headers["content-length"]
+                    await send({**start_message, "headers": headers.raw})
+                else:
+                    compressed = await _compress(body, final=True)
+                    headers["content-length"] = str(len(compressed))
+                    await send({**start_message, "headers": headers.raw})
+                    await send({"type": "http.response.body", "body": compressed, "more_body": False})
+                    return
+
+            compressed = await _compress(body, final=not more_body)
+            await send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+        if compressor is not None:
+            route = route_label(scope)
+            COMPRESSION_BYTES_IN.inc(bytes_in, route=route, encoding=encoding)
+            COMPRESSION_BYTES_OUT.inc(bytes_out, route=route, encoding=encoding)
+            COMPRESSION_CPU_SECONDS.inc(cpu_seconds, route=route, encoding=encoding)
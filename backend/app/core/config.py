@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Optional
 
 
 class Settings(BaseSettings):
@@ -20,6 +20,124 @@ class Settings(BaseSettings):
     # File upload settings
     UPLOAD_DIR: str = "static/uploads"
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
+    IMAGE_VARIANT_WIDTHS: List[int] = [320, 640, 960, 1280, 1920]
+    IMAGE_WEBP_QUALITY: int = 80
+    IMAGE_JPEG_QUALITY: int = 82
+    IMAGE_PROCESS_WORKERS: int = 2
+    
+    # Response compression
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024  # bytes; smaller bodies are sent uncompressed
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4  # 0-11; higher levels cost far more CPU per byte saved
+    COMPRESSION_CONTENT_TYPES: List[str] = [
+        "application/json",
+        "application/xml",
+        "application/javascript",
+        "image/svg+xml",
+        "text/",
+    ]
+    
+    # Static files (content-hashed names are always served as immutable)
+    STATIC_MAX_AGE: int = 3600
+    
+    # On-demand image resizing (/img/{w}x{h}/{path})
+    IMAGE_CACHE_DIR: str = "cache/img"
+    IMAGE_CACHE_MAX_BYTES: int = 512 * 1024 * 1024  # 512MB per worker process
+    IMAGE_RESIZE_MAX_DIMENSION: int = 2400
+    IMAGE_RESIZE_MAX_AGE: int = 7 * 24 * 3600
+    
+    # Sitemaps (generated by generate_sitemaps.py or on first request)
+    SITEMAP_BASE_URL: str = "https://casa-petrada.de"
+    SITEMAP_DIR: str = "cache/sitemaps"
+    SITEMAP_MAX_AGE: int = 3600
+    SITEMAP_STATIC_PATHS: List[str] = [
+        "/", "/armbaender", "/ketten", "/fashion", "/sale", "/blog", "/about", "/contact",
+        "/impressum", "/datenschutz", "/agb",
+    ]
+    # Blog posts live in the frontend; list their slugs here until they move to the database
+    SITEMAP_BLOG_SLUGS: List[str] = [
+        "boho-styling-trends-2024",
+        "handgefertigter-schmuck-kunst-handwerk",
+        "schmuck-pflege-tipps",
+        "boho-styling-jeden-anlass",
+    ]
+    
+    # "Customers also bought" co-occurrence index
+    RECOMMENDATION_TOP_K: int = 20  # neighbours kept per product
+    RECOMMENDATION_MIN_SUPPORT: int = 2  # orders a pair must share to count
+    RECOMMENDATION_LOOKBACK_DAYS: int = 365
+    SIMILAR_PRODUCTS_TOP_K: int = 20  # content-based neighbours stored per product
+    SIMILARITY_MODEL_PATH: str = "cache/similarity.npz"  # fitted by the rebuild job, loaded by every worker
+    
+    # Trending scores and automatic bestseller / new-arrival flags
+    TRENDING_HALF_LIFE_DAYS: float = 7.0
+    TRENDING_WINDOW_DAYS: int = 90
+    TRENDING_REVIEW_WEIGHT: float = 2.0  # a five-star review counts like two units sold
+    BESTSELLER_COUNT: int = 24
+    NEW_ARRIVAL_DAYS: int = 30
+    
+    # Periodic jobs (seconds between runs); leader-only jobs run on one worker via advisory locks
+    SCHEDULER_ENABLED: bool = True
+    RECOMMENDATION_REBUILD_INTERVAL: int = 3600
+    SIMILARITY_REBUILD_INTERVAL: int = 24 * 3600
+    PRODUCT_SCORES_INTERVAL: int = 15 * 60
+    SITEMAP_REGENERATE_INTERVAL: int = 3600
+    CART_CLEANUP_INTERVAL: int = 3600
+    WEBHOOK_CLEANUP_INTERVAL: int = 3600
+    
+    # Products per GET /products/batch request
+    PRODUCT_BATCH_MAX: int = 100
+    
+    # Bulk product import (POST /products/import, import_products.py)
+    PRODUCT_IMPORT_BATCH_SIZE: int = 1000  # rows per upsert and transaction
+    PRODUCT_IMPORT_MAX_BYTES: int = 200 * 1024 * 1024
+    PRODUCT_IMPORT_MAX_ERRORS: int = 1000  # row errors listed in the response
+    
+    # Server-side carts
+    CART_GUEST_TTL_DAYS: int = 30
+    CART_USER_TTL_DAYS: int = 90
+    CART_MAX_LINES: int = 50
+    CART_MAX_QUANTITY: int = 99
+    
+    # Order status streams (Server-Sent Events, fanned out across workers with LISTEN/NOTIFY)
+    ORDER_EVENTS_MAX_STREAMS: int = 10_000  # open streams per worker
+    ORDER_EVENTS_HEARTBEAT: float = 20.0  # seconds between keep-alive comments
+    
+    # Recently viewed products: kept per user, buffered in memory and written in batches
+    RECENTLY_VIEWED_LIMIT: int = 20
+    RECENTLY_VIEWED_FLUSH_INTERVAL: float = 10.0
+    RECENTLY_VIEWED_MAX_BUFFERED_USERS: int = 10_000  # flush early beyond this
+    WISHLIST_MAX_ITEMS: int = 200
+    
+    # Discount rules are compiled per worker and reloaded after this many seconds
+    DISCOUNT_INDEX_TTL: float = 60.0
+    
+    # Outbound webhooks (delivered from the webhook_events outbox by a leader-only job)
+    WEBHOOK_POLL_INTERVAL: float = 2.0
+    WEBHOOK_DELIVERIES_PER_RUN: int = 500
+    WEBHOOK_BATCH_SIZE: int = 20  # events per request to one endpoint
+    WEBHOOK_MAX_ATTEMPTS: int = 10
+    WEBHOOK_BACKOFF_BASE: float = 15.0  # seconds before the first retry, doubled per attempt
+    WEBHOOK_BACKOFF_MAX: float = 6 * 3600
+    WEBHOOK_TIMEOUT: float = 10.0
+    WEBHOOK_MAX_CONNECTIONS: int = 50
+    WEBHOOK_RETENTION_DAYS: int = 30  # delivered and failed deliveries are deleted after this
+    
+    # Production server (serve.py)
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 0  # 0 = one per CPU
+    SERVER_LOOP: str = "auto"  # auto picks uvloop when installed
+    SERVER_HTTP: str = "auto"  # auto picks httptools when installed
+    SERVER_BACKLOG: int = 2048  # pending connections queued by the kernel
+    SERVER_KEEPALIVE_TIMEOUT: int = 65  # longer than the proxy's upstream idle timeout, so the proxy closes first
+    SERVER_LIMIT_CONCURRENCY: Optional[int] = None  # connections per worker before answering 503
+    SERVER_MAX_REQUESTS: int = 10_000  # recycle a worker after this many requests (0 = never)
+    SERVER_MAX_REQUESTS_JITTER: int = 1000
+    SERVER_GRACEFUL_TIMEOUT: int = 30  # seconds to drain in-flight requests on SIGTERM
+    SERVER_FORWARDED_ALLOW_IPS: str = "127.0.0.1"
+    SERVER_ACCESS_LOG: bool = False
     
     # Application settings
     PROJECT_NAME: str = "Casa Petrada"
@@ -32,6 +150,28 @@ class Settings(BaseSettings):
     PAYPAL_CLIENT_ID: Optional[str] = None
     PAYPAL_CLIENT_SECRET: Optional[str] = None
     
+    # Monitoring settings
+    METRICS_ENABLED: bool = True
+    # /metrics answers only these client addresses, or requests with "Authorization: Bearer <METRICS_TOKEN>"
+    METRICS_ALLOWED_HOSTS: List[str] = ["127.0.0.1", "::1"]
+    METRICS_TOKEN: Optional[str] = None
+    
+    # SQL profiler settings (opt-in, meant for staging)
+    PROFILER_ENABLED: bool = False
+    PROFILER_TOKEN: Optional[str] = None  # value expected in the X-SQL-Profile request header
+    PROFILER_SAMPLE_RATE: float = 0.0  # fraction of requests profiled without the header
+    SLOW_QUERY_THRESHOLD_MS: float = 100.0
+    
+    # Admission control (load shedding); class limits below the capacity reserve room for checkout
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_CAPACITY: int = 32  # concurrent requests per worker across all classes
+    ADMISSION_LIMITS: Dict[str, int] = {"critical": 32, "standard": 16, "browse": 12}
+    ADMISSION_QUEUE_SIZES: Dict[str, int] = {"critical": 128, "standard": 32, "browse": 16}
+    ADMISSION_QUEUE_TIMEOUTS: Dict[str, float] = {"critical": 10.0, "standard": 2.0, "browse": 0.5}
+    ADMISSION_CRITICAL_PATHS: List[str] = ["/api/v1/orders", "/api/v1/auth"]
+    ADMISSION_BROWSE_PATHS: List[str] = ["/api/v1/products", "/api/v1/reviews", "/img/"]
+    ADMISSION_RETRY_AFTER: int = 5  # seconds, sent with every 503
+
     class Config:
         env_file = ".env"
 
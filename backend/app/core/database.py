@@ -36,3 +36,12 @@ async def get_db() -> AsyncSession:
 def get_async_session():
     """Generator function for getting async session"""
     return AsyncSessionLocal()
+
+
+def upsert(model):
+    """INSERT for ``model`` supporting ``on_conflict_do_nothing/update`` on PostgreSQL and SQLite"""
+    if engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
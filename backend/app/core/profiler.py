@@ -0,0 +1,199 @@
+import asyncio
+import hmac
+import logging
+import random
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+
+
+logger = logging.getLogger("app.sql_profiler")
+
+PROFILE_HEADER = "x-sql-profile"
+
+# Slow statements explained per request; EXPLAIN ANALYZE re-runs the query, so keep this small
+MAX_EXPLAINS_PER_REQUEST = 3
+
+# The event loop only keeps weak references to tasks; hold the EXPLAIN tasks until they finish
+_explain_tasks = set()
+
+
+def parameter_shape(parameters) -> str:
+    """Describe bound parameters by type only, so logs never contain customer data"""
+    if parameters is None:
+        return "()"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (list, tuple, dict)):
+            # executemany: describe the first row and how many rows were sent
+            return f"{len(parameters)}x{parameter_shape(parameters[0])}"
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    return type(parameters).__name__
+
+
+class QueryRecord:
+    __slots__ = ("statement", "parameters", "shape", "duration", "executemany")
+
+    def __init__(self, statement: str, parameters, duration: float, executemany: bool):
+        self.statement = statement
+        self.parameters = parameters
+        self.shape = parameter_shape(parameters)
+        self.duration = duration
+        self.executemany = executemany
+
+
+class SQLProfile:
+    """Every statement executed while handling one request"""
+
+    def __init__(self):
+        self.queries: List[QueryRecord] = []
+
+    @property
+    def total_duration(self) -> float:
+        return sum(query.duration for query in self.queries)
+
+    def repeated_statements(self) -> Counter:
+        """Statements issued more than once - the usual signature of an N+1"""
+        counts = Counter(query.statement for query in self.queries)
+        return Counter({statement: count for statement, count in counts.items() if count > 1})
+
+    def slow_queries(self, threshold: float) -> List[QueryRecord]:
+        return sorted(
+            (query for query in self.queries if query.duration >= threshold),
+            key=lambda query: query.duration,
+            reverse=True
+        )
+
+    def summary(self) -> str:
+        slowest = max((query.duration for query in self.queries), default=0.0)
+        repeated = self.repeated_statements()
+        return (
+            f"queries={len(self.queries)}; "
+            f"total_ms={self.total_duration * 1000:.1f}; "
+            f"slowest_ms={slowest * 1000:.1f}; "
+            f"repeated={sum(repeated.values())}"
+        )
+
+
+_current_profile: ContextVar[Optional[SQLProfile]] = ContextVar("sql_profile", default=None)
+
+
+def instrument_engine(engine: AsyncEngine):
+    """Record statements into the active request profile, if there is one"""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current_profile.get() is not None:
+            conn.info.setdefault("profiler_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        profile = _current_profile.get()
+        if profile is None or not conn.info.get("profiler_start_time"):
+            return
+        duration = time.perf_counter() - conn.info["profiler_start_time"].pop()
+        profile.queries.append(QueryRecord(statement, parameters, duration, executemany))
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("profiler_start_time"):
+            conn.info["profiler_start_time"].pop()
+
+
+def _is_explainable(statement: str) -> bool:
+    # EXPLAIN ANALYZE executes the statement, so never run it for writes
+    head = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return head in ("SELECT", "WITH")
+
+
+async def _log_slow_queries(engine: AsyncEngine, route: str, queries: List[QueryRecord]):
+    """Log slow statements together with their EXPLAIN (ANALYZE, BUFFERS) plan"""
+    for query in queries:
+        plan = None
+        if engine.dialect.name == "postgresql" and _is_explainable(query.statement) and not query.executemany:
+            try:
+                async with engine.connect() as conn:
+                    trans = await conn.begin()
+                    try:
+                        result = await conn.exec_driver_sql(
+                            f"EXPLAIN (ANALYZE, BUFFERS) {query.statement}",
+                            query.parameters or ()
+                        )
+                        plan = "\n".join(row[0] for row in result)
+                    finally:
+                        await trans.rollback()
+            except Exception as e:
+                plan = f"<explain failed: {e}>"
+
+        logger.warning(
+            "Slow query on %s: %.1f ms params=%s\n%s%s",
+            route,
+            query.duration * 1000,
+            query.shape,
+            query.statement,
+            f"\n{plan}" if plan else ""
+        )
+
+
+class SQLProfilerMiddleware:
+    """Opt-in per-request SQL profiler.
+
+    A request is profiled when it carries the ``X-SQL-Profile`` header with the
+    configured token, or when it is picked by ``PROFILER_SAMPLE_RATE``. The summary
+    is returned in the ``X-SQL-Profile`` response header.
+    """
+
+    def __init__(self, app, engine: AsyncEngine):
+        self.app = app
+        self.engine = engine
+        self.threshold = settings.SLOW_QUERY_THRESHOLD_MS / 1000
+
+    def _should_profile(self, scope) -> bool:
+        if settings.PROFILER_TOKEN:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER.encode():
+                    return hmac.compare_digest(value, settings.PROFILER_TOKEN.encode())
+        return settings.PROFILER_SAMPLE_RATE > 0 and random.random() < settings.PROFILER_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = SQLProfile()
+        token = _current_profile.set(profile)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((PROFILE_HEADER.encode(), profile.summary().encode()))
+                headers.append((b"server-timing", f"db;dur={profile.total_duration * 1000:.1f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_profile.reset(token)
+
+        route = getattr(scope.get("route"), "path", scope["path"])
+        repeated = profile.repeated_statements()
+        if repeated:
+            statement, count = repeated.most_common(1)[0]
+            logger.info("Repeated statement on %s (%dx): %s", route, count, statement)
+
+        slow = profile.slow_queries(self.threshold)[:MAX_EXPLAINS_PER_REQUEST]
+        if slow:
+            # Run EXPLAIN after the response has been sent so the client never waits for it
+            task = asyncio.create_task(_log_slow_queries(self.engine, route, slow))
+            _explain_tasks.add(task)
+            task.add_done_callback(_explain_tasks.discard)
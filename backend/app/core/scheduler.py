@@ -0,0 +1,196 @@
+import asyncio
+import hashlib
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.core.metrics import registry
+
+logger = logging.getLogger("app.scheduler")
+
+LEADER_LOCK_NAME = "casapetrada:scheduler-leader"
+
+JOB_RUNS = registry.counter(
+    "scheduler_job_runs_total",
+    "Scheduled job runs by outcome (success, error, timeout, skipped)",
+    ("job", "outcome")
+)
+JOB_DURATION = registry.histogram(
+    "scheduler_job_duration_seconds",
+    "Run time of scheduled jobs",
+    ("job",),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+)
+JOB_LAST_SUCCESS = registry.gauge(
+    "scheduler_job_last_success_timestamp_seconds",
+    "Unix time of the last successful run",
+    ("job",)
+)
+SCHEDULER_LEADER = registry.gauge(
+    "scheduler_is_leader",
+    "1 if this worker currently runs the leader-only jobs"
+)
+
+
+def advisory_lock_key(name: str) -> int:
+    """Stable signed 64-bit key for pg_advisory_lock derived from a name"""
+    return int.from_bytes(hashlib.sha256(name.encode()).digest()[:8], "big", signed=True)
+
+
+@dataclass
+class Job:
+    name: str
+    func: Callable[[], Awaitable]
+    interval: float  # seconds between the start of two runs
+    timeout: Optional[float] = None
+    jitter: float = 0.1  # +/- fraction of the interval, so workers and jobs don't fire in lockstep
+    leader_only: bool = True  # False for jobs that maintain per-worker state (e.g. in-memory indexes)
+    run_at_startup: bool = False
+    running: bool = field(default=False, init=False)
+
+
+class Scheduler:
+    """Periodic asyncio jobs for the API workers.
+
+    On PostgreSQL one worker becomes leader by holding a session-level advisory
+    lock on a dedicated connection; only the leader runs ``leader_only`` jobs and
+    another worker takes over when its connection goes away. Each run also
+    takes a per-job advisory lock, so a job never overlaps itself, even during
+    a leadership handover. Other databases (SQLite in development) have a
+    single process, which is always leader.
+    """
+
+    def __init__(self, engine: AsyncEngine, leader_poll_interval: float = 15.0):
+        self.engine = engine
+        self.leader_poll_interval = leader_poll_interval
+        self.jobs: Dict[str, Job] = {}
+        self.is_leader = False
+        self._leader_conn: Optional[AsyncConnection] = None
+        self._tasks = []
+        self._advisory_locks = engine.dialect.name == "postgresql"
+
+    def add_job(self, name: str, func: Callable[[], Awaitable], interval: float, **options) -> Job:
+        if name in self.jobs:
+            raise ValueError(f"Job {name!r} is already registered")
+        job = Job(name, func, interval, **options)
+        self.jobs[name] = job
+        return job
+
+    async def start(self):
+        if not self._advisory_locks:
+            self._set_leader(True)
+        else:
+            self._tasks.append(asyncio.create_task(self._elect_leader(), name="scheduler-leader"))
+        for job in self.jobs.values():
+            self._tasks.append(asyncio.create_task(self._job_loop(job), name=f"scheduler-{job.name}"))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self._resign()
+
+    def _set_leader(self, is_leader: bool):
+        if is_leader != self.is_leader:
+            logger.info("Scheduler leadership %s", "acquired" if is_leader else "lost")
+        self.is_leader = is_leader
+        SCHEDULER_LEADER.set(1 if is_leader else 0)
+
+    async def _elect_leader(self):
+        key = advisory_lock_key(LEADER_LOCK_NAME)
+        while True:
+            try:
+                if self._leader_conn is None:
+                    conn = await self.engine.connect()
+                    try:
+                        await conn.execution_options(isolation_level="AUTOCOMMIT")
+                        acquired = await conn.scalar(text("SELECT pg_try_advisory_lock(:key)"), {"key": key})
+                    except BaseException:
+                        await conn.close()
+                        raise
+                    if acquired:
+                        self._leader_conn = conn
+                        self._set_leader(True)
+                    else:
+                        await conn.close()
+                else:
+                    # The lock lives as long as the session; make sure it still does
+                    await self._leader_conn.scalar(text("SELECT 1"))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Scheduler leader election failed")
+                await self._resign()
+            await asyncio.sleep(self.leader_poll_interval * random.uniform(0.8, 1.2))
+
+    async def _resign(self):
+        conn, self._leader_conn = self._leader_conn, None
+        self._set_leader(False)
+        if conn is not None:
+            try:
+                # Dropping the session releases the lock even if the connection is already broken
+                await conn.invalidate()
+                await conn.close()
+            except Exception:
+                pass
+
+    async def _job_loop(self, job: Job):
+        if not job.run_at_startup:
+            await asyncio.sleep(job.interval * random.uniform(0, max(job.jitter, 0.05)))
+        while True:
+            if self.is_leader or not job.leader_only:
+                try:
+                    await self.run_job(job.name)
+                except Exception:
+                    # e.g. no database connection for the job lock; try again next interval
+                    logger.exception("Could not run job %s", job.name)
+            await asyncio.sleep(job.interval * random.uniform(1 - job.jitter, 1 + job.jitter))
+
+    async def run_job(self, name: str) -> str:
+        """Run a job once now, unless it is already running; returns the outcome"""
+        job = self.jobs[name]
+        if job.running:
+            JOB_RUNS.inc(job=name, outcome="skipped")
+            return "skipped"
+
+        job.running = True
+        lock_key = advisory_lock_key(f"job:{name}")
+        lock_conn = None
+        locked = False
+        try:
+            if self._advisory_locks and job.leader_only:
+                lock_conn = await self.engine.connect()
+                await lock_conn.execution_options(isolation_level="AUTOCOMMIT")
+                locked = await lock_conn.scalar(text("SELECT pg_try_advisory_lock(:key)"), {"key": lock_key})
+                if not locked:
+                    JOB_RUNS.inc(job=name, outcome="skipped")
+                    return "skipped"
+
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(job.func(), job.timeout)
+                outcome = "success"
+                JOB_LAST_SUCCESS.set(time.time(), job=name)
+            except asyncio.TimeoutError:
+                outcome = "timeout"
+                logger.error("Job %s timed out after %ss", name, job.timeout)
+            except Exception:
+                outcome = "error"
+                logger.exception("Job %s failed", name)
+            JOB_DURATION.observe(time.perf_counter() - started, job=name)
+            JOB_RUNS.inc(job=name, outcome=outcome)
+            return outcome
+        finally:
+            job.running = False
+            if lock_conn is not None:
+                try:
+                    if locked:
+                        await lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": lock_key})
+                finally:
+                    await lock_conn.close()
@@ -0,0 +1,72 @@
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any
+
+import orjson
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter
+
+
+def _default(value: Any):
+    """Fallback for types orjson does not handle natively"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(Response):
+    """JSON response rendered with orjson; bytes are sent as-is (already serialized)"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
+
+
+class Serializer:
+    """Validator and JSON encoder for one response schema, compiled once.
+
+    ``dump`` validates ORM objects/dicts against the schema (from attributes)
+    and encodes the result in a single pass through pydantic-core. Instances
+    the server built itself are encoded without being validated again.
+    """
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.adapter = TypeAdapter(schema)
+        self._model = schema if isinstance(schema, type) and issubclass(schema, BaseModel) else None
+
+    def validate(self, content: Any):
+        if self._model is not None and isinstance(content, self._model):
+            return content
+        return self.adapter.validate_python(content, from_attributes=True)
+
+    def dump(self, content: Any, validated: bool = False) -> bytes:
+        if not validated:
+            content = self.validate(content)
+        return self.adapter.dump_json(content)
+
+
+@lru_cache(maxsize=None)
+def serializer_for(schema) -> Serializer:
+    return Serializer(schema)
+
+
+def fast_response(schema, content: Any, status_code: int = 200, validated: bool = False, **kwargs) -> FastJSONResponse:
+    """Serialize ``content`` as ``schema`` and return it, bypassing FastAPI's response_model pass.
+
+    Keep ``response_model`` on the route for the OpenAPI schema; FastAPI sends
+    Response instances unchanged.
+    """
+    body = serializer_for(schema).dump(content, validated=validated)
+    return FastJSONResponse(body, status_code=status_code, **kwargs)
@@ -0,0 +1,168 @@
+import copy
+import logging
+import multiprocessing
+import os
+import random
+import signal
+import threading
+import time
+from typing import Callable, List
+
+import uvicorn
+from uvicorn._subprocess import get_subprocess
+from uvicorn.config import LOGGING_CONFIG
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.server")
+
+# Called in each worker when it starts shutting down, before uvicorn waits for open connections
+_drain_callbacks: List[Callable[[], None]] = []
+
+# A worker that dies faster than this after starting is crashing, not being recycled
+MIN_WORKER_UPTIME = 5.0
+
+
+def on_drain(callback: Callable[[], None]):
+    """Register a callback that ends long-lived responses (e.g. event streams) on shutdown"""
+    _drain_callbacks.append(callback)
+    return callback
+
+
+def log_config(level: str = "INFO") -> dict:
+    """uvicorn's logging setup plus the application's "app.*" loggers, applied in every worker"""
+    config = copy.deepcopy(LOGGING_CONFIG)
+    config["loggers"]["app"] = {"handlers": ["default"], "level": level, "propagate": False}
+    return config
+
+
+def build_config(app: str = "main:app", **overrides) -> uvicorn.Config:
+    """uvicorn configuration from the SERVER_* settings; keyword arguments take precedence"""
+    options = dict(
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=settings.SERVER_WORKERS or os.cpu_count() or 1,
+        loop=settings.SERVER_LOOP,
+        http=settings.SERVER_HTTP,
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEPALIVE_TIMEOUT,
+        limit_concurrency=settings.SERVER_LIMIT_CONCURRENCY,
+        limit_max_requests=settings.SERVER_MAX_REQUESTS or None,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT,
+        proxy_headers=True,
+        forwarded_allow_ips=settings.SERVER_FORWARDED_ALLOW_IPS,
+        access_log=settings.SERVER_ACCESS_LOG,
+        log_config=log_config(),
+        log_level="info",
+    )
+    options.update(overrides)
+    return uvicorn.Config(app, **options)
+
+
+class GracefulServer(uvicorn.Server):
+    """uvicorn server that runs the drain callbacks as soon as it starts shutting down.
+
+    That covers SIGTERM/SIGINT as well as recycling after ``limit_max_requests``,
+    where uvicorn leaves its main loop without a signal. uvicorn then stops
+    accepting, waits up to ``timeout_graceful_shutdown`` for in-flight requests
+    and runs the lifespan shutdown, which disposes the database engine. Workers
+    under the Supervisor ignore SIGINT: Ctrl+C reaches the whole process group,
+    and the SIGTERM the supervisor forwards afterwards would otherwise count as
+    a second signal and force an exit.
+    """
+
+    def __init__(self, config: uvicorn.Config, supervised: bool = False):
+        super().__init__(config)
+        self.supervised = supervised
+
+    def handle_exit(self, sig, frame):
+        if self.supervised and sig == signal.SIGINT:
+            return
+        super().handle_exit(sig, frame)
+
+    async def shutdown(self, sockets=None):
+        for callback in _drain_callbacks:
+            try:
+                callback()
+            except Exception:
+                logger.exception("Drain callback %r failed", callback)
+        await super().shutdown(sockets=sockets)
+
+
+class Supervisor:
+    """Keeps ``config.workers`` server processes running on one shared socket.
+
+    uvicorn's own supervisor does not replace workers that exit, so recycling
+    after ``limit_max_requests`` would shrink the pool; this one starts a
+    replacement for every worker that exits while the server is running. Each
+    worker gets its own random jitter on the request limit so they don't all
+    recycle at once.
+    """
+
+    def __init__(self, config: uvicorn.Config, max_requests_jitter: int = 0):
+        self.config = config
+        self.max_requests_jitter = max_requests_jitter
+        self.processes: List[multiprocessing.Process] = []
+        self.started_at = {}
+        self.should_exit = threading.Event()
+
+    def _spawn(self, sockets) -> multiprocessing.Process:
+        config = copy.copy(self.config)
+        if config.limit_max_requests:
+            config.limit_max_requests += random.randint(0, self.max_requests_jitter)
+        process = get_subprocess(
+            config=config, target=GracefulServer(config, supervised=True).run, sockets=sockets
+        )
+        process.start()
+        self.started_at[process.pid] = time.monotonic()
+        return process
+
+    def _signal(self, sig, frame):
+        self.should_exit.set()
+
+    def run(self):
+        sockets = [self.config.bind_socket()]
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, self._signal)
+        logger.info("Starting %d workers (parent %d)", self.config.workers, os.getpid())
+        self.processes = [self._spawn(sockets) for _ in range(self.config.workers)]
+
+        crash_delay = 0.0
+        while not self.should_exit.wait(0.5):
+            for index, process in enumerate(self.processes):
+                if process.is_alive():
+                    continue
+                uptime = time.monotonic() - self.started_at.pop(process.pid, 0.0)
+                if uptime < MIN_WORKER_UPTIME:
+                    crash_delay = min(max(crash_delay * 2, 1.0), 30.0)
+                    logger.error("Worker %d exited after %.1fs with code %s; restarting in %.0fs",
+                                 process.pid, uptime, process.exitcode, crash_delay)
+                    if self.should_exit.wait(crash_delay):
+                        break
+                else:
+                    crash_delay = 0.0
+                    logger.info("Worker %d exited after %.0fs (code %s); starting a replacement",
+                                process.pid, uptime, process.exitcode)
+                self.processes[index] = self._spawn(sockets)
+
+        # Forward the shutdown: each worker drains on SIGTERM, then gets killed if it overstays
+        logger.info("Stopping %d workers", len(self.processes))
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + (self.config.timeout_graceful_shutdown or 30) + 5
+        for process in self.processes:
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                logger.warning("Worker %d did not stop in time; killing it", process.pid)
+                process.kill()
+                process.join()
+        for sock in sockets:
+            sock.close()
+
+
+def serve(config: uvicorn.Config, max_requests_jitter: int = 0):
+    if config.workers > 1 or config.limit_max_requests:
+        Supervisor(config, max_requests_jitter).run()
+    else:
+        GracefulServer(config).run()
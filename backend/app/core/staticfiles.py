@@ -0,0 +1,177 @@
+import os
+import re
+from mimetypes import guess_type
+from typing import Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+from app.core.config import settings
+
+
+# Only names whose hash we know was written by a build step or the upload pipeline; a date
+# or number in an uploaded file name ("IMG-20230101.jpg") must not make it immutable.
+# Image variants from app.services.images: "c994857c0cdc33d1-640w.webp" (16 hex digits, at least one letter)
+IMAGE_VARIANT_NAME = re.compile(r"^(?=[0-9]*[a-f])[0-9a-f]{16}-\d+w\.[A-Za-z0-9]+$")
+# Bundler output under _astro/: "index.Cq3RfLyG.css" (8-character hash)
+BUNDLE_NAME = re.compile(r"(?:^|/)_astro/(?:.+/)?[^/]+\.[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Sibling suffix per content-coding, in order of preference
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+ZERO_COPY_SEND = "http.response.zerocopysend"
+
+
+def is_content_hashed(path: str) -> bool:
+    """Whether the file at ``path`` (relative to the static root or absolute) has a content-hashed name"""
+    path = path.replace(os.sep, "/")
+    return bool(IMAGE_VARIANT_NAME.match(path.rsplit("/", 1)[-1]) or BUNDLE_NAME.search(path))
+
+
+def accepted_encodings(header: str) -> set:
+    """Content-codings from an Accept-Encoding header, ignoring those with q=0"""
+    encodings = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        params = params.replace(" ", "")
+        if name and params not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            encodings.add(name.lower())
+    return encodings
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single ``bytes=start-end`` range; returns None for unsupported or multi-range requests.
+
+    Raises ValueError when the range cannot be satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    start_text, _, end_text = spec.strip().partition("-")
+    if not start_text:
+        # Suffix range: the last N bytes
+        length = int(end_text)
+        if length <= 0:
+            raise ValueError("Unsatisfiable range")
+        return max(size - length, 0), size - 1
+    start = int(start_text)
+    end = min(int(end_text), size - 1) if end_text else size - 1
+    if start > end or start >= size:
+        raise ValueError("Unsatisfiable range")
+    return start, end
+
+
+class StaticFileResponse(FileResponse):
+    """FileResponse with byte ranges and zero-copy sendfile where the server supports it"""
+
+    chunk_size = 256 * 1024
+
+    def __init__(self, *args, byte_range: Optional[Tuple[int, int]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        size = self.stat_result.st_size
+        self.offset, end = byte_range if byte_range else (0, size - 1)
+        self.count = end - self.offset + 1
+        if byte_range:
+            self.status_code = 206
+            self.headers["content-range"] = f"bytes {self.offset}-{end}/{size}"
+            self.headers["content-length"] = str(self.count)
+        self.headers["accept-ranges"] = "bytes"
+
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if self.send_header_only or self.count <= 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif ZERO_COPY_SEND in scope.get("extensions", {}):
+            with open(self.path, "rb") as file:
+                await send({
+                    "type": ZERO_COPY_SEND,
+                    "file": file,
+                    "offset": self.offset,
+                    "count": self.count,
+                    "more_body": False,
+                })
+        else:
+            async with await anyio.open_file(self.path, mode="rb") as file:
+                await file.seek(self.offset)
+                remaining = self.count
+                while remaining > 0:
+                    chunk = await file.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+                if remaining > 0:
+                    # File shrank while being sent; terminate the body cleanly
+                    await send({"type": "http.response.body", "body": b"", "more_body": False})
+        if self.background is not None:
+            await self.background()
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles serving ``.br``/``.gz`` siblings and long-lived cache headers.
+
+    Siblings are produced ahead of time by ``compress_static.py``, so no CPU is
+    spent compressing at request time. Content-hashed filenames are marked immutable.
+    """
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        path = os.fspath(full_path)
+        media_type = guess_type(path)[0] or "text/plain"
+
+        headers = {"vary": "Accept-Encoding"}
+        if is_content_hashed(path):
+            headers["cache-control"] = IMMUTABLE_CACHE_CONTROL
+        else:
+            headers["cache-control"] = f"public, max-age={settings.STATIC_MAX_AGE}"
+
+        range_header = request_headers.get("range")
+        served_path = path
+        if range_header is None:
+            # Ranges are always served from the identity encoding
+            encodings = accepted_encodings(request_headers.get("accept-encoding", ""))
+            for encoding, suffix in PRECOMPRESSED:
+                if encoding in encodings:
+                    try:
+                        sibling_stat = os.stat(path + suffix)
+                    except FileNotFoundError:
+                        continue
+                    if sibling_stat.st_mtime >= stat_result.st_mtime:
+                        served_path, stat_result = path + suffix, sibling_stat
+                        headers["content-encoding"] = encoding
+                        break
+
+        byte_range = None
+        if range_header is not None and status_code == 200:
+            try:
+                byte_range = parse_range(range_header, stat_result.st_size)
+            except ValueError:
+                return Response(
+                    status_code=416,
+                    headers={"content-range": f"bytes */{stat_result.st_size}", **headers}
+                )
+
+        response = StaticFileResponse(
+            served_path,
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+            stat_result=stat_result,
+            method=scope["method"],
+            byte_range=byte_range,
+        )
+
+        if_range = request_headers.get("if-range")
+        if byte_range and if_range and if_range not in (response.headers["etag"], response.headers["last-modified"]):
+            # The client's copy is stale: send the whole file instead of a fragment
+            return self.file_response(full_path, os.stat(path), {**scope, "headers": [
+                (name, value) for name, value in scope["headers"] if name not in (b"range", b"if-range")
+            ]}, status_code)
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
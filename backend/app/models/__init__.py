@@ -1,7 +1,13 @@
 from app.core.database import Base
 from .user import User
-from .product import Product, ProductCategory, ProductImage
+from .product import Product, ProductCategory, ProductImage, ProductSimilarity
 from .order import Order, OrderItem
 from .review import Review
+from .cart import Cart
+from .discount import Discount, DiscountRedemption
+from .activity import RecentlyViewedProduct, WishlistItem
+from .webhook import WebhookDelivery, WebhookEndpoint, WebhookEvent
 
-__all__ = ["Base", "User", "Product", "ProductCategory", "ProductImage", "Order", "OrderItem", "Review"]
+__all__ = ["Base", "User", "Product", "ProductCategory", "ProductImage", "ProductSimilarity", "Order", "OrderItem", "Review", "Cart",
+           "Discount", "DiscountRedemption", "RecentlyViewedProduct", "WishlistItem",
+           "WebhookDelivery", "WebhookEndpoint", "WebhookEvent"]
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class WishlistItem(Base):
+    __tablename__ = "wishlist_items"
+    __table_args__ = (
+        Index("ix_wishlist_items_user_added", "user_id", "created_at"),
+    )
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<WishlistItem(user_id={self.user_id}, product_id={self.product_id})>"
+
+
+class RecentlyViewedProduct(Base):
+    """Last product views per user, written in batches from the in-memory buffer"""
+    __tablename__ = "recently_viewed_products"
+    __table_args__ = (
+        Index("ix_recently_viewed_user_viewed", "user_id", "viewed_at"),
+    )
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    viewed_at = Column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self):
+        return f"<RecentlyViewedProduct(user_id={self.user_id}, product_id={self.product_id})>"
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class Cart(Base):
+    """Server-side cart; a guest cart is found by its token, a customer's by user_id"""
+    __tablename__ = "carts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    token = Column(String(64), unique=True, nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), unique=True)
+    # Compact lines: [[product_id, quantity, unit price when added], ...]
+    items = Column(JSON, nullable=False, default=list)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<Cart(id={self.id}, user_id={self.user_id}, lines={len(self.items or [])})>"
@@ -0,0 +1,65 @@
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey, Enum, JSON, Index, UniqueConstraint
+from sqlalchemy.sql import func
+import enum
+from app.core.database import Base
+
+
+class DiscountType(str, enum.Enum):
+    PERCENTAGE = "percentage"
+    FIXED = "fixed"
+    FREE_SHIPPING = "free_shipping"
+
+
+class Discount(Base):
+    """A discount rule; rules without a code apply automatically to matching carts"""
+    __tablename__ = "discounts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    code = Column(String(50), unique=True, index=True)  # stored upper-case
+    name = Column(String(255), nullable=False)
+    description = Column(Text)
+    type = Column(Enum(DiscountType), nullable=False)
+    value = Column(Float, nullable=False, default=0.0)  # percent (0-100) or amount in EUR
+
+    # Conditions
+    minimum_amount = Column(Float)  # cart subtotal required
+    maximum_discount = Column(Float)  # cap for percentage discounts
+    valid_from = Column(DateTime(timezone=True))
+    valid_until = Column(DateTime(timezone=True))
+    first_order_only = Column(Boolean, default=False)
+    applicable_product_ids = Column(JSON)  # None = every product
+    applicable_category_ids = Column(JSON)  # None = every category
+    excluded_product_ids = Column(JSON)
+
+    # Usage caps; usage_count is only changed by the atomic redemption update
+    usage_limit = Column(Integer)
+    usage_count = Column(Integer, nullable=False, default=0, server_default="0")
+    customer_limit = Column(Integer)
+
+    is_active = Column(Boolean, default=True)
+    is_public = Column(Boolean, default=False)  # listed by /discounts/available
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<Discount(code='{self.code}', type='{self.type}', value={self.value})>"
+
+
+class DiscountRedemption(Base):
+    __tablename__ = "discount_redemptions"
+    __table_args__ = (
+        UniqueConstraint("discount_id", "order_id", name="uq_discount_redemptions_order"),
+        Index("ix_discount_redemptions_customer", "discount_id", "user_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    discount_id = Column(Integer, ForeignKey("discounts.id", ondelete="CASCADE"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    amount = Column(Float, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<DiscountRedemption(discount_id={self.discount_id}, order_id={self.order_id})>"
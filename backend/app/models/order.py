@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, Enum, Boolean
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, Enum, Boolean, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -55,6 +55,7 @@ class Order(Base):
     shipping_cost = Column(Float, default=0.0)
     tax_amount = Column(Float, default=0.0)
     discount_amount = Column(Float, default=0.0)
+    discount_code = Column(String(50))
     total_amount = Column(Float, nullable=False)
     
     # Order status
@@ -82,12 +83,51 @@ class Order(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    @property
+    def shipping_address(self):
+        return {
+            "firstName": self.customer_first_name,
+            "lastName": self.customer_last_name,
+            "street": self.shipping_address_line1,
+            "street2": self.shipping_address_line2,
+            "city": self.shipping_city,
+            "postalCode": self.shipping_postal_code,
+            "country": self.shipping_country,
+        }
+    
+    @property
+    def billing_address(self):
+        if self.billing_same_as_shipping:
+            return None
+        return {
+            "street": self.billing_address_line1,
+            "street2": self.billing_address_line2,
+            "city": self.billing_city,
+            "postalCode": self.billing_postal_code,
+            "country": self.billing_country,
+        }
+    
+    @property
+    def notes(self):
+        return self.customer_notes
+    
     def __repr__(self):
         return f"<Order(number='{self.order_number}', total={self.total_amount})>"
 
 
+# Backs the keyset-paginated order history: one range scan per page, already in display order
+Index("ix_orders_user_created_at", Order.user_id, Order.created_at.desc(), Order.id.desc())
+# Admin dashboard and order list, newest first
+Index("ix_orders_created_at", Order.created_at.desc())
+
+
 class OrderItem(Base):
     __tablename__ = "order_items"
+    __table_args__ = (
+        Index("ix_order_items_order_id", "order_id"),
+        # Foreign key checks when a product is deleted would otherwise scan every order line
+        Index("ix_order_items_product_id", "product_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
@@ -106,5 +146,9 @@ class OrderItem(Base):
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
+    @property
+    def price(self):
+        return self.unit_price
+    
     def __repr__(self):
         return f"<OrderItem(product='{self.product_name}', qty={self.quantity})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey, Enum, JSON, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -56,6 +56,13 @@ class ProductCategory(Base):
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        # Backs sort=trending on the product listing
+        Index("ix_products_active_trending", "is_active", "trending_score"),
+        # Category pages see only active products; this serves admin lookups and
+        # the foreign key check when a category is deleted
+        Index("ix_products_category_id", "category_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
@@ -91,6 +98,9 @@ class Product(Base):
     is_sale = Column(Boolean, default=False)
     is_handmade = Column(Boolean, default=True)
     
+    # Time-decayed sales and review velocity, maintained by app.services.scoring
+    trending_score = Column(Float, nullable=False, default=0.0, server_default="0")
+    
     # Category relationship
     category_id = Column(Integer, ForeignKey("product_categories.id"))
     category = relationship("ProductCategory", back_populates="products")
@@ -108,8 +118,28 @@ class Product(Base):
         return f"<Product(name='{self.name}', price={self.price})>"
 
 
+# The storefront only ever lists active products, newest first; partial indexes keep
+# inactive rows out and let the listing read the first page straight off the index
+Index(
+    "ix_products_active_created", Product.created_at.desc(),
+    postgresql_where=Product.is_active == True, sqlite_where=Product.is_active == True
+)
+Index(
+    "ix_products_active_category_created", Product.category_id, Product.created_at.desc(),
+    postgresql_where=Product.is_active == True, sqlite_where=Product.is_active == True
+)
+Index(
+    "ix_products_active_featured_created", Product.created_at.desc(),
+    postgresql_where=(Product.is_active == True) & (Product.is_featured == True),
+    sqlite_where=(Product.is_active == True) & (Product.is_featured == True)
+)
+
+
 class ProductImage(Base):
     __tablename__ = "product_images"
+    __table_args__ = (
+        Index("ix_product_images_product_sort", "product_id", "sort_order"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
@@ -118,6 +148,12 @@ class ProductImage(Base):
     sort_order = Column(Integer, default=0)
     is_primary = Column(Boolean, default=False)
     
+    # Dimensions of the original and its responsive variants
+    # (list of {"url", "format", "width", "height", "size"})
+    width = Column(Integer)
+    height = Column(Integer)
+    variants = Column(JSON)
+    
     # Product relationship
     product = relationship("Product", back_populates="images")
     
@@ -125,3 +161,19 @@ class ProductImage(Base):
     
     def __repr__(self):
         return f"<ProductImage(product_id={self.product_id}, url='{self.image_url}')>"
+
+
+class ProductSimilarity(Base):
+    """Precomputed top-K content-based neighbours per product (see app.services.similarity)"""
+    __tablename__ = "product_similarities"
+    __table_args__ = (
+        # Deleting a product's reverse pairs, and the cascade when a product is deleted
+        Index("ix_product_similarities_similar_product_id", "similar_product_id"),
+    )
+    
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    similar_product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    score = Column(Float, nullable=False)
+    
+    def __repr__(self):
+        return f"<ProductSimilarity({self.product_id} -> {self.similar_product_id}, score={self.score})>"
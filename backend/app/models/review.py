@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -6,6 +6,11 @@ from app.core.database import Base
 
 class Review(Base):
     __tablename__ = "reviews"
+    __table_args__ = (
+        # Duplicate-review check when a customer submits a review
+        Index("ix_reviews_product_user", "product_id", "user_id"),
+        Index("ix_reviews_user_created", "user_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
@@ -33,3 +38,10 @@ class Review(Base):
     
     def __repr__(self):
         return f"<Review(product_id={self.product_id}, rating={self.rating})>"
+
+
+# Product pages show approved reviews only, newest first
+Index(
+    "ix_reviews_product_approved_created", Review.product_id, Review.created_at.desc(),
+    postgresql_where=Review.is_approved == True, sqlite_where=Review.is_approved == True
+)
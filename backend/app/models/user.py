@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Index
 from sqlalchemy.sql import func
 from app.core.database import Base
 
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Admin customer list, newest first
+        Index("ix_users_created_at", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
@@ -0,0 +1,73 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Enum, JSON, Index
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+import enum
+from app.core.database import Base
+
+
+class DeliveryStatus(str, enum.Enum):
+    PENDING = "pending"
+    DELIVERED = "delivered"
+    FAILED = "failed"
+
+
+class WebhookEndpoint(Base):
+    __tablename__ = "webhook_endpoints"
+
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String(500), nullable=False)
+    secret = Column(String(100), nullable=False)
+    events = Column(JSON, nullable=False)  # event types, or ["*"] for all
+    is_active = Column(Boolean, default=True)
+    max_concurrency = Column(Integer, default=4)  # requests in flight to this endpoint
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<WebhookEndpoint(url='{self.url}')>"
+
+
+class WebhookEvent(Base):
+    """Outbox row, written in the same transaction as the change it describes"""
+    __tablename__ = "webhook_events"
+    __table_args__ = (
+        Index("ix_webhook_events_pending_fanout", "fanned_out", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    event_type = Column(String(100), nullable=False)
+    payload = Column(JSON, nullable=False)
+    fanned_out = Column(Boolean, default=False, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<WebhookEvent(type='{self.event_type}', id={self.id})>"
+
+
+class WebhookDelivery(Base):
+    __tablename__ = "webhook_deliveries"
+    __table_args__ = (
+        Index("ix_webhook_deliveries_due", "status", "next_attempt_at"),
+        # Cascades from deleted events and endpoints, and the delivery log per endpoint
+        Index("ix_webhook_deliveries_event_id", "event_id"),
+        Index("ix_webhook_deliveries_endpoint_id", "endpoint_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    event_id = Column(Integer, ForeignKey("webhook_events.id", ondelete="CASCADE"), nullable=False)
+    endpoint_id = Column(Integer, ForeignKey("webhook_endpoints.id", ondelete="CASCADE"), nullable=False)
+    status = Column(Enum(DeliveryStatus), default=DeliveryStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    last_status_code = Column(Integer)
+    last_error = Column(Text)
+    delivered_at = Column(DateTime(timezone=True))
+
+    event = relationship("WebhookEvent")
+    endpoint = relationship("WebhookEndpoint")
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<WebhookDelivery(event_id={self.event_id}, endpoint_id={self.endpoint_id}, status='{self.status}')>"
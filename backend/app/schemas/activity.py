@@ -0,0 +1,50 @@
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from typing import List, Optional
+from datetime import datetime
+
+
+class ProductCard(BaseModel):
+    id: int
+    name: str
+    slug: str
+    short_description: Optional[str] = None
+    price: float
+    compare_at_price: Optional[float] = None
+    category: Optional[str] = None
+    image_url: Optional[str] = None
+    is_active: bool
+    in_stock: bool
+
+
+class WishlistProduct(ProductCard):
+    added_at: Optional[datetime] = None
+
+
+class RecentlyViewedCard(ProductCard):
+    viewed_at: datetime
+
+
+class WishlistResponse(BaseModel):
+    wishlist: List[WishlistProduct]
+    total: int
+
+
+class RecentlyViewedResponse(BaseModel):
+    products: List[RecentlyViewedCard]
+    total: int
+
+
+class WishlistChange(BaseModel):
+    # One product (the storefront sends productId) or many, e.g. when syncing a guest wishlist on login
+    model_config = ConfigDict(populate_by_name=True)
+    
+    product_id: Optional[int] = Field(None, alias="productId")
+    product_ids: List[int] = Field([], max_length=200)
+    
+    @model_validator(mode="after")
+    def collect_ids(self):
+        if self.product_id is not None:
+            self.product_ids = [self.product_id, *self.product_ids]
+        if not self.product_ids:
+            raise ValueError("product_id or product_ids is required")
+        return self
@@ -0,0 +1,30 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+
+
+class CartItemUpdate(BaseModel):
+    quantity: int = Field(..., ge=0, le=999)  # 0 removes the line
+
+
+class CartLine(BaseModel):
+    product_id: int
+    name: Optional[str] = None
+    slug: Optional[str] = None
+    image_url: Optional[str] = None
+    quantity: int
+    unit_price: Optional[float] = None  # current catalog price
+    compare_at_price: Optional[float] = None
+    added_price: Optional[float] = None  # price when the line was added
+    available_quantity: Optional[int] = None  # None when stock is not limited
+    line_total: float
+    issues: List[str] = []  # unavailable, insufficient_stock, price_changed
+
+
+class CartResponse(BaseModel):
+    token: Optional[str] = None
+    items: List[CartLine]
+    item_count: int
+    subtotal: float
+    has_issues: bool
+    expires_at: Optional[datetime] = None
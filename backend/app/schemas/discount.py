@@ -0,0 +1,130 @@
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+from typing import List, Optional
+from datetime import datetime, timezone
+
+from app.models.discount import DiscountType
+
+
+def _utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def check_rule(type: DiscountType, value: Optional[float], valid_from: Optional[datetime], valid_until: Optional[datetime]):
+    """Consistency checks for a whole rule; updates run them on the stored row merged with the changes"""
+    if type == DiscountType.PERCENTAGE and value is not None and value > 100:
+        raise ValueError("Percentage discounts must be between 0 and 100")
+    if valid_from and valid_until and _utc(valid_from) >= _utc(valid_until):
+        raise ValueError("valid_until must be after valid_from")
+
+
+class DiscountBase(BaseModel):
+    code: Optional[str] = Field(None, min_length=3, max_length=50)  # None = applies automatically
+    name: str
+    description: Optional[str] = None
+    type: DiscountType
+    value: float = Field(0.0, ge=0)
+    minimum_amount: Optional[float] = Field(None, ge=0)
+    maximum_discount: Optional[float] = Field(None, ge=0)
+    valid_from: Optional[datetime] = None
+    valid_until: Optional[datetime] = None
+    first_order_only: bool = False
+    applicable_product_ids: Optional[List[int]] = None
+    applicable_category_ids: Optional[List[int]] = None
+    excluded_product_ids: Optional[List[int]] = None
+    usage_limit: Optional[int] = Field(None, ge=1)
+    customer_limit: Optional[int] = Field(None, ge=1)
+    is_active: bool = True
+    is_public: bool = False
+    
+    @field_validator("code")
+    @classmethod
+    def normalize_code(cls, code: Optional[str]) -> Optional[str]:
+        return code.strip().upper() if code else None
+
+
+class DiscountCreate(DiscountBase):
+    @model_validator(mode="after")
+    def check_value(self):
+        check_rule(self.type, self.value, self.valid_from, self.valid_until)
+        return self
+
+
+class DiscountUpdate(BaseModel):
+    name: Optional[str] = None
+    description: Optional[str] = None
+    value: Optional[float] = Field(None, ge=0)
+    minimum_amount: Optional[float] = Field(None, ge=0)
+    maximum_discount: Optional[float] = Field(None, ge=0)
+    valid_from: Optional[datetime] = None
+    valid_until: Optional[datetime] = None
+    first_order_only: Optional[bool] = None
+    applicable_product_ids: Optional[List[int]] = None
+    applicable_category_ids: Optional[List[int]] = None
+    excluded_product_ids: Optional[List[int]] = None
+    usage_limit: Optional[int] = Field(None, ge=1)
+    customer_limit: Optional[int] = Field(None, ge=1)
+    is_active: Optional[bool] = None
+    is_public: Optional[bool] = None
+
+
+class DiscountResponse(DiscountBase):
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: int
+    usage_count: int
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class PublicDiscount(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
+    code: str
+    name: str
+    description: Optional[str] = None
+    type: DiscountType
+    value: float
+    minimum_amount: Optional[float] = None
+    maximum_discount: Optional[float] = None
+    valid_until: Optional[datetime] = None
+
+
+class DiscountValidateRequest(BaseModel):
+    code: str
+
+
+class DiscountValidateResponse(BaseModel):
+    is_valid: bool
+    discount: PublicDiscount
+
+
+class DiscountCartItem(BaseModel):
+    # Accepts the camelCase keys sent by the storefront as well
+    model_config = ConfigDict(populate_by_name=True)
+    
+    product_id: int = Field(..., alias="productId")
+    quantity: int = Field(..., ge=1)
+
+
+class DiscountApplyRequest(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+    
+    code: Optional[str] = None  # None = best automatic discount only
+    cart_items: List[DiscountCartItem] = Field(..., alias="cartItems", min_length=1, max_length=100)
+
+
+class DiscountApplication(BaseModel):
+    discount_id: int
+    code: Optional[str] = None
+    name: str
+    type: DiscountType
+    value: float
+    applied_amount: float
+    original_amount: float
+    final_amount: float
+    free_shipping: bool
+    is_valid: bool = True
+
+
+class DiscountApplyResponse(BaseModel):
+    discount: Optional[DiscountApplication] = None
@@ -14,6 +14,7 @@ class OrderCreate(BaseModel):
     billing_address: Optional[Dict[str, Any]] = None
     payment_method: str
     notes: Optional[str] = None
+    discount_code: Optional[str] = None
 
 class OrderItemResponse(BaseModel):
     id: int
@@ -42,3 +43,20 @@ class OrderResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+class OrderHistoryResponse(BaseModel):
+    orders: List[OrderResponse]
+    next_cursor: Optional[str] = None  # pass as ?cursor= for the next page; None on the last page
+
+class OrderSummary(BaseModel):
+    """Order without addresses and items, for the account dashboard"""
+    id: int
+    order_number: str
+    status: str
+    total_amount: float
+    item_count: int
+    created_at: datetime
+
+class OrderSummaryHistoryResponse(BaseModel):
+    orders: List[OrderSummary]
+    next_cursor: Optional[str] = None
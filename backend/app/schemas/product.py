@@ -1,8 +1,15 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, computed_field, field_validator
 from typing import List, Optional
 from datetime import datetime
 
 
+class ImageVariantResponse(BaseModel):
+    url: str
+    format: str
+    width: int
+    height: int
+
+
 class ProductImageResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     
@@ -11,6 +18,21 @@ class ProductImageResponse(BaseModel):
     alt_text: Optional[str] = None
     sort_order: int
     is_primary: bool
+    width: Optional[int] = None
+    height: Optional[int] = None
+    variants: Optional[List[ImageVariantResponse]] = None
+    
+    @computed_field
+    @property
+    def srcset(self) -> Optional[str]:
+        """WebP srcset built from the generated variants"""
+        if not self.variants:
+            return None
+        return ", ".join(
+            f"{variant.url} {variant.width}w"
+            for variant in sorted(self.variants, key=lambda variant: variant.width)
+            if variant.format == "webp"
+        ) or None
 
 
 class CategoryResponse(BaseModel):
@@ -53,6 +75,12 @@ class ProductListResponse(BaseModel):
     limit: int
 
 
+class ProductBatchResponse(BaseModel):
+    products: List[ProductResponse]  # in the requested order
+    missing_ids: List[int]
+    missing_slugs: List[str]
+
+
 class ProductCreate(BaseModel):
     name: str
     slug: str
@@ -85,3 +113,65 @@ class ProductUpdate(BaseModel):
     is_new_arrival: Optional[bool] = None
     is_sale: Optional[bool] = None
     is_active: Optional[bool] = None
+
+
+class ProductImportRow(BaseModel):
+    """One product of a bulk import, matched to existing products by slug.
+
+    Only the given fields are written, so a row may update a single column of
+    an existing product; new products need at least a name and a price.
+    ``category`` is a category slug (created if missing, named by
+    ``category_name``), ``images`` replaces the product's image URLs in order.
+    """
+    model_config = ConfigDict(str_strip_whitespace=True)
+    
+    slug: str = Field(..., max_length=255, pattern=r"^[a-z0-9]+(?:-[a-z0-9]+)*$")
+    name: Optional[str] = Field(None, max_length=255)
+    description: Optional[str] = None
+    short_description: Optional[str] = None
+    price: Optional[float] = Field(None, ge=0)
+    compare_at_price: Optional[float] = Field(None, ge=0)
+    cost_price: Optional[float] = Field(None, ge=0)
+    sku: Optional[str] = Field(None, max_length=100)
+    inventory_quantity: Optional[int] = Field(None, ge=0, le=2**31 - 1)
+    track_inventory: Optional[bool] = None
+    allow_backorder: Optional[bool] = None
+    weight: Optional[float] = Field(None, ge=0)
+    material: Optional[str] = Field(None, max_length=255)
+    care_instructions: Optional[str] = None
+    meta_title: Optional[str] = Field(None, max_length=255)
+    meta_description: Optional[str] = None
+    is_active: Optional[bool] = None
+    is_featured: Optional[bool] = None
+    is_bestseller: Optional[bool] = None
+    is_new_arrival: Optional[bool] = None
+    is_sale: Optional[bool] = None
+    is_handmade: Optional[bool] = None
+    category: Optional[str] = Field(None, max_length=100, pattern=r"^[a-z0-9]+(?:-[a-z0-9]+)*$")
+    category_name: Optional[str] = Field(None, max_length=100)
+    images: Optional[List[str]] = None
+    
+    @field_validator("images", mode="before")
+    @classmethod
+    def split_images(cls, value):
+        # CSV cells hold the URLs separated by "|"
+        if isinstance(value, str):
+            value = [url.strip() for url in value.split("|") if url.strip()]
+        if isinstance(value, list) and any(isinstance(url, str) and len(url) > 500 for url in value):
+            raise ValueError("Image URLs are limited to 500 characters")
+        return value
+
+
+class ProductImportError(BaseModel):
+    row: int
+    slug: Optional[str] = None
+    error: str
+
+
+class ProductImportResult(BaseModel):
+    created: int
+    updated: int
+    unchanged: int
+    failed: int
+    errors: List[ProductImportError]  # the first PRODUCT_IMPORT_MAX_ERRORS
+    duration_ms: float
@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+from app.schemas.product import ProductResponse
+
+
+class RecommendedProduct(BaseModel):
+    score: float
+    product: ProductResponse
+
+
+class RecommendationListResponse(BaseModel):
+    product_id: int
+    algorithm: str
+    recommendations: List[RecommendedProduct]
+    total: int
+
+
+class RecommendationIndexStatus(BaseModel):
+    products: int
+    orders: int
+    built_at: Optional[datetime] = None
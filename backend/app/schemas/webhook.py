@@ -0,0 +1,40 @@
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl
+from typing import List, Optional
+from datetime import datetime
+
+
+class WebhookEndpointCreate(BaseModel):
+    url: HttpUrl
+    events: List[str] = ["*"]
+    secret: Optional[str] = Field(None, min_length=16, max_length=100)
+    max_concurrency: int = Field(4, ge=1, le=32)
+
+
+class WebhookEndpointResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: int
+    url: str
+    events: List[str]
+    is_active: bool
+    max_concurrency: int
+    created_at: Optional[datetime] = None
+
+
+class WebhookEndpointCreated(WebhookEndpointResponse):
+    secret: str
+
+
+class WebhookDeliveryResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: int
+    event_id: int
+    endpoint_id: int
+    status: str
+    attempts: int
+    next_attempt_at: Optional[datetime] = None
+    last_status_code: Optional[int] = None
+    last_error: Optional[str] = None
+    delivered_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
@@ -0,0 +1,240 @@
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, delete, func, or_, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import engine, upsert
+from app.core.metrics import registry
+from app.models.activity import RecentlyViewedProduct, WishlistItem
+from app.models.product import Product
+from app.services.catalog import card_query
+
+logger = logging.getLogger("app.activity")
+
+FLUSH_BATCH = 5000
+
+RECENTLY_VIEWED_FLUSHED = registry.counter(
+    "recently_viewed_flushed_total",
+    "Recently viewed rows written from the in-memory buffer"
+)
+
+
+class WishlistFullError(Exception):
+    pass
+
+
+def _aware(value: Optional[datetime]) -> Optional[datetime]:
+    return value.replace(tzinfo=timezone.utc) if value is not None and value.tzinfo is None else value
+
+
+class RecentlyViewedBuffer:
+    """Per-worker write-behind buffer of product views.
+
+    Each user gets a ring buffer of their last ``per_user`` views, so a burst
+    of page views costs memory proportional to the limit, not to traffic, and
+    no I/O at all until the next flush writes every buffered user in one
+    batched upsert.
+    """
+
+    def __init__(self, per_user: int, max_users: int):
+        self.per_user = per_user
+        self.max_users = max_users
+        self._views: Dict[int, Deque[Tuple[int, datetime]]] = {}
+
+    def record(self, user_id: int, product_id: int, viewed_at: Optional[datetime] = None) -> bool:
+        """Buffer a view; returns True once the buffer holds more users than it should"""
+        views = self._views.get(user_id)
+        if views is None:
+            views = self._views[user_id] = deque(maxlen=self.per_user)
+        views.append((product_id, viewed_at or datetime.now(timezone.utc)))
+        return len(self._views) > self.max_users
+
+    def pending(self, user_id: int) -> Dict[int, datetime]:
+        """Latest unflushed view per product for one user"""
+        return {product_id: viewed_at for product_id, viewed_at in self._views.get(user_id, ())}
+
+    def discard(self, user_id: int):
+        self._views.pop(user_id, None)
+
+    def drain(self) -> Dict[int, Deque[Tuple[int, datetime]]]:
+        views, self._views = self._views, {}
+        return views
+
+    def __len__(self):
+        return len(self._views)
+
+
+buffer = RecentlyViewedBuffer(settings.RECENTLY_VIEWED_LIMIT, settings.RECENTLY_VIEWED_MAX_BUFFERED_USERS)
+_flush_lock = asyncio.Lock()
+_early_flush: Optional[asyncio.Task] = None
+
+
+def record_view(user_id: int, product_id: int):
+    """Remember a product view; written to the database by the next flush"""
+    global _early_flush
+    if buffer.record(user_id, product_id) and (_early_flush is None or _early_flush.done()):
+        _early_flush = asyncio.create_task(flush_recently_viewed())
+
+
+async def _write_views(views: Dict[int, Deque[Tuple[int, datetime]]]) -> int:
+    """Upsert the views in one transaction and trim each of their users to the limit"""
+    rows = {}
+    for user_id, user_views in views.items():
+        for product_id, viewed_at in user_views:
+            rows[user_id, product_id] = viewed_at
+
+    async with engine.begin() as conn:
+        # Views of unknown products (bad ids from clients) would fail the whole batch
+        known = set((await conn.execute(
+            select(Product.id).where(Product.id.in_({product_id for _, product_id in rows}))
+        )).scalars())
+        rows = [
+            {"user_id": user_id, "product_id": product_id, "viewed_at": viewed_at}
+            for (user_id, product_id), viewed_at in rows.items()
+            if product_id in known
+        ]
+        for start in range(0, len(rows), FLUSH_BATCH):
+            statement = upsert(RecentlyViewedProduct).values(rows[start:start + FLUSH_BATCH])
+            await conn.execute(statement.on_conflict_do_update(
+                index_elements=["user_id", "product_id"],
+                set_={"viewed_at": statement.excluded.viewed_at}
+            ))
+
+        user_ids = list(views)
+        for start in range(0, len(user_ids), FLUSH_BATCH):
+            ranked = (
+                select(
+                    RecentlyViewedProduct.user_id,
+                    RecentlyViewedProduct.product_id,
+                    func.row_number().over(
+                        partition_by=RecentlyViewedProduct.user_id,
+                        order_by=RecentlyViewedProduct.viewed_at.desc()
+                    ).label("position")
+                )
+                .where(RecentlyViewedProduct.user_id.in_(user_ids[start:start + FLUSH_BATCH]))
+                .subquery()
+            )
+            await conn.execute(
+                delete(RecentlyViewedProduct).where(
+                    tuple_(RecentlyViewedProduct.user_id, RecentlyViewedProduct.product_id).in_(
+                        select(ranked.c.user_id, ranked.c.product_id).where(ranked.c.position > settings.RECENTLY_VIEWED_LIMIT)
+                    )
+                )
+            )
+    return len(rows)
+
+
+def _rebuffer(views: Dict[int, Deque[Tuple[int, datetime]]]):
+    """Put unwritten views back; views recorded since the drain win"""
+    for user_id, user_views in views.items():
+        newer = buffer.pending(user_id)
+        for product_id, viewed_at in user_views:
+            if product_id not in newer:
+                buffer.record(user_id, product_id, viewed_at)
+
+
+async def flush_recently_viewed() -> int:
+    """Write buffered views with batched upserts and trim each flushed user to the limit"""
+    async with _flush_lock:
+        views = buffer.drain()
+        if not views:
+            return 0
+        try:
+            try:
+                written = await _write_views(views)
+            except IntegrityError:
+                # e.g. a user deleted since the view; retry user by user and drop only the failing ones
+                written = 0
+                for user_id in list(views):
+                    try:
+                        written += await _write_views({user_id: views[user_id]})
+                    except IntegrityError:
+                        logger.warning("Dropped %d buffered recently viewed rows of user %d", len(views[user_id]), user_id)
+                    del views[user_id]
+        except BaseException:
+            # Also on cancellation (job timeout, shutdown), which would otherwise lose the drained views;
+            # they are retried on the next flush
+            _rebuffer(views)
+            raise
+
+        RECENTLY_VIEWED_FLUSHED.inc(written)
+        return written
+
+
+async def get_recently_viewed(db: AsyncSession, user_id: int, limit: int) -> List[dict]:
+    """Stored and still-buffered views as product cards, newest first, in one query"""
+    pending = buffer.pending(user_id)
+    query = (
+        card_query(RecentlyViewedProduct.viewed_at)
+        .outerjoin(RecentlyViewedProduct, and_(
+            RecentlyViewedProduct.product_id == Product.id,
+            RecentlyViewedProduct.user_id == user_id
+        ))
+        .where(
+            or_(RecentlyViewedProduct.user_id == user_id, Product.id.in_(pending.keys())),
+            Product.is_active == True
+        )
+    )
+    cards = []
+    for row in await db.execute(query):
+        card = dict(row._mapping)
+        card["viewed_at"] = max(
+            (viewed_at for viewed_at in (_aware(row.viewed_at), pending.get(row.id)) if viewed_at is not None)
+        )
+        cards.append(card)
+    cards.sort(key=lambda card: card["viewed_at"], reverse=True)
+    return cards[:limit]
+
+
+async def clear_recently_viewed(db: AsyncSession, user_id: int):
+    buffer.discard(user_id)
+    await db.execute(delete(RecentlyViewedProduct).where(RecentlyViewedProduct.user_id == user_id))
+
+
+async def get_wishlist(db: AsyncSession, user_id: int) -> List[dict]:
+    """Wishlist as product cards, most recently added first, in one query"""
+    result = await db.execute(
+        card_query(WishlistItem.created_at.label("added_at"))
+        .join(WishlistItem, WishlistItem.product_id == Product.id)
+        .where(WishlistItem.user_id == user_id)
+        .order_by(WishlistItem.created_at.desc(), Product.id)
+    )
+    return [dict(row._mapping) for row in result]
+
+
+async def add_to_wishlist(db: AsyncSession, user_id: int, product_ids: Sequence[int]) -> int:
+    """Add products with one bulk upsert; already wished products are skipped. Returns rows added."""
+    product_ids = list(dict.fromkeys(product_ids))
+    existing = set((await db.execute(
+        select(Product.id).where(Product.id.in_(product_ids), Product.is_active == True)
+    )).scalars())
+    rows = [{"user_id": user_id, "product_id": product_id} for product_id in product_ids if product_id in existing]
+    if not rows:
+        return 0
+
+    count = await db.scalar(select(func.count()).select_from(WishlistItem).where(WishlistItem.user_id == user_id))
+    if count + len(rows) > settings.WISHLIST_MAX_ITEMS:
+        already = set((await db.execute(
+            select(WishlistItem.product_id).where(WishlistItem.user_id == user_id, WishlistItem.product_id.in_(existing))
+        )).scalars())
+        if count + len([row for row in rows if row["product_id"] not in already]) > settings.WISHLIST_MAX_ITEMS:
+            raise WishlistFullError(f"A wishlist holds at most {settings.WISHLIST_MAX_ITEMS} products")
+
+    result = await db.execute(
+        upsert(WishlistItem).values(rows).on_conflict_do_nothing(index_elements=["user_id", "product_id"])
+    )
+    return result.rowcount
+
+
+async def remove_from_wishlist(db: AsyncSession, user_id: int, product_ids: Optional[Sequence[int]] = None) -> int:
+    """Remove the given products, or everything when ``product_ids`` is None"""
+    statement = delete(WishlistItem).where(WishlistItem.user_id == user_id)
+    if product_ids is not None:
+        statement = statement.where(WishlistItem.product_id.in_(product_ids))
+    return (await db.execute(statement)).rowcount
@@ -0,0 +1,174 @@
+import logging
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import engine, upsert
+from app.models.cart import Cart
+from app.models.product import Product
+from app.models.user import User
+from app.services.catalog import primary_image_url
+
+logger = logging.getLogger("app.cart")
+
+CLEANUP_BATCH = 5000
+
+# Line problems reported by revalidation
+UNAVAILABLE = "unavailable"
+INSUFFICIENT_STOCK = "insufficient_stock"
+PRICE_CHANGED = "price_changed"
+
+def _expiry(user: Optional[User]) -> datetime:
+    days = settings.CART_USER_TTL_DAYS if user else settings.CART_GUEST_TTL_DAYS
+    return datetime.now(timezone.utc) + timedelta(days=days)
+
+
+async def get_cart(db: AsyncSession, user: Optional[User], token: Optional[str]) -> Optional[Cart]:
+    """The customer's cart when logged in, otherwise the guest cart for ``token``"""
+    if user is not None:
+        query = select(Cart).where(Cart.user_id == user.id)
+    elif token:
+        query = select(Cart).where(Cart.token == token, Cart.user_id.is_(None))
+    else:
+        return None
+    cart = (await db.execute(query)).scalar_one_or_none()
+    if cart is not None and cart.expires_at.replace(tzinfo=cart.expires_at.tzinfo or timezone.utc) < datetime.now(timezone.utc):
+        # Expired but not cleaned up yet
+        await db.delete(cart)
+        return None
+    return cart
+
+
+async def get_or_create_cart(db: AsyncSession, user: Optional[User], token: Optional[str]) -> Cart:
+    cart = await get_cart(db, user, token)
+    if cart is not None:
+        return cart
+    if user is None:
+        # A fresh random token cannot collide
+        cart = Cart(token=secrets.token_urlsafe(32), items=[], expires_at=_expiry(None))
+        db.add(cart)
+        return cart
+
+    # Two first writes of the same customer can race here; carts.user_id is unique,
+    # so insert if absent and load whichever row won. Flush a pending expired-cart delete first.
+    await db.flush()
+    await db.execute(
+        upsert(Cart)
+        .values(token=secrets.token_urlsafe(32), user_id=user.id, items=[], expires_at=_expiry(user))
+        .on_conflict_do_nothing(index_elements=[Cart.user_id])
+    )
+    return (await db.execute(select(Cart).where(Cart.user_id == user.id))).scalar_one()
+
+
+def set_quantity(cart: Cart, user: Optional[User], product_id: int, quantity: int, unit_price: Optional[float] = None):
+    """Set a line's quantity (0 removes it); the price is remembered so later price changes can be flagged"""
+    lines = [line for line in cart.items if line[0] != product_id]
+    if quantity > 0:
+        previous = next((line for line in cart.items if line[0] == product_id), None)
+        lines.append([product_id, min(quantity, settings.CART_MAX_QUANTITY), unit_price if unit_price is not None else previous[2]])
+    # Assign a new list so the JSON column is marked dirty
+    cart.items = lines
+    cart.expires_at = _expiry(user)
+
+
+async def merge_guest_cart(db: AsyncSession, user: User, token: Optional[str]):
+    """Fold the guest cart into the customer's cart on login; the caller commits"""
+    guest = await get_cart(db, None, token)
+    if guest is None:
+        return
+    own = await get_cart(db, user, None)
+    if own is None:
+        # The unit of work would write the UPDATE before the pending delete of an
+        # expired customer cart and break the unique user_id; delete it first
+        await db.flush()
+        guest.user_id = user.id
+        guest.expires_at = _expiry(user)
+        return
+
+    lines = {line[0]: list(line) for line in own.items}
+    for product_id, quantity, unit_price in guest.items:
+        if product_id in lines:
+            lines[product_id][1] = min(lines[product_id][1] + quantity, settings.CART_MAX_QUANTITY)
+        else:
+            lines[product_id] = [product_id, quantity, unit_price]
+    own.items = list(lines.values())[:settings.CART_MAX_LINES]
+    own.expires_at = _expiry(user)
+    await db.delete(guest)
+
+
+async def revalidate(db: AsyncSession, cart: Optional[Cart]) -> dict:
+    """Price and stock every line against the catalog with a single query"""
+    stored: List[list] = cart.items if cart is not None else []
+    products = {}
+    if stored:
+        result = await db.execute(
+            select(
+                Product.id, Product.name, Product.slug, Product.price, Product.compare_at_price, Product.is_active,
+                Product.inventory_quantity, Product.track_inventory, Product.allow_backorder,
+                primary_image_url.label("image_url")
+            ).where(Product.id.in_([line[0] for line in stored]))
+        )
+        products = {row.id: row for row in result}
+
+    lines = []
+    subtotal = 0.0
+    for product_id, quantity, added_price in stored:
+        product = products.get(product_id)
+        issues = []
+        available_quantity = None
+        if product is None or not product.is_active:
+            issues.append(UNAVAILABLE)
+        else:
+            if product.track_inventory and not product.allow_backorder:
+                available_quantity = max(product.inventory_quantity or 0, 0)
+                if available_quantity == 0:
+                    issues.append(UNAVAILABLE)
+                elif available_quantity < quantity:
+                    issues.append(INSUFFICIENT_STOCK)
+            if added_price is not None and abs(product.price - added_price) > 0.005:
+                issues.append(PRICE_CHANGED)
+
+        purchasable = 0 if UNAVAILABLE in issues else min(quantity, available_quantity if available_quantity is not None else quantity)
+        line_total = round(product.price * purchasable, 2) if product is not None else 0.0
+        subtotal += line_total
+        lines.append({
+            "product_id": product_id,
+            "name": product.name if product else None,
+            "slug": product.slug if product else None,
+            "image_url": product.image_url if product else None,
+            "quantity": quantity,
+            "unit_price": product.price if product else None,
+            "compare_at_price": product.compare_at_price if product else None,
+            "added_price": added_price,
+            "available_quantity": available_quantity,
+            "line_total": line_total,
+            "issues": issues,
+        })
+
+    return {
+        "token": cart.token if cart is not None else None,
+        "items": lines,
+        "item_count": sum(line["quantity"] for line in lines),
+        "subtotal": round(subtotal, 2),
+        "has_issues": any(line["issues"] for line in lines),
+        "expires_at": cart.expires_at if cart is not None else None,
+    }
+
+
+async def delete_expired_carts() -> int:
+    """Delete expired carts in batches so the cleanup never holds long locks"""
+    deleted = 0
+    while True:
+        async with engine.begin() as conn:
+            expired = select(Cart.id).where(Cart.expires_at < datetime.now(timezone.utc)).limit(CLEANUP_BATCH)
+            result = await conn.execute(delete(Cart).where(Cart.id.in_(expired)))
+        deleted += result.rowcount
+        if result.rowcount < CLEANUP_BATCH:
+            break
+    if deleted:
+        logger.info("Deleted %d expired carts", deleted)
+    return deleted
@@ -0,0 +1,33 @@
+from sqlalchemy import or_, select
+
+from app.models.product import Product, ProductCategory, ProductImage
+
+# Primary image of the product in the enclosing query, without loading the images relationship
+primary_image_url = (
+    select(ProductImage.image_url)
+    .where(ProductImage.product_id == Product.id)
+    .order_by(ProductImage.is_primary.desc(), ProductImage.sort_order, ProductImage.id)
+    .limit(1)
+    .correlate(Product)
+    .scalar_subquery()
+)
+
+in_stock = or_(
+    Product.track_inventory == False,
+    Product.allow_backorder == True,
+    Product.inventory_quantity > 0
+)
+
+# Columns of a product card (lists, wishlist, recently viewed); see card_query
+CARD_COLUMNS = (
+    Product.id, Product.name, Product.slug, Product.short_description, Product.price, Product.compare_at_price,
+    Product.is_active, in_stock.label("in_stock"), ProductCategory.name.label("category"),
+    primary_image_url.label("image_url"),
+)
+
+
+def card_query(*extra_columns):
+    """SELECT of product card columns (plus ``extra_columns``) with the category joined"""
+    return select(*CARD_COLUMNS, *extra_columns).select_from(Product).outerjoin(
+        ProductCategory, ProductCategory.id == Product.category_id
+    )
@@ -0,0 +1,329 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, FrozenSet, List, NamedTuple, Optional
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.discount import Discount, DiscountRedemption, DiscountType
+from app.models.order import Order, OrderStatus
+from app.models.product import Product
+from app.models.user import User
+
+logger = logging.getLogger("app.discounts")
+
+
+class DiscountError(Exception):
+    """A discount code that cannot be applied; the message is shown to the customer"""
+
+
+class CartLine(NamedTuple):
+    product_id: int
+    category_id: Optional[int]
+    quantity: int
+    unit_price: float
+
+
+def _aware(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite hands back naive datetimes
+    return value.replace(tzinfo=timezone.utc) if value is not None and value.tzinfo is None else value
+
+
+def _ids(values) -> Optional[FrozenSet[int]]:
+    return frozenset(int(value) for value in values) if values else None
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    """A discount row reduced to what evaluation needs, with scopes as frozensets"""
+    id: int
+    code: Optional[str]
+    name: str
+    type: DiscountType
+    value: float
+    minimum_amount: Optional[float]
+    maximum_discount: Optional[float]
+    valid_from: Optional[datetime]
+    valid_until: Optional[datetime]
+    first_order_only: bool
+    usage_limit: Optional[int]
+    customer_limit: Optional[int]
+    products: Optional[FrozenSet[int]]
+    categories: Optional[FrozenSet[int]]
+    excluded: FrozenSet[int]
+
+    @classmethod
+    def compile(cls, discount: Discount) -> "CompiledRule":
+        return cls(
+            id=discount.id,
+            code=discount.code,
+            name=discount.name,
+            type=discount.type,
+            value=discount.value or 0.0,
+            minimum_amount=discount.minimum_amount,
+            maximum_discount=discount.maximum_discount,
+            valid_from=_aware(discount.valid_from),
+            valid_until=_aware(discount.valid_until),
+            first_order_only=bool(discount.first_order_only),
+            usage_limit=discount.usage_limit,
+            customer_limit=discount.customer_limit,
+            products=_ids(discount.applicable_product_ids),
+            categories=_ids(discount.applicable_category_ids),
+            excluded=_ids(discount.excluded_product_ids) or frozenset(),
+        )
+
+    @property
+    def scoped(self) -> bool:
+        return self.products is not None or self.categories is not None
+
+    def is_live(self, now: datetime) -> bool:
+        return (self.valid_from is None or self.valid_from <= now) and (self.valid_until is None or now <= self.valid_until)
+
+    def covers(self, line: CartLine) -> bool:
+        if line.product_id in self.excluded:
+            return False
+        if not self.scoped:
+            return True
+        return (self.products is not None and line.product_id in self.products) or \
+            (self.categories is not None and line.category_id in self.categories)
+
+    def eligible_subtotal(self, lines: List[CartLine]) -> float:
+        return sum(line.unit_price * line.quantity for line in lines if self.covers(line))
+
+    def amount(self, lines: List[CartLine], subtotal: float) -> float:
+        """Discount for a cart; percentage and fixed rules only reduce the lines they cover"""
+        eligible = self.eligible_subtotal(lines)
+        if self.type == DiscountType.PERCENTAGE:
+            amount = eligible * self.value / 100
+            if self.maximum_discount is not None:
+                amount = min(amount, self.maximum_discount)
+        elif self.type == DiscountType.FIXED:
+            amount = min(self.value, eligible)
+        else:
+            amount = 0.0  # free shipping is applied to the shipping cost
+        # Never more than the covered lines, whatever the stored rule says
+        return round(min(max(amount, 0.0), eligible), 2)
+
+
+@dataclass(frozen=True)
+class DiscountApplication:
+    rule: CompiledRule
+    amount: float
+    eligible_subtotal: float
+
+    @property
+    def free_shipping(self) -> bool:
+        return self.rule.type == DiscountType.FREE_SHIPPING
+
+
+class RuleIndex:
+    """Active rules indexed so a cart only looks at the rules that can apply to it.
+
+    Coded rules are found by code; automatic (code-less) rules are bucketed by
+    the products and categories they are scoped to, with unscoped rules in a
+    short list every cart checks.
+    """
+
+    def __init__(self, rules: List[CompiledRule]):
+        self.by_code: Dict[str, CompiledRule] = {}
+        self.by_product: Dict[int, List[CompiledRule]] = defaultdict(list)
+        self.by_category: Dict[int, List[CompiledRule]] = defaultdict(list)
+        self.unscoped: List[CompiledRule] = []
+        for rule in rules:
+            if rule.code:
+                self.by_code[rule.code] = rule
+                continue
+            if not rule.scoped:
+                self.unscoped.append(rule)
+            for product_id in rule.products or ():
+                self.by_product[product_id].append(rule)
+            for category_id in rule.categories or ():
+                self.by_category[category_id].append(rule)
+        self.size = len(rules)
+
+    def automatic_candidates(self, lines: List[CartLine]) -> List[CompiledRule]:
+        candidates = {rule.id: rule for rule in self.unscoped}
+        for line in lines:
+            for rule in self.by_product.get(line.product_id, ()):
+                candidates[rule.id] = rule
+            for rule in self.by_category.get(line.category_id, ()):
+                candidates[rule.id] = rule
+        return list(candidates.values())
+
+
+_index: Optional[RuleIndex] = None
+_loaded_at = 0.0
+_lock = asyncio.Lock()
+
+
+async def get_rule_index() -> RuleIndex:
+    """The compiled rules of this worker, reloaded after DISCOUNT_INDEX_TTL seconds or an invalidation"""
+    global _index, _loaded_at
+    if _index is not None and time.monotonic() - _loaded_at < settings.DISCOUNT_INDEX_TTL:
+        return _index
+    async with _lock:
+        if _index is None or time.monotonic() - _loaded_at >= settings.DISCOUNT_INDEX_TTL:
+            now = datetime.now(timezone.utc)
+            async with engine.connect() as conn:
+                result = await conn.execute(
+                    select(Discount).where(
+                        Discount.is_active == True,
+                        or_(Discount.valid_until.is_(None), Discount.valid_until >= now)
+                    )
+                )
+                rules = [CompiledRule.compile(row) for row in result]
+            _index = RuleIndex(rules)
+            _loaded_at = time.monotonic()
+            logger.debug("Loaded %d discount rules", len(rules))
+    return _index
+
+
+def invalidate_index():
+    """Force a reload on the next lookup; other workers pick changes up within DISCOUNT_INDEX_TTL"""
+    global _loaded_at
+    _loaded_at = 0.0
+
+
+async def _usage_error(db: AsyncSession, rule: CompiledRule, user: Optional[User], order_id: Optional[int] = None) -> Optional[str]:
+    """Check the caps that depend on stored usage; returns why the rule cannot be used"""
+    if rule.usage_limit is not None:
+        usage_count = await db.scalar(select(Discount.usage_count).where(Discount.id == rule.id))
+        if usage_count is not None and usage_count >= rule.usage_limit:
+            return "This discount has been fully redeemed"
+    if rule.first_order_only:
+        if user is None:
+            return "Log in to use this discount"
+        previous_orders = await db.scalar(
+            select(func.count()).select_from(Order).where(
+                Order.user_id == user.id,
+                Order.status.notin_((OrderStatus.CANCELLED, OrderStatus.REFUNDED)),
+                Order.id != (order_id or 0)
+            )
+        )
+        if previous_orders:
+            return "This discount is only valid for your first order"
+    if rule.customer_limit is not None:
+        if user is None:
+            return "Log in to use this discount"
+        redemptions = await db.scalar(
+            select(func.count()).select_from(DiscountRedemption).where(
+                DiscountRedemption.discount_id == rule.id,
+                DiscountRedemption.user_id == user.id
+            )
+        )
+        if redemptions >= rule.customer_limit:
+            return "You have already used this discount"
+    return None
+
+
+async def load_cart_lines(db: AsyncSession, quantities: Dict[int, int]) -> List[CartLine]:
+    """Price cart lines from the catalog; unknown or inactive products are left out"""
+    result = await db.execute(
+        select(Product.id, Product.category_id, Product.price)
+        .where(Product.id.in_(quantities.keys()), Product.is_active == True)
+    )
+    return [CartLine(row.id, row.category_id, quantities[row.id], row.price) for row in result]
+
+
+async def find_code(code: str) -> CompiledRule:
+    rule = (await get_rule_index()).by_code.get(code.strip().upper())
+    if rule is None or not rule.is_live(datetime.now(timezone.utc)):
+        raise DiscountError("Invalid or expired discount code")
+    return rule
+
+
+async def validate_code(db: AsyncSession, code: str, user: Optional[User]) -> CompiledRule:
+    """Check a code without a cart: it exists, is live and its usage caps allow this customer"""
+    rule = await find_code(code)
+    error = await _usage_error(db, rule, user)
+    if error:
+        raise DiscountError(error)
+    return rule
+
+
+async def best_discount(
+    db: AsyncSession,
+    lines: List[CartLine],
+    user: Optional[User],
+    code: Optional[str] = None
+) -> Optional[DiscountApplication]:
+    """The largest applicable discount for a cart; discounts do not stack.
+
+    A given code must apply (otherwise DiscountError explains why), but an
+    automatic discount still wins if it is worth more.
+    """
+    index = await get_rule_index()
+    now = datetime.now(timezone.utc)
+    subtotal = sum(line.unit_price * line.quantity for line in lines)
+
+    applications = []
+    if code:
+        rule = await find_code(code)
+        eligible = rule.eligible_subtotal(lines)
+        if eligible <= 0:
+            raise DiscountError("This discount does not apply to the products in your cart")
+        if rule.minimum_amount is not None and subtotal < rule.minimum_amount:
+            raise DiscountError(f"This discount requires a minimum order of {rule.minimum_amount:.2f} €")
+        error = await _usage_error(db, rule, user)
+        if error:
+            raise DiscountError(error)
+        applications.append(DiscountApplication(rule, rule.amount(lines, subtotal), eligible))
+
+    automatic = []
+    for rule in index.automatic_candidates(lines):
+        if not rule.is_live(now) or (rule.minimum_amount is not None and subtotal < rule.minimum_amount):
+            continue
+        eligible = rule.eligible_subtotal(lines)
+        if eligible > 0:
+            automatic.append(DiscountApplication(rule, rule.amount(lines, subtotal), eligible))
+    # Only the best automatic rules need their usage checked
+    for application in sorted(automatic, key=lambda application: application.amount, reverse=True):
+        if applications and application.amount <= applications[0].amount:
+            break
+        if await _usage_error(db, application.rule, user) is None:
+            applications.append(application)
+            break
+
+    if not applications:
+        return None
+    return max(applications, key=lambda application: (application.amount, application.free_shipping))
+
+
+async def redeem(db: AsyncSession, application: DiscountApplication, order: Order, user: Optional[User]):
+    """Count a redemption inside the order's transaction.
+
+    The global cap is enforced by a conditional increment, so concurrent
+    checkouts can never push usage_count past usage_limit. Per-customer caps
+    lock the customer's row first, which serializes that customer's checkouts.
+    """
+    rule = application.rule
+    if user is not None and (rule.customer_limit is not None or rule.first_order_only):
+        await db.execute(select(User.id).where(User.id == user.id).with_for_update())
+        error = await _usage_error(db, rule, user, order_id=order.id)
+        if error:
+            raise DiscountError(error)
+
+    result = await db.execute(
+        update(Discount)
+        .where(
+            Discount.id == rule.id,
+            Discount.is_active == True,
+            or_(Discount.usage_limit.is_(None), Discount.usage_count < Discount.usage_limit)
+        )
+        .values(usage_count=Discount.usage_count + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        raise DiscountError("This discount has been fully redeemed")
+    db.add(DiscountRedemption(
+        discount_id=rule.id,
+        order_id=order.id,
+        user_id=user.id if user else None,
+        amount=application.amount
+    ))
@@ -0,0 +1,108 @@
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict
+
+from app.services import images
+
+
+class ImageCache:
+    """Disk cache of resized images with LRU eviction by total size.
+
+    The LRU order lives in memory and is rebuilt from file access times on first
+    use. Concurrent requests for the same variant share a single render.
+
+    Every worker process keeps its own LRU over the shared directory, so disk use
+    can reach workers x ``max_bytes`` and a worker may delete a file another one
+    still lists; a missing file is simply rendered again.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._loaded = False
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def _load(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        files = []
+        for path in self.directory.rglob("*"):
+            if path.is_file() and not path.name.endswith(".tmp"):
+                stat = path.stat()
+                files.append((stat.st_atime, str(path), stat.st_size))
+        for _, path, size in sorted(files):
+            self._entries[path] = size
+            self._total_bytes += size
+        self._loaded = True
+        self._evict()
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and self._entries:
+            path, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    def _add(self, path: str, size: int):
+        previous = self._entries.pop(path, None)
+        if previous is not None:
+            self._total_bytes -= previous
+        self._entries[path] = size
+        self._total_bytes += size
+        self._evict()
+
+    def path_for(self, source: Path, width: int, height: int, image_format: str) -> Path:
+        # The source mtime is part of the key, so replacing an image invalidates its variants
+        stat = source.stat()
+        key = f"{source}:{stat.st_mtime_ns}:{stat.st_size}:{width}x{height}:{image_format}"
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        extension = {"WEBP": "webp", "JPEG": "jpg", "PNG": "png"}[image_format]
+        return self.directory / digest[:2] / f"{digest}.{extension}"
+
+    async def get(self, source: Path, width: int, height: int, image_format: str) -> Path:
+        """Return the cached variant, rendering it off the event loop on a miss"""
+        if not self._loaded:
+            self._load()
+
+        path = self.path_for(source, width, height, image_format)
+        key = str(path)
+        if key in self._entries and path.exists():
+            self._entries.move_to_end(key)
+            return path
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The request doing the render went away; render it ourselves
+                return await self.get(source, width, height, image_format)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            size = await images.run_in_pool(
+                images.render_resized, str(source), key, width, height, image_format
+            )
+            self._add(key, size)
+            future.set_result(path)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting for it
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+        return path
@@ -0,0 +1,170 @@
+import asyncio
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+import aiofiles
+from PIL import Image, ImageOps
+
+from app.core.config import settings
+
+
+# Formats generated for every width, in <picture> preference order
+VARIANT_FORMATS = (("webp", "WEBP"), ("jpg", "JPEG"))
+
+CHUNK_SIZE = 1024 * 1024
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+class ImageTooLargeError(Exception):
+    pass
+
+
+class InvalidImageError(Exception):
+    pass
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Process pool for CPU-bound image work, created on first use"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.IMAGE_PROCESS_WORKERS)
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+
+async def run_in_pool(func, *args):
+    """Run a picklable function in the image process pool without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), func, *args)
+
+
+def static_url(path: Path) -> str:
+    """Map a file below the static directory to its public /static URL"""
+    return "/" + Path(os.path.relpath(path)).as_posix()
+
+
+async def save_upload(upload, directory: Path, max_size: int) -> tuple:
+    """Stream an upload to ``directory`` in chunks, hashing it on the way.
+
+    Returns ``(path, sha256 hex digest)``. The file is stored under a temporary
+    name and only renamed to its content hash once it has been fully written.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    tmp_path = directory / f".upload-{os.getpid()}-{id(upload)}"
+    try:
+        async with aiofiles.open(tmp_path, "wb") as out:
+            while chunk := await upload.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_size:
+                    raise ImageTooLargeError(f"Upload exceeds {max_size} bytes")
+                digest.update(chunk)
+                await out.write(chunk)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    content_hash = digest.hexdigest()
+    path = directory / f"{content_hash[:16]}.orig"
+    os.replace(tmp_path, path)
+    return path, content_hash
+
+
+def _flatten(image: Image.Image) -> Image.Image:
+    """JPEG has no alpha channel: composite transparent images onto white"""
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        rgba = image.convert("RGBA")
+        background = Image.new("RGB", rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.split()[-1])
+        return background
+    return image.convert("RGB")
+
+
+def generate_variants(source: str, output_dir: str, name: str, widths: List[int]) -> dict:
+    """Decode ``source`` once and write WebP/JPEG variants for every width.
+
+    Runs in a worker process. Filenames are derived from the content hash, so an
+    existing variant is never rewritten and can be served as immutable.
+    """
+    try:
+        with Image.open(source) as probe:
+            probe.verify()
+    except Exception:
+        raise InvalidImageError("Uploaded file is not a valid image")
+
+    with Image.open(source) as original:
+        image = _flatten(ImageOps.exif_transpose(original))
+
+    width, height = image.size
+    targets = sorted({w for w in widths if w < width} | {min(width, max(widths))})
+
+    variants = []
+    for target in targets:
+        target_height = round(height * target / width)
+        resized = image if target == width else image.resize((target, target_height), Image.LANCZOS)
+        for extension, image_format in VARIANT_FORMATS:
+            path = Path(output_dir) / f"{name}-{target}w.{extension}"
+            if not path.exists():
+                tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+                if image_format == "WEBP":
+                    resized.save(tmp_path, image_format, quality=settings.IMAGE_WEBP_QUALITY, method=4)
+                else:
+                    resized.save(
+                        tmp_path, image_format,
+                        quality=settings.IMAGE_JPEG_QUALITY, optimize=True, progressive=True
+                    )
+                os.replace(tmp_path, path)
+            variants.append({
+                "path": str(path),
+                "format": extension,
+                "width": target,
+                "height": target_height,
+                "size": path.stat().st_size,
+            })
+
+    return {"width": width, "height": height, "variants": variants}
+
+
+
+def render_resized(source: str, destination: str, width: int, height: int, image_format: str) -> int:
+    """Fit ``source`` into width x height (0 = unconstrained) and encode it; runs in a worker process.
+
+    Never upscales. Returns the size of the written file in bytes. Raises
+    InvalidImageError when ``source`` cannot be decoded.
+    """
+    try:
+        with Image.open(source) as original:
+            image = ImageOps.exif_transpose(original)
+            image.thumbnail((width or image.width, height or image.height), Image.LANCZOS)
+    except (OSError, Image.DecompressionBombError) as e:
+        # UnidentifiedImageError and truncated data are both OSErrors
+        raise InvalidImageError(f"Cannot decode {source}: {e}")
+    if image_format == "JPEG":
+        image = _flatten(image)
+    elif image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA")
+
+    tmp_path = f"{destination}.{os.getpid()}.tmp"
+    try:
+        if image_format == "WEBP":
+            image.save(tmp_path, image_format, quality=settings.IMAGE_WEBP_QUALITY, method=4)
+        elif image_format == "JPEG":
+            image.save(tmp_path, image_format, quality=settings.IMAGE_JPEG_QUALITY, optimize=True, progressive=True)
+        else:
+            image.save(tmp_path, image_format, optimize=True)
+        os.replace(tmp_path, destination)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+    return os.path.getsize(destination)
@@ -0,0 +1,181 @@
+import asyncio
+import json
+import logging
+import random
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Optional, Set
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.metrics import registry
+from app.core.server import on_drain
+
+logger = logging.getLogger("app.order_events")
+
+CHANNEL = "order_status"
+
+# Sent to every local subscriber after the LISTEN connection was re-established: refetch, events may be lost
+RESYNC = {"type": "resync"}
+# Put on every queue when the worker shuts down: streams end and clients reconnect to another worker
+CLOSE = {"type": "close"}
+
+ORDER_EVENT_SUBSCRIBERS = registry.gauge(
+    "order_event_subscribers",
+    "Open order status streams on this worker"
+)
+ORDER_EVENTS_DISPATCHED = registry.counter(
+    "order_events_dispatched_total",
+    "Order status events pushed to local subscribers"
+)
+
+
+class TooManySubscribersError(Exception):
+    pass
+
+
+class OrderEventBroker:
+    """Fans order status changes out to the event streams of every worker.
+
+    Changes are published with ``pg_notify`` inside the transaction that makes
+    them, so PostgreSQL delivers them on commit (and never on rollback) to one
+    LISTEN connection per worker, which hands them to in-memory queues of the
+    customers' open streams. An idle stream costs a queue, not a database
+    connection. Other databases (SQLite in development) run in one process and
+    dispatch locally after commit.
+    """
+
+    def __init__(self, engine: AsyncEngine, channel: str = CHANNEL, max_subscribers: int = 10_000, queue_size: int = 32):
+        self.engine = engine
+        self.channel = channel
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+        self._count = 0
+        self._listen = engine.dialect.name == "postgresql"
+        self._conn: Optional[AsyncConnection] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_full(self) -> bool:
+        return self._count >= self.max_subscribers
+
+    async def start(self):
+        if self._listen and self._task is None:
+            self._task = asyncio.create_task(self._listen_loop(), name="order-events-listener")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self._close()
+
+    async def _close(self):
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                await conn.invalidate()
+                await conn.close()
+            except Exception:
+                pass
+
+    async def _listen_loop(self):
+        delay = 1.0
+        reconnect = False
+        while True:
+            try:
+                conn = await self.engine.connect()
+                self._conn = conn
+                await conn.execution_options(isolation_level="AUTOCOMMIT")
+                raw = await conn.get_raw_connection()
+                await raw.driver_connection.add_listener(self.channel, self._on_notify)
+                logger.info("Listening for order events on %r", self.channel)
+                if reconnect:
+                    self._broadcast(RESYNC)
+                reconnect, delay = True, 1.0
+                while True:
+                    await asyncio.sleep(30)
+                    await conn.scalar(text("SELECT 1"))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Order event listener failed; reconnecting in %.0fs", delay)
+                await self._close()
+                await asyncio.sleep(delay * random.uniform(0.8, 1.2))
+                delay = min(delay * 2, 60.0)
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            self.dispatch(json.loads(payload))
+        except (ValueError, KeyError):
+            logger.warning("Ignoring malformed order event: %r", payload[:200])
+
+    def dispatch(self, order_event: dict):
+        for queue in self._subscribers.get(order_event["user_id"], ()):
+            self._put(queue, order_event)
+            ORDER_EVENTS_DISPATCHED.inc()
+
+    def _broadcast(self, order_event: dict):
+        for queues in self._subscribers.values():
+            for queue in queues:
+                self._put(queue, order_event)
+
+    def close_streams(self):
+        """End every open stream; uvicorn would otherwise wait out the graceful timeout on them"""
+        self._broadcast(CLOSE)
+
+    @staticmethod
+    def _put(queue: asyncio.Queue, order_event: dict):
+        if queue.full():
+            # A stalled client loses its oldest events rather than growing memory
+            queue.get_nowait()
+        queue.put_nowait(order_event)
+
+    async def publish(self, db: AsyncSession, order_event: dict):
+        """Queue an event for delivery when ``db`` commits"""
+        if self._listen:
+            await db.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": self.channel, "payload": json.dumps(order_event, default=str)}
+            )
+        else:
+            event.listen(db.sync_session, "after_commit", lambda session: self.dispatch(order_event), once=True)
+
+    @contextmanager
+    def subscribe(self, user_id: int):
+        """Queue receiving the user's order events while the context is open"""
+        if self.is_full:
+            raise TooManySubscribersError("Too many open order streams")
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[user_id].add(queue)
+        self._count += 1
+        ORDER_EVENT_SUBSCRIBERS.set(self._count)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(user_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[user_id]
+            self._count -= 1
+            ORDER_EVENT_SUBSCRIBERS.set(self._count)
+
+
+def order_status_event(order, previous_status=None) -> dict:
+    return {
+        "type": "order.status",
+        "user_id": order.user_id,
+        "order_id": order.id,
+        "order_number": order.order_number,
+        "status": getattr(order.status, "value", order.status),
+        "previous_status": getattr(previous_status, "value", previous_status),
+    }
+
+
+broker = OrderEventBroker(engine, max_subscribers=settings.ORDER_EVENTS_MAX_STREAMS)
+on_drain(broker.close_streams)
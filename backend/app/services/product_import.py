@@ -0,0 +1,367 @@
+import csv
+import io
+import json
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from itertools import chain
+from typing import IO, Dict, Iterator, List, Optional, Set, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import bindparam, delete, func, insert, or_, select, update
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, upsert
+from app.core.metrics import registry
+from app.models.product import Product, ProductCategory, ProductImage
+from app.schemas.product import ProductImportError, ProductImportResult, ProductImportRow
+from app.services import similarity, sitemap, webhooks
+
+logger = logging.getLogger("app.product_import")
+
+FORMATS = ("csv", "ndjson")
+
+# Row fields that are not product columns
+RELATED_FIELDS = {"category", "category_name", "images"}
+
+# Stand-ins for required columns a row of an existing product leaves out
+REQUIRED_PLACEHOLDERS = {"name": "", "price": 0.0}
+
+PRODUCTS_IMPORTED = registry.counter(
+    "products_imported_total",
+    "Rows of bulk product imports by outcome (created, updated, unchanged, failed)",
+    ("outcome",)
+)
+
+
+class ImportFormatError(Exception):
+    pass
+
+
+@dataclass
+class ImportReport:
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    errors: List[ProductImportError] = field(default_factory=list)
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def changed(self) -> int:
+        return self.created + self.updated
+
+    def fail(self, row: int, slug: Optional[str], error: str):
+        self.failed += 1
+        if len(self.errors) < settings.PRODUCT_IMPORT_MAX_ERRORS:
+            self.errors.append(ProductImportError(row=row, slug=slug, error=error))
+
+    def result(self) -> ProductImportResult:
+        return ProductImportResult(
+            created=self.created,
+            updated=self.updated,
+            unchanged=self.unchanged,
+            failed=self.failed,
+            errors=self.errors,
+            duration_ms=round((time.perf_counter() - self.started) * 1000, 1),
+        )
+
+
+def _delimiter(header: str) -> str:
+    # Spreadsheets with a German locale export semicolon-separated CSV
+    return max(",;\t", key=header.count)
+
+
+def read_rows(stream: IO[bytes], format: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """(row number, fields, parse error) per record of a CSV or NDJSON file.
+
+    Row numbers count data records from 1, without the CSV header. Empty CSV
+    cells are left out, so they keep the stored value; NDJSON can clear a
+    field with null.
+    """
+    if format not in FORMATS:
+        raise ImportFormatError(f"Unsupported format {format!r}; use one of {', '.join(FORMATS)}")
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if format == "csv":
+        header = text.readline()
+        if not header.strip():
+            return
+        reader = csv.DictReader(chain([header], text), delimiter=_delimiter(header))
+        for number, record in enumerate(reader, 1):
+            yield number, {key.strip(): value for key, value in record.items() if key and value not in ("", None)}, None
+        return
+
+    number = 0
+    for line in text:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield number, None, "Expected a JSON object"
+            continue
+        yield number, record, None
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'row'}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+def _row_error_message(error: DBAPIError) -> str:
+    if not isinstance(error, IntegrityError):
+        # e.g. a number out of range for its column or a NUL byte in a text cell
+        return "Value cannot be stored in its column"
+    message = str(error.orig).lower()
+    if "sku" in message:
+        return "SKU is already used by another product"
+    if "foreign key" in message:
+        return "Referenced record does not exist"
+    return "Conflicts with existing data"
+
+
+async def _resolve_categories(db: AsyncSession, rows: List[Tuple[int, ProductImportRow]], categories: Dict[str, int]):
+    """Look up (and create missing) categories by slug into ``categories``"""
+    names: Dict[str, Optional[str]] = {}
+    for _, row in rows:
+        if row.category and (row.category not in categories or row.category_name):
+            names[row.category] = row.category_name or names.get(row.category)
+    if not names:
+        return
+
+    named = [{"slug": slug, "name": name} for slug, name in names.items() if name]
+    unnamed = [{"slug": slug, "name": slug.replace("-", " ").title()} for slug, name in names.items() if not name]
+    if named:
+        statement = upsert(ProductCategory).values(named)
+        await db.execute(statement.on_conflict_do_update(
+            index_elements=["slug"],
+            set_={"name": statement.excluded.name, "updated_at": func.now()},
+            where=ProductCategory.name.is_distinct_from(statement.excluded.name)
+        ))
+    if unnamed:
+        await db.execute(upsert(ProductCategory).values(unnamed).on_conflict_do_nothing(index_elements=["slug"]))
+    result = await db.execute(select(ProductCategory.slug, ProductCategory.id).where(ProductCategory.slug.in_(names)))
+    categories.update((slug, category_id) for slug, category_id in result)
+
+
+def _product_upsert(columns: Tuple[str, ...]):
+    """INSERT ... ON CONFLICT (slug) DO UPDATE that only touches rows whose given columns differ.
+
+    Executed with a list of parameter sets, which SQLAlchemy sends as batched
+    multi-row VALUES while compiling the statement once per column set.
+    """
+    statement = upsert(Product.__table__)
+    updated = [column for column in columns if column != "slug"]
+    return statement.on_conflict_do_update(
+        index_elements=["slug"],
+        set_={**{column: statement.excluded[column] for column in updated}, "updated_at": func.now()},
+        where=or_(*(Product.__table__.c[column].is_distinct_from(statement.excluded[column]) for column in updated))
+    ).returning(Product.id, Product.slug)
+
+
+async def _sync_images(db: AsyncSession, images: Dict[int, Tuple[List[str], Optional[str]]]) -> Set[int]:
+    """Make each product's images match the given URLs in order; returns the products that changed.
+
+    Images are matched by URL, so kept images keep their id, dimensions and
+    generated variants.
+    """
+    current = defaultdict(dict)
+    remove = []
+    for image in await db.execute(
+        select(ProductImage.id, ProductImage.product_id, ProductImage.image_url, ProductImage.sort_order, ProductImage.is_primary)
+        .where(ProductImage.product_id.in_(images))
+        .order_by(ProductImage.id)
+    ):
+        if image.image_url in current[image.product_id]:
+            remove.append(image.id)
+        else:
+            current[image.product_id][image.image_url] = image
+
+    inserts, updates, changed = [], [], set()
+    for product_id, (urls, alt_text) in images.items():
+        have = current.get(product_id, {})
+        for position, url in enumerate(dict.fromkeys(urls)):
+            image = have.pop(url, None)
+            if image is None:
+                inserts.append({
+                    "product_id": product_id,
+                    "image_url": url,
+                    "alt_text": alt_text,
+                    "sort_order": position,
+                    "is_primary": position == 0,
+                })
+            elif (image.sort_order, image.is_primary) != (position, position == 0):
+                updates.append({"image_id": image.id, "new_sort_order": position, "new_is_primary": position == 0})
+            else:
+                continue
+            changed.add(product_id)
+        if have:
+            remove.extend(image.id for image in have.values())
+            changed.add(product_id)
+
+    if remove:
+        await db.execute(delete(ProductImage).where(ProductImage.id.in_(remove)))
+    if inserts:
+        await db.execute(insert(ProductImage), inserts)
+    if updates:
+        await db.execute(
+            update(ProductImage.__table__)
+            .where(ProductImage.id == bindparam("image_id"))
+            .values(sort_order=bindparam("new_sort_order"), is_primary=bindparam("new_is_primary")),
+            updates
+        )
+    return changed
+
+
+async def _import_batch(
+    db: AsyncSession,
+    batch: List[Tuple[int, ProductImportRow]],
+    categories: Dict[str, int],
+    report: ImportReport
+):
+    # The last row for a slug wins
+    rows: Dict[str, Tuple[int, ProductImportRow]] = {}
+    for number, row in batch:
+        previous = rows.get(row.slug)
+        if previous is not None:
+            report.fail(previous[0], row.slug, f"Superseded by row {number} with the same slug")
+        rows[row.slug] = (number, row)
+
+    existing = {
+        product.slug: product
+        for product in await db.execute(
+            select(Product.id, Product.slug, Product.sku, Product.inventory_quantity).where(Product.slug.in_(rows))
+        )
+    }
+    await _resolve_categories(db, list(rows.values()), categories)
+
+    # Rows are grouped by the columns they set, each group is one statement
+    groups: Dict[Tuple[str, ...], List[Tuple[int, dict]]] = defaultdict(list)
+    for slug, (number, row) in rows.items():
+        if slug not in existing and (row.name is None or row.price is None):
+            report.fail(number, slug, "New products need a name and a price")
+            continue
+        values = row.model_dump(exclude_unset=True, exclude=RELATED_FIELDS)
+        if row.category:
+            values["category_id"] = categories[row.category]
+        elif "category" in row.model_fields_set:
+            values["category_id"] = None
+        columns = tuple(sorted(values))
+        if slug in existing:
+            # NOT NULL is checked on the proposed row before the conflict; SET only writes the given columns
+            for column, placeholder in REQUIRED_PLACEHOLDERS.items():
+                values.setdefault(column, placeholder)
+        groups[columns].append((number, values))
+
+    ids = {slug: product.id for slug, product in existing.items()}
+    imported, changed = set(), set()
+    for columns, group in groups.items():
+        if columns == ("slug",):
+            imported.update(values["slug"] for _, values in group)
+            continue
+        statement = _product_upsert(columns)
+        try:
+            async with db.begin_nested():
+                returned = (await db.execute(statement, [values for _, values in group])).all()
+            imported.update(values["slug"] for _, values in group)
+        except DBAPIError:
+            # e.g. an SKU that another product already has; retry row by row to find the culprits
+            returned = []
+            for number, values in group:
+                try:
+                    async with db.begin_nested():
+                        returned.extend((await db.execute(statement, [values])).all())
+                    imported.add(values["slug"])
+                except DBAPIError as e:
+                    report.fail(number, values["slug"], _row_error_message(e))
+        for product_id, slug in returned:
+            ids[slug] = product_id
+            changed.add(slug)
+
+    images = {
+        ids[slug]: (row.images or [], row.name)
+        for slug, (_, row) in rows.items()
+        if slug in imported and "images" in row.model_fields_set
+    }
+    if images:
+        changed_images = await _sync_images(db, images)
+        changed.update(slug for slug in imported if ids[slug] in changed_images)
+
+    for slug in changed & existing.keys():
+        previous = existing[slug]
+        quantity = rows[slug][1].inventory_quantity
+        if quantity is not None and quantity != previous.inventory_quantity:
+            webhooks.emit(db, webhooks.PRODUCT_STOCK_CHANGED, {
+                "product_id": previous.id,
+                "sku": rows[slug][1].sku or previous.sku,
+                "previous_quantity": previous.inventory_quantity,
+                "inventory_quantity": quantity,
+            })
+    await db.commit()
+
+    created = len(changed - existing.keys())
+    updated = len(changed) - created
+    report.created += created
+    report.updated += updated
+    report.unchanged += len(imported) - created - updated
+
+
+async def import_products(stream: IO[bytes], format: str, batch_size: Optional[int] = None) -> ImportReport:
+    """Create or update products from a CSV or NDJSON stream, matched by slug.
+
+    Rows are validated one by one and written in batches of
+    PRODUCT_IMPORT_BATCH_SIZE with one upsert per batch, each batch in its own
+    transaction. Invalid rows are reported and skipped; rows identical to the
+    stored product are not written at all. Derived data is not refreshed here,
+    call ``refresh_catalog_caches`` once afterwards.
+    """
+    batch_size = batch_size or settings.PRODUCT_IMPORT_BATCH_SIZE
+    report = ImportReport()
+    categories: Dict[str, int] = {}
+    batch: List[Tuple[int, ProductImportRow]] = []
+    async with AsyncSessionLocal() as db:
+        try:
+            for number, data, error in read_rows(stream, format):
+                if error:
+                    report.fail(number, None, error)
+                    continue
+                try:
+                    row = ProductImportRow.model_validate(data)
+                except ValidationError as e:
+                    slug = data.get("slug")
+                    report.fail(number, slug if isinstance(slug, str) else None, _validation_message(e))
+                    continue
+                batch.append((number, row))
+                if len(batch) >= batch_size:
+                    await _import_batch(db, batch, categories, report)
+                    batch = []
+        except (UnicodeDecodeError, csv.Error) as e:
+            raise ImportFormatError(f"Unreadable {format} file after {report.changed} imported products: {e}")
+        if batch:
+            await _import_batch(db, batch, categories, report)
+
+    for outcome in ("created", "updated", "unchanged", "failed"):
+        PRODUCTS_IMPORTED.inc(getattr(report, outcome), outcome=outcome)
+    logger.info(
+        "Imported products: %d created, %d updated, %d unchanged, %d failed in %.2fs",
+        report.created, report.updated, report.unchanged, report.failed, time.perf_counter() - report.started
+    )
+    return report
+
+
+async def refresh_catalog_caches():
+    """Rebuild the data derived from the catalog once after an import instead of per product"""
+    for refresh in (similarity.rebuild_similarity_index, sitemap.regenerate_sitemaps):
+        try:
+            await refresh()
+        except Exception:
+            logger.exception("Refreshing %s after a product import failed", refresh.__name__)
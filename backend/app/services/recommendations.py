@@ -0,0 +1,138 @@
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Tuple
+
+import anyio
+import numpy as np
+from scipy import sparse
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.order import Order, OrderItem, OrderStatus
+
+logger = logging.getLogger("app.recommendations")
+
+BATCH_SIZE = 50_000
+
+# Orders that never turned into a purchase say nothing about what is bought together
+EXCLUDED_STATUSES = (OrderStatus.CANCELLED, OrderStatus.REFUNDED)
+
+
+class CoOccurrenceIndex:
+    """Immutable top-K "customers also bought" neighbours per product.
+
+    Lookups are a single dict access returning a precomputed tuple, so the
+    index can be replaced wholesale by rebinding one reference.
+    """
+
+    def __init__(self, neighbours: Dict[int, Tuple[Tuple[int, float], ...]], orders: int = 0, built_at=None):
+        self.neighbours = neighbours
+        self.orders = orders
+        self.built_at = built_at
+
+    def lookup(self, product_id: int, limit: int) -> Tuple[Tuple[int, float], ...]:
+        return self.neighbours.get(product_id, ())[:limit]
+
+    def __len__(self):
+        return len(self.neighbours)
+
+
+def build_index(order_ids: np.ndarray, product_ids: np.ndarray, top_k: int, min_support: int) -> CoOccurrenceIndex:
+    """Compute cosine-normalised co-occurrence neighbours from (order, product) pairs.
+
+    Scores are ``count(i, j) / sqrt(count(i) * count(j))``, which keeps
+    bestsellers from becoming everyone's neighbour. Pairs bought together in
+    fewer than ``min_support`` orders are dropped.
+    """
+    if len(order_ids) == 0:
+        return CoOccurrenceIndex({}, built_at=datetime.now(timezone.utc))
+
+    products, columns = np.unique(product_ids, return_inverse=True)
+    orders, rows = np.unique(order_ids, return_inverse=True)
+    basket = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, columns)),
+        shape=(len(orders), len(products))
+    )
+    # Several lines of the same product in one order count once
+    basket.data[:] = 1
+
+    counts = (basket.T @ basket).tocsr()
+    counts.setdiag(0)
+    if min_support > 1:
+        counts.data[counts.data < min_support] = 0
+    counts.eliminate_zeros()
+
+    popularity = np.asarray(basket.sum(axis=0)).ravel()
+    norms = np.sqrt(popularity)
+    scores = counts.multiply(1 / norms[:, None]).multiply(1 / norms[None, :]).tocsr()
+
+    neighbours = {}
+    for row in range(scores.shape[0]):
+        start, end = scores.indptr[row], scores.indptr[row + 1]
+        if start == end:
+            continue
+        data = scores.data[start:end]
+        indices = scores.indices[start:end]
+        if len(data) > top_k:
+            best = np.argpartition(-data, top_k)[:top_k]
+            data, indices = data[best], indices[best]
+        order = np.argsort(-data, kind="stable")
+        neighbours[int(products[row])] = tuple(
+            (int(products[column]), round(float(score), 4))
+            for column, score in zip(indices[order], data[order])
+        )
+
+    return CoOccurrenceIndex(neighbours, orders=len(orders), built_at=datetime.now(timezone.utc))
+
+
+async def _load_pairs() -> Tuple[np.ndarray, np.ndarray]:
+    """Stream (order_id, product_id) pairs from the lookback window into NumPy arrays"""
+    since = datetime.now(timezone.utc) - timedelta(days=settings.RECOMMENDATION_LOOKBACK_DAYS)
+    order_chunks, product_chunks = [], []
+    async with engine.connect() as conn:
+        result = await conn.stream(
+            select(OrderItem.order_id, OrderItem.product_id)
+            .join(Order, Order.id == OrderItem.order_id)
+            .where(Order.created_at >= since, Order.status.notin_(EXCLUDED_STATUSES))
+            .execution_options(yield_per=BATCH_SIZE)
+        )
+        async for rows in result.partitions(BATCH_SIZE):
+            pairs = np.array(rows, dtype=np.int64)
+            order_chunks.append(pairs[:, 0])
+            product_chunks.append(pairs[:, 1])
+    if not order_chunks:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(order_chunks), np.concatenate(product_chunks)
+
+
+_index = CoOccurrenceIndex({})
+
+
+def get_index() -> CoOccurrenceIndex:
+    return _index
+
+
+async def rebuild_index() -> CoOccurrenceIndex:
+    """Rebuild from the order history and swap the served index in one assignment"""
+    global _index
+    started = time.perf_counter()
+    order_ids, product_ids = await _load_pairs()
+    index = await anyio.to_thread.run_sync(
+        build_index,
+        order_ids,
+        product_ids,
+        settings.RECOMMENDATION_TOP_K,
+        settings.RECOMMENDATION_MIN_SUPPORT
+    )
+    _index = index
+    logger.info(
+        "Rebuilt co-occurrence index: %d products from %d orders in %.2fs",
+        len(index), index.orders, time.perf_counter() - started
+    )
+    return index
+
+
+def customers_also_bought(product_id: int, limit: int) -> List[Tuple[int, float]]:
+    return list(get_index().lookup(product_id, limit))
@@ -0,0 +1,99 @@
+import logging
+import math
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import bindparam, extract, func, select, update
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.order import Order, OrderItem, OrderStatus
+from app.models.product import Product
+from app.models.review import Review
+
+logger = logging.getLogger("app.scoring")
+
+EXCLUDED_STATUSES = (OrderStatus.CANCELLED, OrderStatus.REFUNDED)
+
+
+def _decay(created_at, now: datetime):
+    """exp(-ln2 * age / half-life): an event loses half its weight every TRENDING_HALF_LIFE_DAYS"""
+    rate = math.log(2) / (settings.TRENDING_HALF_LIFE_DAYS * 86400)
+    return func.exp((extract("epoch", created_at) - now.timestamp()) * rate)
+
+
+async def recompute_product_scores() -> dict:
+    """Recompute trending scores and the bestseller / new-arrival flags for the whole catalog.
+
+    Two aggregate queries compute time-decayed sales (units) and review velocity
+    (rating-weighted reviews) per product; the scores and flags that changed are
+    written back with bulk statements in one transaction.
+    """
+    started = time.perf_counter()
+    now = datetime.now(timezone.utc)
+    since = now - timedelta(days=settings.TRENDING_WINDOW_DAYS)
+
+    sales_query = (
+        select(OrderItem.product_id, func.sum(OrderItem.quantity * _decay(Order.created_at, now)))
+        .join(Order, Order.id == OrderItem.order_id)
+        .where(Order.created_at >= since, Order.status.notin_(EXCLUDED_STATUSES))
+        .group_by(OrderItem.product_id)
+    )
+    reviews_query = (
+        select(Review.product_id, func.sum(Review.rating / 5.0 * _decay(Review.created_at, now)))
+        .where(Review.created_at >= since, Review.is_approved == True)
+        .group_by(Review.product_id)
+    )
+
+    async with engine.begin() as conn:
+        sales = dict((await conn.execute(sales_query)).all())
+        reviews = dict((await conn.execute(reviews_query)).all())
+
+        scores = {
+            product_id: round(sales.get(product_id, 0.0) + settings.TRENDING_REVIEW_WEIGHT * reviews.get(product_id, 0.0), 6)
+            for product_id in sales.keys() | reviews.keys()
+        }
+
+        # Scores and flags are derived data: keep updated_at (sitemap lastmod and shard fingerprints)
+        # for real edits, and only touch rows whose value changes
+        unchanged_updated_at = {"updated_at": Product.updated_at}
+
+        # Products that dropped out of the window go back to zero; readers only see the committed result
+        current = dict((await conn.execute(
+            select(Product.id, Product.trending_score).where(Product.trending_score != 0)
+        )).all())
+        changes = [
+            {"product_id": product_id, "score": score}
+            for product_id, score in {**dict.fromkeys(current, 0.0), **scores}.items()
+            if current.get(product_id, 0.0) != score
+        ]
+        if changes:
+            await conn.execute(
+                update(Product)
+                .where(Product.id == bindparam("product_id"))
+                .values(trending_score=bindparam("score"), **unchanged_updated_at),
+                changes
+            )
+
+        bestsellers = [
+            product_id
+            for product_id, _ in sorted(sales.items(), key=lambda item: item[1], reverse=True)
+        ][:settings.BESTSELLER_COUNT]
+        is_bestseller = Product.id.in_(bestsellers)
+        await conn.execute(
+            update(Product)
+            .where(Product.is_bestseller.is_distinct_from(is_bestseller))
+            .values(is_bestseller=is_bestseller, **unchanged_updated_at)
+        )
+        is_new_arrival = Product.created_at >= now - timedelta(days=settings.NEW_ARRIVAL_DAYS)
+        await conn.execute(
+            update(Product)
+            .where(Product.is_new_arrival.is_distinct_from(is_new_arrival))
+            .values(is_new_arrival=is_new_arrival, **unchanged_updated_at)
+        )
+
+    logger.info(
+        "Recomputed product scores: %d scored, %d bestsellers in %.2fs",
+        len(scores), len(bestsellers), time.perf_counter() - started
+    )
+    return {"scored": len(scores), "bestsellers": len(bestsellers)}
@@ -0,0 +1,289 @@
+import asyncio
+import logging
+import math
+import os
+import re
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import anyio
+import numpy as np
+from scipy import sparse
+from sqlalchemy import delete, insert, or_, select
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.product import Product, ProductSimilarity
+
+logger = logging.getLogger("app.similarity")
+
+TOKEN = re.compile(r"[a-zäöüß0-9]{2,}")
+STOPWORDS = frozenset("""
+    aber alle als am an auch auf aus bei bis das dass dem den der des die ein eine einem einen einer eines
+    es für im in ist mit nach nicht noch oder sich sie sind so um und von vor wie wird zu zum zur
+    and for the with of
+""".split())
+
+# Term weight per field; the category is one synthetic term so pieces of the same kind stay close
+FIELD_WEIGHTS = (("name", 2.0), ("short_description", 1.0), ("description", 1.0), ("material", 2.0))
+CATEGORY_WEIGHT = 3.0
+
+# Similarities below this are noise from shared filler words
+MIN_SCORE = 0.05
+BLOCK_SIZE = 512
+INSERT_BATCH = 10_000
+
+PRODUCT_COLUMNS = (
+    Product.id, Product.name, Product.short_description, Product.description, Product.material, Product.category_id
+)
+
+
+def product_terms(row) -> Dict[str, float]:
+    """Weighted term frequencies for one product row"""
+    terms = defaultdict(float)
+    for field, weight in FIELD_WEIGHTS:
+        for token in TOKEN.findall((getattr(row, field) or "").lower()):
+            if token not in STOPWORDS:
+                terms[token] += weight
+    if row.category_id is not None:
+        terms[f"category:{row.category_id}"] += CATEGORY_WEIGHT
+    return terms
+
+
+def _normalize(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms) @ matrix
+
+
+class SimilarityModel:
+    """TF-IDF vectors of the catalog plus the score each product's K-th neighbour has to beat"""
+
+    def __init__(self, vocabulary: Dict[str, int], idf: np.ndarray, matrix: sparse.csr_matrix, product_ids: Sequence[int]):
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.matrix = matrix
+        self.product_ids = np.asarray(product_ids, dtype=np.int64)
+        self.rows = {int(product_id): row for row, product_id in enumerate(self.product_ids)}
+        self.kth_scores = np.zeros(len(self.product_ids), dtype=np.float32)
+
+    @classmethod
+    def fit(cls, rows) -> "SimilarityModel":
+        vocabulary: Dict[str, int] = {}
+        indptr, indices, data, product_ids = [0], [], [], []
+        for row in rows:
+            for term, count in product_terms(row).items():
+                indices.append(vocabulary.setdefault(term, len(vocabulary)))
+                data.append(1 + math.log(count))  # sublinear tf
+            indptr.append(len(indices))
+            product_ids.append(row.id)
+
+        counts = sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr)),
+            shape=(len(product_ids), len(vocabulary))
+        )
+        document_frequency = np.bincount(counts.indices, minlength=len(vocabulary))
+        idf = (np.log((1 + len(product_ids)) / (1 + document_frequency)) + 1).astype(np.float32)
+        matrix = _normalize(counts @ sparse.diags(idf)).tocsr()
+        return cls(vocabulary, idf, matrix, product_ids)
+
+    def vectorize(self, row) -> sparse.csr_matrix:
+        """TF-IDF vector against the fitted vocabulary; terms unseen at fit time are ignored until the next rebuild"""
+        indices, data = [], []
+        for term, count in product_terms(row).items():
+            column = self.vocabulary.get(term)
+            if column is not None:
+                indices.append(column)
+                data.append((1 + math.log(count)) * self.idf[column])
+        vector = sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray([0, len(indices)])),
+            shape=(1, len(self.vocabulary))
+        )
+        return _normalize(vector).tocsr()
+
+    def top_k(self, k: int) -> List[tuple]:
+        """Cosine top-K for the whole catalog, in blocks of rows; returns (product_id, similar_id, score)"""
+        results = []
+        transposed = self.matrix.T.tocsc()
+        count = len(self.product_ids)
+        k = min(k, count - 1)
+        if k <= 0:
+            return results
+        for start in range(0, count, BLOCK_SIZE):
+            stop = min(start + BLOCK_SIZE, count)
+            scores = (self.matrix[start:stop] @ transposed).toarray()
+            scores[np.arange(stop - start), np.arange(start, stop)] = 0
+            best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(scores, best, axis=1)
+            self.kth_scores[start:stop] = best_scores.min(axis=1)
+            for offset in range(stop - start):
+                product_id = int(self.product_ids[start + offset])
+                for column, score in zip(best[offset], best_scores[offset]):
+                    if score >= MIN_SCORE:
+                        results.append((product_id, int(self.product_ids[column]), round(float(score), 4)))
+        return results
+
+    def save(self, path: Path):
+        """Write the model atomically so workers never load a half-written file"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as out:
+            np.savez(
+                out,
+                terms=np.asarray(terms, dtype=str),
+                idf=self.idf,
+                data=self.matrix.data,
+                indices=self.matrix.indices,
+                indptr=self.matrix.indptr,
+                shape=np.asarray(self.matrix.shape),
+                product_ids=self.product_ids,
+                kth_scores=self.kth_scores,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "SimilarityModel":
+        with np.load(path) as saved:
+            vocabulary = {str(term): column for column, term in enumerate(saved["terms"])}
+            matrix = sparse.csr_matrix((saved["data"], saved["indices"], saved["indptr"]), shape=tuple(saved["shape"]))
+            model = cls(vocabulary, saved["idf"], matrix, saved["product_ids"])
+            model.kth_scores = saved["kth_scores"]
+        return model
+
+    def refresh(self, product_id: int, row) -> List[dict]:
+        """Re-vectorize one product (``row`` None removes it) and return its new similarity pairs"""
+        if row is None:
+            self.remove(product_id)
+            return []
+        vector = self.vectorize(row)
+        self.upsert(product_id, vector)
+        scores = (self.matrix @ vector.T).toarray().ravel()
+        position = self.rows[product_id]
+        scores[position] = 0
+
+        k = min(settings.SIMILAR_PRODUCTS_TOP_K, len(scores) - 1)
+        if k <= 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        self.kth_scores[position] = scores[best].min()
+        pairs = [
+            {"product_id": product_id, "similar_product_id": int(self.product_ids[column]), "score": round(float(scores[column]), 4)}
+            for column in best
+            if scores[column] >= MIN_SCORE
+        ]
+        reverse = np.nonzero((scores >= self.kth_scores) & (scores >= MIN_SCORE))[0]
+        pairs += [
+            {"product_id": int(self.product_ids[column]), "similar_product_id": product_id, "score": round(float(scores[column]), 4)}
+            for column in reverse
+            if column != position
+        ]
+        return pairs
+
+    def upsert(self, product_id: int, vector: sparse.csr_matrix):
+        row = self.rows.get(product_id)
+        if row is None:
+            self.matrix = sparse.vstack([self.matrix, vector]).tocsr()
+            self.product_ids = np.append(self.product_ids, product_id)
+            self.kth_scores = np.append(self.kth_scores, np.float32(0))
+            self.rows[product_id] = len(self.product_ids) - 1
+        else:
+            self.matrix = sparse.vstack([self.matrix[:row], vector, self.matrix[row + 1:]]).tocsr()
+
+    def remove(self, product_id: int):
+        row = self.rows.get(product_id)
+        if row is not None:
+            # Keep row positions stable: an empty vector never matches anything
+            empty = sparse.csr_matrix((1, self.matrix.shape[1]), dtype=np.float32)
+            self.matrix = sparse.vstack([self.matrix[:row], empty, self.matrix[row + 1:]]).tocsr()
+
+
+_model: Optional[SimilarityModel] = None
+_model_mtime: Optional[float] = None
+_lock = asyncio.Lock()
+
+
+async def _active_products(conn, product_id: Optional[int] = None):
+    query = select(*PRODUCT_COLUMNS).where(Product.is_active == True).order_by(Product.id)
+    if product_id is not None:
+        query = query.where(Product.id == product_id)
+    return (await conn.execute(query)).all()
+
+
+async def rebuild_similarity_index() -> int:
+    """Refit TF-IDF over the whole catalog and rewrite the top-K table; returns the number of pairs"""
+    global _model, _model_mtime
+    async with _lock:
+        started = time.perf_counter()
+        async with engine.connect() as conn:
+            rows = await _active_products(conn)
+        model = await anyio.to_thread.run_sync(SimilarityModel.fit, rows)
+        pairs = await anyio.to_thread.run_sync(model.top_k, settings.SIMILAR_PRODUCTS_TOP_K)
+        path = Path(settings.SIMILARITY_MODEL_PATH)
+        await anyio.to_thread.run_sync(model.save, path)
+
+        async with engine.begin() as conn:
+            await conn.execute(delete(ProductSimilarity))
+            for start in range(0, len(pairs), INSERT_BATCH):
+                await conn.execute(insert(ProductSimilarity), [
+                    {"product_id": product_id, "similar_product_id": similar_id, "score": score}
+                    for product_id, similar_id, score in pairs[start:start + INSERT_BATCH]
+                ])
+        _model, _model_mtime = model, path.stat().st_mtime
+        logger.info(
+            "Rebuilt similarity index: %d products, %d pairs in %.2fs",
+            len(rows), len(pairs), time.perf_counter() - started
+        )
+        return len(pairs)
+
+
+async def _current_model() -> SimilarityModel:
+    """The model saved by the last rebuild, reloaded whenever a newer one was saved.
+
+    Only before the first rebuild is it fitted here, and then saved for the
+    other workers.
+    """
+    global _model, _model_mtime
+    path = Path(settings.SIMILARITY_MODEL_PATH)
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        mtime = None
+    if mtime is not None and mtime != _model_mtime:
+        _model = await anyio.to_thread.run_sync(SimilarityModel.load, path)
+        _model_mtime = mtime
+    elif _model is None:
+        async with engine.connect() as conn:
+            rows = await _active_products(conn)
+        _model = await anyio.to_thread.run_sync(SimilarityModel.fit, rows)
+        await anyio.to_thread.run_sync(_model.top_k, settings.SIMILAR_PRODUCTS_TOP_K)
+        await anyio.to_thread.run_sync(_model.save, path)
+        _model_mtime = path.stat().st_mtime
+    return _model
+
+
+async def update_product_similarity(product_id: int):
+    """Refresh one product's neighbours after it was created or edited.
+
+    The product's own top-K is recomputed against the current catalog, and it
+    is added to the lists of products it now beats the K-th neighbour of. Those
+    lists may briefly hold more than K entries; the next full rebuild trims them.
+    Incremental changes stay in this worker's copy of the model until the next
+    rebuild saves a fresh one.
+    """
+    async with _lock:
+        model = await _current_model()
+        async with engine.connect() as conn:
+            rows = await _active_products(conn, product_id)
+        # Scoring runs off the event loop, before the transaction opens
+        pairs = await anyio.to_thread.run_sync(model.refresh, product_id, rows[0] if rows else None)
+
+        async with engine.begin() as conn:
+            await conn.execute(delete(ProductSimilarity).where(or_(
+                ProductSimilarity.product_id == product_id,
+                ProductSimilarity.similar_product_id == product_id
+            )))
+            if pairs:
+                await conn.execute(insert(ProductSimilarity), pairs)
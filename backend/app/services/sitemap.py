@@ -0,0 +1,193 @@
+import asyncio
+import gzip
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from xml.sax.saxutils import escape
+
+import anyio
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.product import Product, ProductCategory
+
+
+# Protocol limit per sitemap file; products are sharded by id range so a shard never exceeds it
+URLS_PER_SHARD = 50_000
+BATCH_SIZE = 1000
+
+INDEX_NAME = "sitemap.xml"
+PAGES_NAME = "sitemap-pages.xml.gz"
+MANIFEST_NAME = "manifest.json"
+
+URLSET_OPEN = '<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+URLSET_CLOSE = "</urlset>\n"
+
+_lock = asyncio.Lock()
+
+
+def shard_name(shard: int) -> str:
+    return f"sitemap-products-{shard}.xml.gz"
+
+
+def _lastmod(value: Optional[datetime]) -> Optional[str]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S+00:00")
+
+
+def url_entry(path: str, lastmod: Optional[str] = None) -> str:
+    entry = f"<url><loc>{escape(settings.SITEMAP_BASE_URL + path)}</loc>"
+    if lastmod:
+        entry += f"<lastmod>{lastmod}</lastmod>"
+    return entry + "</url>\n"
+
+
+class _GzipWriter:
+    """Gzipped XML written to a temporary file and moved into place on close"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        self.file = None
+
+    async def __aenter__(self):
+        # mtime=0 keeps the output byte-identical when the content is unchanged
+        self.file = await anyio.to_thread.run_sync(
+            lambda: gzip.GzipFile(self.tmp_path, "wb", compresslevel=6, mtime=0)
+        )
+        return self
+
+    async def write(self, text: str):
+        await anyio.to_thread.run_sync(self.file.write, text.encode())
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await anyio.to_thread.run_sync(self.file.close)
+        if exc_type is None:
+            os.replace(self.tmp_path, self.path)
+        else:
+            self.tmp_path.unlink(missing_ok=True)
+
+
+def _product_shard():
+    return Product.id // URLS_PER_SHARD
+
+
+def _product_lastmod():
+    return func.coalesce(Product.updated_at, Product.created_at)
+
+
+async def _shard_fingerprints(conn) -> Dict[str, dict]:
+    """Per shard: URL count, latest change and an id checksum, to detect edits, additions and removals"""
+    shard = _product_shard().label("shard")
+    result = await conn.execute(
+        select(shard, func.count(), func.max(_product_lastmod()), func.sum(Product.id))
+        .where(Product.is_active == True)
+        .group_by(shard)
+    )
+    return {
+        str(row[0]): {"fingerprint": [row[1], _lastmod(row[2]), row[3]], "lastmod": _lastmod(row[2])}
+        for row in result
+    }
+
+
+async def _write_product_shard(conn, directory: Path, shard: int):
+    result = await conn.stream(
+        select(Product.slug, _product_lastmod())
+        .where(Product.is_active == True, _product_shard() == shard)
+        .order_by(Product.id)
+        .execution_options(yield_per=BATCH_SIZE)
+    )
+    async with _GzipWriter(directory / shard_name(shard)) as out:
+        await out.write(URLSET_OPEN)
+        async for rows in result.partitions(BATCH_SIZE):
+            await out.write("".join(url_entry(f"/product/{slug}", _lastmod(changed)) for slug, changed in rows))
+        await out.write(URLSET_CLOSE)
+
+
+async def _write_pages(conn, directory: Path):
+    """Static pages and blog posts; small enough to rewrite on every run.
+
+    Categories have no route of their own: only those with a top-level page among
+    SITEMAP_STATIC_PATHS (/armbaender, /ketten) appear, as that page's lastmod.
+    """
+    categories = await conn.execute(
+        select(ProductCategory.slug, func.coalesce(ProductCategory.updated_at, ProductCategory.created_at))
+        .where(ProductCategory.is_active == True)
+    )
+    category_lastmod = {f"/{slug}": _lastmod(changed) for slug, changed in categories}
+    async with _GzipWriter(directory / PAGES_NAME) as out:
+        await out.write(URLSET_OPEN)
+        await out.write("".join(url_entry(path, category_lastmod.get(path)) for path in settings.SITEMAP_STATIC_PATHS))
+        await out.write("".join(url_entry(f"/blog/{slug}") for slug in settings.SITEMAP_BLOG_SLUGS))
+        await out.write(URLSET_CLOSE)
+
+
+def _write_index(directory: Path, entries: Iterable[tuple]):
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n',
+        '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n',
+    ]
+    for name, lastmod in entries:
+        loc = escape(f"{settings.SITEMAP_BASE_URL}/sitemaps/{name}")
+        lines.append(f"<sitemap><loc>{loc}</loc>" + (f"<lastmod>{lastmod}</lastmod>" if lastmod else "") + "</sitemap>\n")
+    lines.append("</sitemapindex>\n")
+    tmp_path = directory / f"{INDEX_NAME}.{os.getpid()}.tmp"
+    tmp_path.write_text("".join(lines), encoding="utf-8")
+    os.replace(tmp_path, directory / INDEX_NAME)
+
+
+async def regenerate_sitemaps(force: bool = False) -> List[str]:
+    """Rewrite the sitemap index and every product shard whose products changed since the last run.
+
+    Returns the names of the files written.
+    """
+    async with _lock:
+        directory = Path(settings.SITEMAP_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        manifest_path = directory / MANIFEST_NAME
+        previous = {} if force or not manifest_path.exists() else json.loads(manifest_path.read_text())
+
+        written = []
+        async with engine.connect() as conn:
+            shards = await _shard_fingerprints(conn)
+            for shard, state in sorted(shards.items(), key=lambda item: int(item[0])):
+                unchanged = previous.get(shard, {}).get("fingerprint") == state["fingerprint"]
+                if unchanged and (directory / shard_name(int(shard))).exists():
+                    continue
+                await _write_product_shard(conn, directory, int(shard))
+                written.append(shard_name(int(shard)))
+            await _write_pages(conn, directory)
+            written.append(PAGES_NAME)
+
+        # Shards with no active products left, including ones a forced run has no manifest entry for
+        current = {shard_name(int(shard)) for shard in shards}
+        for path in directory.glob("sitemap-products-*.xml.gz"):
+            if path.name not in current:
+                path.unlink(missing_ok=True)
+
+        now = _lastmod(datetime.now(timezone.utc))
+        entries = [(PAGES_NAME, now)] + [
+            (shard_name(int(shard)), state["lastmod"])
+            for shard, state in sorted(shards.items(), key=lambda item: int(item[0]))
+        ]
+        _write_index(directory, entries)
+        written.append(INDEX_NAME)
+
+        tmp_path = directory / f"{MANIFEST_NAME}.tmp"
+        tmp_path.write_text(json.dumps(shards, indent=2))
+        os.replace(tmp_path, manifest_path)
+        return written
+
+
+async def ensure_sitemaps() -> Path:
+    """Path of the sitemap index, generating everything on first use"""
+    index_path = Path(settings.SITEMAP_DIR) / INDEX_NAME
+    if not index_path.exists():
+        await regenerate_sitemaps()
+    return index_path
@@ -0,0 +1,285 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import random
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import httpx
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import bindparam, delete, exists, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.metrics import registry
+from app.models.webhook import DeliveryStatus, WebhookDelivery, WebhookEndpoint, WebhookEvent
+
+logger = logging.getLogger("app.webhooks")
+
+SIGNATURE_HEADER = "X-Casa-Petrada-Signature"
+
+ORDER_CREATED = "order.created"
+ORDER_STATUS_CHANGED = "order.status_changed"
+PRODUCT_STOCK_CHANGED = "product.stock_changed"
+
+FANOUT_BATCH = 500
+CLEANUP_BATCH = 5000
+
+WEBHOOK_DELIVERIES = registry.counter(
+    "webhook_deliveries_total",
+    "Webhook delivery attempts by outcome (delivered, retry, failed)",
+    ("outcome",)
+)
+WEBHOOK_REQUEST_DURATION = registry.histogram(
+    "webhook_request_duration_seconds",
+    "Duration of outbound webhook requests"
+)
+
+_client: Optional[httpx.AsyncClient] = None
+_endpoint_limits: Dict[int, asyncio.Semaphore] = {}
+
+
+def emit(db: AsyncSession, event_type: str, data: dict):
+    """Queue an event in the caller's transaction; it is only delivered if that transaction commits.
+
+    No I/O happens here: the row is flushed with the caller's commit and
+    delivered later by ``deliver_pending``.
+    """
+    db.add(WebhookEvent(event_type=event_type, payload=jsonable_encoder(data)))
+
+
+def sign(secret: str, timestamp: int, body: bytes) -> str:
+    digest = hmac.new(secret.encode(), f"{timestamp}.".encode() + body, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={digest}"
+
+
+def verify_signature(secret: str, header: str, body: bytes, tolerance: int = 300) -> bool:
+    """Check a signature header on the receiving side; rejects replays older than ``tolerance`` seconds"""
+    try:
+        parts = dict(part.split("=", 1) for part in header.split(","))
+        timestamp = int(parts["t"])
+    except (KeyError, ValueError):
+        return False
+    if abs(time.time() - timestamp) > tolerance:
+        return False
+    return hmac.compare_digest(sign(secret, timestamp, body), f"t={timestamp},v1={parts.get('v1', '')}")
+
+
+def get_client() -> httpx.AsyncClient:
+    """Connection pool shared by all deliveries, created on first use"""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=settings.WEBHOOK_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=settings.WEBHOOK_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.WEBHOOK_MAX_CONNECTIONS
+            ),
+            headers={"User-Agent": "CasaPetrada-Webhooks/1.0"},
+            follow_redirects=False
+        )
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _backoff(attempts: int) -> timedelta:
+    """Exponential backoff with +/-20% jitter"""
+    delay = min(settings.WEBHOOK_BACKOFF_BASE * 2 ** (attempts - 1), settings.WEBHOOK_BACKOFF_MAX)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+async def _fan_out(conn, now: datetime) -> int:
+    """Create one delivery per subscribed endpoint for events that have none yet, due at ``now``"""
+    events = (await conn.execute(
+        select(WebhookEvent.id, WebhookEvent.event_type)
+        .where(WebhookEvent.fanned_out == False)
+        .order_by(WebhookEvent.id)
+        .limit(FANOUT_BATCH)
+    )).all()
+    if not events:
+        return 0
+    endpoints = (await conn.execute(
+        select(WebhookEndpoint.id, WebhookEndpoint.events).where(WebhookEndpoint.is_active == True)
+    )).all()
+    deliveries = [
+        {"event_id": event.id, "endpoint_id": endpoint.id, "next_attempt_at": now}
+        for event in events
+        for endpoint in endpoints
+        if "*" in endpoint.events or event.event_type in endpoint.events
+    ]
+    if deliveries:
+        await conn.execute(insert(WebhookDelivery), deliveries)
+    await conn.execute(
+        update(WebhookEvent).where(WebhookEvent.id.in_([event.id for event in events])).values(fanned_out=True)
+    )
+    return len(deliveries)
+
+
+async def _send_batch(endpoint, deliveries: List, results: list):
+    body = json.dumps({
+        "events": [
+            {
+                "id": delivery.event_id,
+                "type": delivery.event_type,
+                "created_at": delivery.created_at.isoformat() if delivery.created_at else None,
+                "data": delivery.payload,
+            }
+            for delivery in deliveries
+        ]
+    }, separators=(",", ":")).encode()
+    headers = {
+        "Content-Type": "application/json",
+        SIGNATURE_HEADER: sign(endpoint.secret, int(time.time()), body),
+    }
+
+    semaphore = _endpoint_limits.setdefault(endpoint.id, asyncio.Semaphore(endpoint.max_concurrency or 1))
+    status_code, error = None, None
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            response = await get_client().post(endpoint.url, content=body, headers=headers)
+            status_code = response.status_code
+            if not response.is_success:
+                error = response.text[:500]
+        except httpx.HTTPError as exc:
+            error = f"{type(exc).__name__}: {exc}"[:500]
+        WEBHOOK_REQUEST_DURATION.observe(time.perf_counter() - started)
+
+    delivered = status_code is not None and 200 <= status_code < 300
+    for delivery in deliveries:
+        results.append((delivery, delivered, status_code, error))
+
+
+async def deliver_pending() -> int:
+    """Fan out new events and deliver due deliveries, batched per endpoint; returns requests sent"""
+    now = datetime.now(timezone.utc)
+    async with engine.begin() as conn:
+        # Due right away: the server default would be the transaction start, later than ``now``
+        await _fan_out(conn, now)
+        due = (await conn.execute(
+            select(
+                WebhookDelivery.id, WebhookDelivery.attempts, WebhookDelivery.endpoint_id, WebhookDelivery.event_id,
+                WebhookEvent.event_type, WebhookEvent.payload, WebhookEvent.created_at
+            )
+            .join(WebhookEvent, WebhookEvent.id == WebhookDelivery.event_id)
+            .join(WebhookEndpoint, WebhookEndpoint.id == WebhookDelivery.endpoint_id)
+            .where(
+                WebhookDelivery.status == DeliveryStatus.PENDING,
+                WebhookDelivery.next_attempt_at <= now,
+                WebhookEndpoint.is_active == True
+            )
+            .order_by(WebhookDelivery.next_attempt_at, WebhookDelivery.id)
+            .limit(settings.WEBHOOK_DELIVERIES_PER_RUN)
+        )).all()
+        if not due:
+            return 0
+        endpoints = {
+            endpoint.id: endpoint
+            for endpoint in (await conn.execute(
+                select(WebhookEndpoint.id, WebhookEndpoint.url, WebhookEndpoint.secret, WebhookEndpoint.max_concurrency)
+                .where(WebhookEndpoint.id.in_({delivery.endpoint_id for delivery in due}))
+            )).all()
+        }
+
+    by_endpoint = defaultdict(list)
+    for delivery in due:
+        by_endpoint[delivery.endpoint_id].append(delivery)
+
+    results = []
+    batches = []
+    for endpoint_id, deliveries in by_endpoint.items():
+        for start in range(0, len(deliveries), settings.WEBHOOK_BATCH_SIZE):
+            batches.append(_send_batch(endpoints[endpoint_id], deliveries[start:start + settings.WEBHOOK_BATCH_SIZE], results))
+    await asyncio.gather(*batches)
+
+    updates = []
+    for delivery, delivered, status_code, error in results:
+        attempts = delivery.attempts + 1
+        if delivered:
+            outcome = "delivered"
+            values = {"status": DeliveryStatus.DELIVERED, "delivered_at": now, "next_attempt_at": now}
+        elif attempts >= settings.WEBHOOK_MAX_ATTEMPTS:
+            outcome = "failed"
+            values = {"status": DeliveryStatus.FAILED, "delivered_at": None, "next_attempt_at": now}
+        else:
+            outcome = "retry"
+            values = {"status": DeliveryStatus.PENDING, "delivered_at": None, "next_attempt_at": now + _backoff(attempts)}
+        WEBHOOK_DELIVERIES.inc(outcome=outcome)
+        updates.append({
+            "delivery_id": delivery.id,
+            "new_attempts": attempts,
+            "new_status": values["status"],
+            "new_delivered_at": values["delivered_at"],
+            "new_next_attempt_at": values["next_attempt_at"],
+            "new_status_code": status_code,
+            "new_error": error,
+        })
+
+    async with engine.begin() as conn:
+        await conn.execute(
+            update(WebhookDelivery)
+            .where(WebhookDelivery.id == bindparam("delivery_id"))
+            .values(
+                attempts=bindparam("new_attempts"),
+                status=bindparam("new_status"),
+                delivered_at=bindparam("new_delivered_at"),
+                next_attempt_at=bindparam("new_next_attempt_at"),
+                last_status_code=bindparam("new_status_code"),
+                last_error=bindparam("new_error")
+            ),
+            updates
+        )
+    return len(batches)
+
+
+async def delete_old_events() -> int:
+    """Delete finished deliveries and their events after WEBHOOK_RETENTION_DAYS, in batches"""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.WEBHOOK_RETENTION_DAYS)
+    deleted = 0
+    while True:
+        async with engine.begin() as conn:
+            # next_attempt_at is set to the time a delivery was delivered or given up
+            finished = (
+                select(WebhookDelivery.id)
+                .where(
+                    WebhookDelivery.status.in_([DeliveryStatus.DELIVERED, DeliveryStatus.FAILED]),
+                    WebhookDelivery.next_attempt_at < cutoff
+                )
+                .limit(CLEANUP_BATCH)
+            )
+            result = await conn.execute(delete(WebhookDelivery).where(WebhookDelivery.id.in_(finished)))
+        deleted += result.rowcount
+        if result.rowcount < CLEANUP_BATCH:
+            break
+
+    events = 0
+    while True:
+        async with engine.begin() as conn:
+            # Events still waiting for a delivery are kept
+            done = (
+                select(WebhookEvent.id)
+                .where(
+                    WebhookEvent.fanned_out == True,
+                    WebhookEvent.created_at < cutoff,
+                    ~exists().where(WebhookDelivery.event_id == WebhookEvent.id)
+                )
+                .limit(CLEANUP_BATCH)
+            )
+            result = await conn.execute(delete(WebhookEvent).where(WebhookEvent.id.in_(done)))
+        events += result.rowcount
+        if result.rowcount < CLEANUP_BATCH:
+            break
+    if deleted or events:
+        logger.info("Deleted %d webhook deliveries and %d events older than %d days", deleted, events, settings.WEBHOOK_RETENTION_DAYS)
+    return deleted + events
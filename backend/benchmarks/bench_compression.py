@@ -0,0 +1,14 @@
+import pytest
+
+
+# Wire size and latency of the largest JSON payload per content-coding; the
+# server-side CPU cost per route is exported by /metrics as
+# http_response_compression_cpu_seconds_total.
+@pytest.mark.parametrize("encoding", ["identity", "gzip", "br"])
+def bench_product_listing_compression(bench, encoding):
+    bench.request(
+        f"compression.products_list.{encoding}",
+        "GET",
+        "/api/v1/products/?limit=100",
+        headers={"Accept-Encoding": encoding}
+    )
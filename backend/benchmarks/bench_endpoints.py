@@ -0,0 +1,62 @@
+def bench_product_listing(bench):
+    bench.request("products.list", "GET", "/api/v1/products/?limit=20")
+
+
+def bench_product_listing_filtered(bench):
+    bench.request("products.list_featured", "GET", "/api/v1/products/?featured=true&category=ketten&limit=20")
+
+
+def bench_product_detail(bench, seeded):
+    product_id = seeded["product_ids"][len(seeded["product_ids"]) // 2]
+    bench.request("products.detail", "GET", f"/api/v1/products/{product_id}")
+
+
+def bench_product_detail_by_slug(bench, seeded):
+    slug = seeded["product_slugs"][len(seeded["product_slugs"]) // 3]
+    bench.request("products.detail_slug", "GET", f"/api/v1/products/slug/{slug}")
+
+
+def bench_product_search(bench):
+    bench.request("products.search", "GET", "/api/v1/products/?search=korsika&limit=20")
+
+
+def bench_review_stats(bench, seeded):
+    product_id = seeded["product_ids"][0]
+    bench.request("reviews.stats", "GET", f"/api/v1/reviews/product/{product_id}/stats")
+
+
+def bench_login(bench, seeded):
+    # Dominated by bcrypt by design; fewer rounds keep the suite fast
+    bench.request(
+        "auth.login",
+        "POST",
+        "/api/v1/auth/login",
+        rounds=20,
+        data={"username": seeded["email"], "password": seeded["password"]}
+    )
+
+
+def bench_order_create(bench, seeded, auth_headers):
+    product_ids = seeded["product_ids"]
+    bench.request(
+        "orders.create",
+        "POST",
+        "/api/v1/orders/",
+        headers=auth_headers,
+        json={
+            "items": [
+                {"product_id": product_ids[0], "quantity": 1, "price": 0},
+                {"product_id": product_ids[1], "quantity": 2, "price": 0},
+            ],
+            "total_amount": 0,
+            "shipping_address": {
+                "firstName": "Anna",
+                "lastName": "Muster",
+                "street": "Hauptstraße 1",
+                "city": "Berlin",
+                "postalCode": "10115",
+                "country": "Deutschland",
+            },
+            "payment_method": "paypal",
+        }
+    )
@@ -0,0 +1,158 @@
+"""
+Query plan check
+
+Requests the storefront and account endpoints once, captures every SELECT they
+run and EXPLAINs it against the seeded database. Fails when a table that grows
+with the shop is read by a full table scan instead of through an index. On
+PostgreSQL sequential scans are disabled for the EXPLAIN: at seed-data size the
+planner rightly prefers them, so a scan that still shows up has no usable index.
+There an index scan without an index condition counts as a full scan too,
+unless a Limit stops it after the first rows.
+"""
+
+import json
+import re
+
+from sqlalchemy import event
+
+from app.core.database import engine
+
+# Tables whose size follows the catalog, the customers or their orders; lookup
+# tables such as product_categories are small enough to scan
+GROWING_TABLES = {
+    "products", "product_images", "product_similarities", "orders", "order_items", "reviews",
+    "users", "carts", "wishlist_items", "recently_viewed_products", "discount_redemptions",
+    "webhook_events", "webhook_deliveries",
+}
+
+SQLITE_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+
+# Index scans; without an Index Cond (Recheck Cond for bitmaps) they walk the whole index
+POSTGRESQL_INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Heap Scan"}
+# Nodes that read all their input before returning a row, so a Limit above them ends nothing early
+POSTGRESQL_BLOCKING_NODES = {"Sort", "Aggregate", "Hash", "Materialize", "SetOp", "WindowAgg"}
+
+# Full scans accepted on purpose: (pattern of the statement, table)
+ALLOWED_FULL_SCANS = [
+    # The product listing's total counts every match; it reads the partial index of active products
+    (re.compile(r"^SELECT count\(\*\) AS count_1 FROM \(SELECT products\."), "products"),
+    # ?search= is a substring match: a leading-wildcard (I)LIKE cannot use a btree index
+    (re.compile(r"\bI?LIKE\b"), "products"),
+]
+
+
+def _public_paths(seeded):
+    product_ids = seeded["product_ids"]
+    product_id = product_ids[len(product_ids) // 2]
+    return [
+        "/api/v1/products/?limit=20",
+        "/api/v1/products/?limit=20&skip=40",
+        "/api/v1/products/?sort=trending&limit=20",
+        "/api/v1/products/?category=ketten&limit=20",
+        "/api/v1/products/?featured=true&limit=20",
+        "/api/v1/products/?featured=true&category=ketten&limit=20",
+        "/api/v1/products/?search=korsika&limit=20",
+        "/api/v1/products/categories",
+        f"/api/v1/products/batch?ids={','.join(map(str, product_ids[:20]))}",
+        f"/api/v1/products/{product_id}",
+        f"/api/v1/products/slug/{seeded['product_slugs'][len(product_ids) // 3]}",
+        f"/api/v1/products/{product_id}/similar",
+        f"/api/v1/reviews/product/{product_id}",
+        f"/api/v1/reviews/product/{product_id}/stats",
+    ]
+
+
+ACCOUNT_PATHS = [
+    "/api/v1/orders/?limit=5",
+    "/api/v1/orders/?view=summary&limit=5",
+    "/api/v1/reviews/user",
+    "/api/v1/wishlist/",
+    "/api/v1/recently-viewed/",
+    "/api/v1/cart/",
+]
+
+
+async def _capture(client, public_paths, auth_headers):
+    """Request every path and return {statement: (parameters, path)} for the SELECTs they ran"""
+    statements = {}
+    current = {}
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and statement not in statements:
+            statements[statement] = (parameters, current["path"])
+
+    async def get(path, headers=None):
+        current["path"] = path
+        response = await client.get(path, headers=headers)
+        assert response.status_code == 200, f"GET {path} returned {response.status_code}: {response.text[:200]}"
+        return response.json()
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        for path in public_paths:
+            await get(path)
+        for path in ACCOUNT_PATHS:
+            await get(path, auth_headers)
+        # Second page of the keyset-paginated history and an order detail
+        history = await get("/api/v1/orders/?limit=5", auth_headers)
+        if history["next_cursor"]:
+            await get(f"/api/v1/orders/?limit=5&cursor={history['next_cursor']}", auth_headers)
+        if history["orders"]:
+            await get(f"/api/v1/orders/{history['orders'][0]['id']}", auth_headers)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+    return statements
+
+
+def _postgresql_scans(plan, limited=False):
+    """Relations read in full; ``limited`` when a Limit above stops the scan after the first rows"""
+    node = plan.get("Node Type")
+    if node == "Limit":
+        limited = True
+    elif node in POSTGRESQL_BLOCKING_NODES:
+        limited = False
+    if node == "Seq Scan":
+        yield plan["Relation Name"]
+    elif node in POSTGRESQL_INDEX_SCANS and not (plan.get("Index Cond") or plan.get("Recheck Cond")):
+        # A Filter may reject most rows, so the Limit is no bound then
+        if not limited or plan.get("Filter"):
+            yield plan["Relation Name"]
+    for child in plan.get("Plans", ()):
+        yield from _postgresql_scans(child, limited)
+
+
+def _allowed(statement, table):
+    statement = " ".join(statement.split())
+    return any(table == allowed and pattern.search(statement) for pattern, allowed in ALLOWED_FULL_SCANS)
+
+
+async def _full_scans(conn, statement, parameters):
+    """Tables the plan for ``statement`` reads without an index"""
+    if conn.dialect.name == "postgresql":
+        result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+        plan = result.scalar()
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        return set(_postgresql_scans(plan[0]["Plan"]))
+    result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    return {match.group(1) for *_, detail in result if (match := SQLITE_SCAN.match(detail))}
+
+
+def bench_query_plans(bench, seeded, auth_headers):
+    statements = bench.run_async(_capture(bench.client, _public_paths(seeded), auth_headers))
+    assert statements, "no queries captured"
+
+    async def _explain():
+        violations = []
+        async with engine.connect() as conn:
+            if conn.dialect.name == "postgresql":
+                await conn.exec_driver_sql("SET enable_seqscan = off")
+            for statement, (parameters, path) in statements.items():
+                for table in sorted(await _full_scans(conn, statement, parameters) & GROWING_TABLES):
+                    if _allowed(statement, table):
+                        continue
+                    violations.append(f"{path}: full scan of {table}\n    {' '.join(statement.split())[:300]}")
+            await conn.rollback()
+        return violations
+
+    violations = bench.run_async(_explain())
+    assert not violations, f"{len(violations)} queries scan a growing table:\n" + "\n".join(violations)
@@ -0,0 +1,59 @@
+import pytest
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from main import app
+from app.core.database import AsyncSessionLocal
+from app.core.serialization import fast_response
+from app.models import Product
+from app.schemas.product import ProductListResponse
+
+PAGE_SIZE = 100
+
+
+@pytest.fixture(scope="module")
+def product_page(bench, seeded):
+    """One page of fully loaded products, so only serialization is timed"""
+
+    async def _load():
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(Product)
+                .options(selectinload(Product.category), selectinload(Product.images))
+                .where(Product.is_active == True)
+                .order_by(Product.id)
+                .limit(PAGE_SIZE)
+            )
+            return result.scalars().all()
+
+    return bench.run_async(_load())
+
+
+def _record_per_item(result, items):
+    result["per_item_us"] = round(result["median_ms"] * 1000 / items, 3)
+
+
+def bench_product_list_serialization_default(bench, product_page):
+    """FastAPI's response_model path: re-validate, serialize to Python, json.dumps"""
+    route = next(route for route in app.routes if getattr(route, "path", None) == "/api/v1/products/")
+
+    async def _serialize():
+        content = ProductListResponse(products=product_page, total=len(product_page), skip=0, limit=PAGE_SIZE)
+        content = await serialize_response(
+            field=route.secure_cloned_response_field, response_content=content, is_coroutine=True
+        )
+        JSONResponse(content)
+
+    _record_per_item(bench.measure("serialization.product_list.default", _serialize), len(product_page))
+
+
+def bench_product_list_serialization_fast(bench, product_page):
+    """Precompiled serializer: validate once from attributes, encode straight to JSON bytes"""
+
+    async def _serialize():
+        content = ProductListResponse(products=product_page, total=len(product_page), skip=0, limit=PAGE_SIZE)
+        fast_response(ProductListResponse, content)
+
+    _record_per_item(bench.measure("serialization.product_list.fast", _serialize), len(product_page))
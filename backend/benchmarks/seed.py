@@ -0,0 +1,136 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, select
+
+from app.core.database import engine
+from app.core.security import get_password_hash
+from app.models import Order, OrderItem, Product, ProductCategory, ProductImage, Review, User
+from app.models.product import ProductCategoryEnum
+
+
+BENCH_USER_EMAIL = "bench@casa-petrada.de"
+BENCH_USER_PASSWORD = "bench-password"
+
+PRODUCT_COUNT = 2000
+USER_COUNT = 200
+REVIEWS_PER_PRODUCT = 10
+ORDER_COUNT = 2000
+
+WORDS = [
+    "boho", "kette", "armband", "perlen", "silber", "gold", "tibet", "korsika", "sicilia",
+    "halbedelstein", "glasperlen", "wickel", "anhaenger", "leder", "muschel", "tuerkis",
+]
+
+
+async def seed_database(seed: int = 42) -> dict:
+    """Insert a small deterministic catalog with reviews and orders; returns ids for benchmarks"""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+
+    async with engine.begin() as conn:
+        await conn.execute(insert(ProductCategory), [
+            {"name": category.name.title(), "slug": category.value, "sort_order": index, "is_active": True}
+            for index, category in enumerate(ProductCategoryEnum)
+        ])
+        category_ids = (await conn.execute(select(ProductCategory.id))).scalars().all()
+
+        products = []
+        for index in range(PRODUCT_COUNT):
+            name = " ".join(rng.choice(WORDS) for _ in range(3)).title()
+            products.append({
+                "name": name,
+                "slug": f"product-{index}",
+                "description": " ".join(rng.choice(WORDS) for _ in range(120)),
+                "short_description": " ".join(rng.choice(WORDS) for _ in range(15)),
+                "price": round(rng.uniform(9.9, 149.9), 2),
+                "sku": f"SKU-{index:06d}",
+                "inventory_quantity": rng.randint(0, 50),
+                "material": "Halbedelsteine, Glasperlen",
+                "care_instructions": " ".join(rng.choice(WORDS) for _ in range(30)),
+                "is_active": True,
+                "is_featured": index % 25 == 0,
+                "is_bestseller": index % 40 == 0,
+                "is_new_arrival": index % 30 == 0,
+                "category_id": rng.choice(category_ids),
+                "created_at": now - timedelta(minutes=index),
+            })
+        await conn.execute(insert(Product), products)
+        product_ids = (await conn.execute(select(Product.id).order_by(Product.id))).scalars().all()
+
+        await conn.execute(insert(ProductImage), [
+            {
+                "product_id": product_id,
+                "image_url": f"/static/images/products/{product_id}-{position}.jpg",
+                "alt_text": "Produktbild",
+                "sort_order": position,
+                "is_primary": position == 0,
+            }
+            for product_id in product_ids
+            for position in range(3)
+        ])
+
+        hashed_password = get_password_hash(BENCH_USER_PASSWORD)
+        await conn.execute(insert(User), [
+            {
+                "email": BENCH_USER_EMAIL if index == 0 else f"user{index}@example.com",
+                "hashed_password": hashed_password,
+                "first_name": "Bench",
+                "last_name": f"User{index}",
+                "is_active": True,
+            }
+            for index in range(USER_COUNT)
+        ])
+        user_ids = (await conn.execute(select(User.id).order_by(User.id))).scalars().all()
+
+        await conn.execute(insert(Review), [
+            {
+                "product_id": product_id,
+                "user_id": rng.choice(user_ids),
+                "rating": rng.choices([1, 2, 3, 4, 5], weights=[1, 1, 3, 8, 12])[0],
+                "title": "Wunderschön",
+                "comment": " ".join(rng.choice(WORDS) for _ in range(40)),
+                "is_approved": True,
+            }
+            for product_id in product_ids
+            for _ in range(REVIEWS_PER_PRODUCT)
+        ])
+
+        orders = []
+        for index in range(ORDER_COUNT):
+            orders.append({
+                "order_number": f"BENCH{index:08d}",
+                "user_id": rng.choice(user_ids),
+                "customer_email": "kunde@example.com",
+                "customer_first_name": "Anna",
+                "customer_last_name": "Muster",
+                "shipping_address_line1": "Hauptstraße 1",
+                "shipping_city": "Berlin",
+                "shipping_postal_code": "10115",
+                "shipping_country": "Deutschland",
+                "subtotal": 0.0,
+                "total_amount": 0.0,
+                "payment_method": "paypal",
+                "created_at": now - timedelta(hours=index),
+            })
+        await conn.execute(insert(Order), orders)
+        order_ids = (await conn.execute(select(Order.id))).scalars().all()
+
+        items = []
+        for order_id in order_ids:
+            for product_id in rng.sample(product_ids, rng.randint(1, 4)):
+                items.append({
+                    "order_id": order_id,
+                    "product_id": product_id,
+                    "product_name": "Benchmark Produkt",
+                    "unit_price": 29.9,
+                    "quantity": 1,
+                    "total_price": 29.9,
+                })
+        await conn.execute(insert(OrderItem), items)
+
+    return {
+        "product_ids": list(product_ids),
+        "product_slugs": [f"product-{index}" for index in range(PRODUCT_COUNT)],
+        "user_ids": list(user_ids),
+    }
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Server throughput comparison
+
+Starts serve.py once per configuration, drives it with concurrent keep-alive
+clients for a fixed duration and prints requests per second and latency
+percentiles per path. Uses the database from DATABASE_URL, so seed it first
+(e.g. with generate_dataset.py). Not collected by ``pytest benchmarks``.
+
+    python benchmarks/throughput.py
+    python benchmarks/throughput.py --duration 30 --concurrency 128 --path /api/v1/products/?limit=20
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+CONFIGURATIONS = {
+    "asyncio+h11, 1 worker": ["--loop", "asyncio", "--http", "h11", "--workers", "1"],
+    "uvloop+httptools, 1 worker": ["--loop", "uvloop", "--http", "httptools", "--workers", "1"],
+    "uvloop+httptools, N workers": ["--loop", "uvloop", "--http", "httptools", "--workers", "0"],
+    "uvloop+httptools, N workers, no keep-alive": ["--loop", "uvloop", "--http", "httptools", "--workers", "0", "--no-keep-alive"],
+}
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)] if values else 0.0
+
+
+async def _wait_ready(url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(url + "/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not start within {timeout:.0f}s")
+
+
+async def _load(url: str, path: str, duration: float, concurrency: int, keep_alive: bool):
+    latencies, errors = [], 0
+    headers = {} if keep_alive else {"Connection": "close"}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency if keep_alive else 0)
+    async with httpx.AsyncClient(base_url=url, limits=limits, headers=headers, timeout=30) as client:
+        # Warm up connections and caches
+        await asyncio.gather(*(client.get(path) for _ in range(concurrency)), return_exceptions=True)
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    if response.status_code != 200:
+                        errors += 1
+                        continue
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors
+
+
+def run_configuration(name: str, flags, args) -> list:
+    keep_alive = "--no-keep-alive" not in flags
+    flags = [flag for flag in flags if flag != "--no-keep-alive"]
+    url = f"http://127.0.0.1:{args.port}"
+    server = subprocess.Popen(
+        [sys.executable, "serve.py", "--host", "127.0.0.1", "--port", str(args.port), "--max-requests", "0", *flags],
+        cwd=BACKEND_DIR,
+        env=dict(os.environ, SCHEDULER_ENABLED="false", ADMISSION_ENABLED="false"),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    rows = []
+    try:
+        asyncio.run(_wait_ready(url))
+        for path in args.path:
+            latencies, errors = asyncio.run(_load(url, path, args.duration, args.concurrency, keep_alive))
+            rows.append((
+                name, path, len(latencies) / args.duration,
+                _percentile(latencies, 0.5) * 1000, _percentile(latencies, 0.99) * 1000, errors
+            ))
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(60)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per configuration and path")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--path", action="append", help="Path to load (repeatable)")
+    parser.add_argument("--only", action="append", choices=list(CONFIGURATIONS), help="Run only these configurations")
+    args = parser.parse_args()
+    args.path = args.path or ["/health", "/api/v1/products/?limit=20"]
+
+    rows = []
+    for name in args.only or CONFIGURATIONS:
+        rows.extend(run_configuration(name, CONFIGURATIONS[name], args))
+
+    print(f"{'configuration':44} {'path':32} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for name, path, throughput, p50, p99, errors in rows:
+        print(f"{name:44} {path:32} {throughput:9.0f} {p50:8.1f} {p99:8.1f} {errors:7d}")
+
+
+if __name__ == "__main__":
+    main()
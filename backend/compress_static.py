@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Casa Petrada Static Asset Compressor
+
+Writes .br and .gz siblings next to compressible files in the static directory,
+so they can be served precompressed without spending CPU per request.
+Run it as part of every deployment after the static files are in place.
+
+    python compress_static.py
+    python compress_static.py --directory static --min-size 512
+"""
+
+import argparse
+import gzip
+import os
+from pathlib import Path
+
+import brotli
+
+
+COMPRESSIBLE_EXTENSIONS = {
+    ".css", ".js", ".mjs", ".json", ".map", ".svg", ".html", ".txt", ".xml", ".ico", ".webmanifest",
+}
+
+# Keep a sibling only if it saves at least this fraction of the original size
+MIN_SAVING = 0.1
+
+
+def _write_if_smaller(target: Path, data: bytes, original_size: int) -> bool:
+    if len(data) > original_size * (1 - MIN_SAVING):
+        target.unlink(missing_ok=True)
+        return False
+    tmp_path = target.with_name(target.name + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, target)
+    return True
+
+
+def compress_file(path: Path) -> int:
+    """Create or refresh the siblings of ``path``; returns the number written"""
+    source_mtime = path.stat().st_mtime
+    data = None
+    written = 0
+    for suffix, compress in (
+        (".br", lambda raw: brotli.compress(raw, quality=11)),
+        (".gz", lambda raw: gzip.compress(raw, compresslevel=9, mtime=0)),
+    ):
+        target = path.with_name(path.name + suffix)
+        if target.exists() and target.stat().st_mtime >= source_mtime:
+            continue
+        if data is None:
+            data = path.read_bytes()
+        written += _write_if_smaller(target, compress(data), len(data))
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--directory", default="static")
+    parser.add_argument("--min-size", type=int, default=256, help="Skip files smaller than this many bytes")
+    args = parser.parse_args()
+
+    files = written = 0
+    for path in Path(args.directory).rglob("*"):
+        if (
+            path.is_file()
+            and path.suffix.lower() in COMPRESSIBLE_EXTENSIONS
+            and path.stat().st_size >= args.min_size
+        ):
+            files += 1
+            written += compress_file(path)
+    print(f"Checked {files} files, wrote {written} compressed siblings")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Casa Petrada Scale Dataset Generator
+
+Generates a deterministic, production-shaped dataset and bulk-loads it with COPY.
+Product popularity follows a Zipf distribution, so a small head of products
+receives most orders and reviews, like a real catalog.
+
+    python generate_dataset.py --scale large --truncate
+    python generate_dataset.py --products 10000 --orders 1000000 --reviews 5000000
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.models import Base
+from app.models import newsletter  # noqa: F401  (registers newsletter_subscriptions)
+from app.models.product import ProductCategoryEnum
+
+
+SCALES = {
+    "small": {"products": 1_000, "users": 5_000, "orders": 20_000, "reviews": 50_000, "subscribers": 5_000},
+    "medium": {"products": 5_000, "users": 50_000, "orders": 200_000, "reviews": 500_000, "subscribers": 20_000},
+    "large": {"products": 10_000, "users": 250_000, "orders": 1_000_000, "reviews": 5_000_000, "subscribers": 100_000},
+}
+
+# Zipf exponents: products are strongly skewed, customers mildly (a few loyal buyers)
+PRODUCT_SKEW = 1.1
+CUSTOMER_SKEW = 0.6
+
+# Orders and reviews are spread over this many days, weighted towards recent ones
+HISTORY_DAYS = 730
+
+TABLES = [
+    "order_items", "orders", "reviews", "product_images", "products",
+    "product_categories", "newsletter_subscriptions", "users",
+]
+
+WORDS = [
+    "boho", "kette", "armband", "perlen", "silber", "gold", "tibet", "korsika", "sicilia", "ibiza",
+    "halbedelstein", "glasperlen", "wickel", "anhaenger", "leder", "muschel", "tuerkis", "mondstein",
+    "amethyst", "rosenquarz", "lava", "holz", "quaste", "feder", "sonne", "mond", "sterne", "welle",
+]
+MATERIALS = [
+    "Halbedelsteine, Glasperlen", "925er Silber", "Edelstahl vergoldet", "Leder, Holzperlen",
+    "Baumwolle", "Viskose", "Muscheln, Makramee", "Messing", "Rosenquarz, Mondstein",
+]
+FIRST_NAMES = ["Anna", "Lena", "Marie", "Sophie", "Laura", "Julia", "Lea", "Mia", "Emma", "Hannah", "Paul", "Jonas"]
+LAST_NAMES = ["Müller", "Schmidt", "Schneider", "Fischer", "Weber", "Meyer", "Wagner", "Becker", "Hoffmann"]
+CITIES = [("Berlin", "10115"), ("Hamburg", "20095"), ("München", "80331"), ("Köln", "50667"), ("Leipzig", "04109")]
+ORDER_STATUSES = ["DELIVERED"] * 14 + ["SHIPPED", "PROCESSING", "CONFIRMED", "PENDING", "CANCELLED", "REFUNDED"]
+PAYMENT_METHODS = ["paypal", "stripe", "klarna", "bank_transfer"]
+
+
+def zipf_cum_weights(count: int, exponent: float):
+    return list(accumulate(1.0 / (rank ** exponent) for rank in range(1, count + 1)))
+
+
+def _value(value) -> str:
+    """Encode a value for COPY ... (FORMAT text)"""
+    if value is None:
+        return "\\N"
+    if value is True:
+        return "t"
+    if value is False:
+        return "f"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+
+class RowStream:
+    """File-like object feeding generated rows to COPY without materialising the table"""
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._buffer = b""
+        self.count = 0
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            chunk = []
+            for row in self._rows:
+                chunk.append("\t".join(_value(value) for value in row))
+                if len(chunk) >= 1000:
+                    break
+            if not chunk:
+                break
+            self.count += len(chunk)
+            self._buffer += ("\n".join(chunk) + "\n").encode()
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    readline = read
+
+
+class DatasetGenerator:
+    def __init__(self, counts: dict, seed: int, password: str):
+        self.counts = counts
+        self.rng = random.Random(seed)
+        self.now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        self.password_hash = get_password_hash(password)
+
+        # Popularity rank -> product id; shuffled so popular products are spread over categories
+        self.products_by_rank = list(range(1, counts["products"] + 1))
+        self.rng.shuffle(self.products_by_rank)
+        self.product_cum_weights = zipf_cum_weights(counts["products"], PRODUCT_SKEW)
+        self.customers_by_rank = list(range(1, counts["users"] + 1))
+        self.rng.shuffle(self.customers_by_rank)
+        self.customer_cum_weights = zipf_cum_weights(counts["users"], CUSTOMER_SKEW)
+        self.prices = {}
+
+    def words(self, count: int) -> str:
+        return " ".join(self.rng.choices(WORDS, k=count))
+
+    def past(self, max_days: int = HISTORY_DAYS) -> datetime:
+        # Squaring biases towards recent timestamps, mimicking a growing shop
+        return self.now - timedelta(seconds=int(max_days * 86400 * self.rng.random() ** 2))
+
+    def popular_products(self, k: int):
+        return self.rng.choices(self.products_by_rank, cum_weights=self.product_cum_weights, k=k)
+
+    def categories(self):
+        for index, category in enumerate(ProductCategoryEnum, start=1):
+            yield (index, category.name.title(), category.value, None, None, index, True, self.now, None)
+
+    def products(self):
+        category_count = len(ProductCategoryEnum)
+        for product_id in range(1, self.counts["products"] + 1):
+            name = self.words(2).title()
+            price = round(self.rng.lognormvariate(3.4, 0.5), 2)
+            self.prices[product_id] = price
+            on_sale = self.rng.random() < 0.1
+            yield (
+                product_id, name, f"{name.lower().replace(' ', '-')}-{product_id}",
+                self.words(self.rng.randint(40, 160)), self.words(self.rng.randint(8, 20)),
+                price, round(price * 1.25, 2) if on_sale else None, round(price * 0.35, 2),
+                f"CP-{product_id:07d}", self.rng.randint(0, 40), True, False,
+                self.rng.randint(5, 80), self.rng.choice(MATERIALS), self.words(20),
+                name, self.words(20),
+                self.rng.random() < 0.97, self.rng.random() < 0.03, False, False, on_sale, True,
+                self.rng.randint(1, category_count), self.past(), None,
+            )
+
+    def product_images(self):
+        image_id = 0
+        for product_id in range(1, self.counts["products"] + 1):
+            for position in range(self.rng.randint(1, 5)):
+                image_id += 1
+                yield (
+                    image_id, product_id, f"/static/images/products/{product_id}-{position}.jpg",
+                    "Produktbild", position, position == 0, self.now,
+                )
+
+    def users(self):
+        for user_id in range(1, self.counts["users"] + 1):
+            city, postal_code = self.rng.choice(CITIES)
+            yield (
+                user_id, f"kunde{user_id}@example.com", self.password_hash,
+                self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES), True, user_id == 1,
+                f"Hauptstraße {self.rng.randint(1, 200)}", city, postal_code, "Deutschland", None,
+                self.rng.random() < 0.3, self.past(), None,
+            )
+
+    def subscribers(self):
+        for subscriber_id in range(1, self.counts["subscribers"] + 1):
+            active = self.rng.random() < 0.9
+            yield (
+                subscriber_id, f"newsletter{subscriber_id}@example.com", self.past(), active,
+                None if active else self.now, self.rng.choice(["website", "checkout", "popup"]),
+            )
+
+    def orders_and_items(self, item_sink: list):
+        """Yield order rows; order item rows are appended to ``item_sink`` in batches"""
+        item_id = 0
+        customers = self.rng.choices(
+            self.customers_by_rank, cum_weights=self.customer_cum_weights, k=self.counts["orders"]
+        )
+        for order_id, user_id in enumerate(customers, start=1):
+            created_at = self.past()
+            city, postal_code = self.rng.choice(CITIES)
+            subtotal = 0.0
+            lines = []
+            for product_id in set(self.popular_products(self.rng.choices([1, 2, 3, 4, 5], weights=[45, 30, 15, 7, 3])[0])):
+                item_id += 1
+                quantity = 1 if self.rng.random() < 0.85 else 2
+                price = self.prices[product_id]
+                subtotal += price * quantity
+                lines.append((
+                    item_id, order_id, product_id, f"Produkt {product_id}", f"CP-{product_id:07d}",
+                    price, quantity, round(price * quantity, 2), created_at,
+                ))
+            item_sink.extend(lines)
+            shipping_cost = 0.0 if subtotal >= 50 else 4.95
+            status = self.rng.choice(ORDER_STATUSES)
+            yield (
+                order_id, f"CP{created_at:%Y%m%d}{order_id:08d}", user_id, f"kunde{user_id}@example.com",
+                self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES), None,
+                f"Hauptstraße {self.rng.randint(1, 200)}", None, city, postal_code, "Deutschland",
+                True, None, None, None, None, None,
+                round(subtotal, 2), shipping_cost, round(subtotal * 0.19 / 1.19, 2), 0.0,
+                round(subtotal + shipping_cost, 2), status,
+                "REFUNDED" if status == "REFUNDED" else ("PENDING" if status == "PENDING" else "PAID"),
+                self.rng.choice(PAYMENT_METHODS), None, "DHL", None, None, None, None, None,
+                created_at, None,
+            )
+
+    def reviews(self):
+        products = self.popular_products(self.counts["reviews"])
+        for review_id, product_id in enumerate(products, start=1):
+            yield (
+                review_id, product_id, self.rng.randint(1, self.counts["users"]),
+                self.rng.choices([1, 2, 3, 4, 5], weights=[2, 2, 6, 25, 65])[0],
+                self.words(3).capitalize(), self.words(self.rng.randint(5, 60)),
+                None, None, self.rng.random() < 0.95, self.rng.random() < 0.7, self.past(), None,
+            )
+
+
+COLUMNS = {
+    "product_categories": "id, name, slug, description, parent_id, sort_order, is_active, created_at, updated_at",
+    "products": (
+        "id, name, slug, description, short_description, price, compare_at_price, cost_price, sku, "
+        "inventory_quantity, track_inventory, allow_backorder, weight, material, care_instructions, "
+        "meta_title, meta_description, is_active, is_featured, is_bestseller, is_new_arrival, is_sale, "
+        "is_handmade, category_id, created_at, updated_at"
+    ),
+    "product_images": "id, product_id, image_url, alt_text, sort_order, is_primary, created_at",
+    "users": (
+        "id, email, hashed_password, first_name, last_name, is_active, is_admin, street_address, city, "
+        "postal_code, country, phone, newsletter_subscribed, created_at, updated_at"
+    ),
+    "newsletter_subscriptions": "id, email, subscribed_at, is_active, unsubscribed_at, source",
+    "orders": (
+        "id, order_number, user_id, customer_email, customer_first_name, customer_last_name, customer_phone, "
+        "shipping_address_line1, shipping_address_line2, shipping_city, shipping_postal_code, shipping_country, "
+        "billing_same_as_shipping, billing_address_line1, billing_address_line2, billing_city, "
+        "billing_postal_code, billing_country, subtotal, shipping_cost, tax_amount, discount_amount, "
+        "total_amount, status, payment_status, payment_method, payment_reference, shipping_method, "
+        "tracking_number, shipped_at, delivered_at, customer_notes, admin_notes, created_at, updated_at"
+    ),
+    "order_items": (
+        "id, order_id, product_id, product_name, product_sku, unit_price, quantity, total_price, created_at"
+    ),
+    "reviews": (
+        "id, product_id, user_id, rating, title, comment, reviewer_name, reviewer_email, is_approved, "
+        "is_verified_purchase, created_at, updated_at"
+    ),
+}
+
+
+def copy_rows(cursor, table: str, rows) -> int:
+    stream = RowStream(rows)
+    started = time.perf_counter()
+    cursor.copy_expert(f"COPY {table} ({COLUMNS[table]}) FROM STDIN WITH (FORMAT text)", stream, size=1 << 20)
+    print(f"  {table:<26} {stream.count:>10,} rows in {time.perf_counter() - started:6.1f}s")
+    return stream.count
+
+
+def load(database_url: str, counts: dict, seed: int, password: str, truncate: bool):
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+
+    with engine.begin() as conn:
+        if truncate:
+            conn.execute(text(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY CASCADE"))
+        else:
+            for table in TABLES:
+                if conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM {table})")).scalar():
+                    sys.exit(f"Table {table} is not empty; rerun with --truncate to replace existing data")
+
+    generator = DatasetGenerator(counts, seed, password)
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        copy_rows(cursor, "product_categories", generator.categories())
+        copy_rows(cursor, "products", generator.products())
+        copy_rows(cursor, "product_images", generator.product_images())
+        copy_rows(cursor, "users", generator.users())
+        copy_rows(cursor, "newsletter_subscriptions", generator.subscribers())
+
+        # Orders are loaded in slices so their items never pile up in memory
+        items = []
+        orders = generator.orders_and_items(items)
+        while True:
+            batch = [row for _, row in zip(range(50_000), orders)]
+            if not batch:
+                break
+            copy_rows(cursor, "orders", batch)
+            copy_rows(cursor, "order_items", items)
+            items.clear()
+
+        copy_rows(cursor, "reviews", generator.reviews())
+
+        for table in TABLES:
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE(MAX(id), 1)) FROM {table}"
+            )
+        raw.commit()
+
+        # Fresh statistics so the planner sees the new cardinalities
+        raw.dbapi_connection.autocommit = True
+        for table in TABLES:
+            cursor.execute(f"ANALYZE {table}")
+    finally:
+        raw.close()
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    for name in SCALES["small"]:
+        parser.add_argument(f"--{name}", type=int, help=f"Override the number of {name}")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed; the same seed yields the same data")
+    parser.add_argument("--password", default="casa-petrada", help="Password shared by all generated users")
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--truncate", action="store_true", help="Empty the tables before loading")
+    args = parser.parse_args()
+
+    counts = dict(SCALES[args.scale])
+    for name in counts:
+        if getattr(args, name) is not None:
+            counts[name] = getattr(args, name)
+
+    print("Generating dataset: " + ", ".join(f"{count:,} {name}" for name, count in counts.items()))
+    started = time.perf_counter()
+    load(args.database_url, counts, args.seed, args.password, args.truncate)
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Casa Petrada Sitemap Generator
+
+Streams active products, categories and blog posts into gzipped sitemap shards
+of at most 50,000 URLs plus a sitemap index. Product shards are only rewritten
+when their products changed since the last run.
+
+    python generate_sitemaps.py
+    python generate_sitemaps.py --force   # rewrite every shard
+"""
+
+import argparse
+import asyncio
+
+from app.core.config import settings
+from app.core.database import engine
+from app.services.sitemap import regenerate_sitemaps
+
+
+async def _run(force: bool):
+    try:
+        written = await regenerate_sitemaps(force=force)
+    finally:
+        await engine.dispose()
+    print(f"Wrote {len(written)} files to {settings.SITEMAP_DIR}: {', '.join(written)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--force", action="store_true", help="Regenerate every shard, changed or not")
+    args = parser.parse_args()
+    asyncio.run(_run(args.force))
+
+
+if __name__ == "__main__":
+    main()
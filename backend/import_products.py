@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Casa Petrada Product Import
+
+Creates or updates products from a CSV or NDJSON file, matched by slug, with
+one upsert per batch. Only the given columns are written: empty CSV cells keep
+the stored value. `category` takes a category slug (created when missing,
+named by `category_name`); `images` lists image URLs separated by "|" in CSV.
+Similar products and sitemaps are rebuilt once at the end.
+
+    python import_products.py catalog.csv
+    python import_products.py catalog.ndjson --batch-size 2000
+    python import_products.py - --format ndjson < export.ndjson
+
+Exits with status 1 when rows failed.
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from app.core.database import engine
+from app.services import product_import
+
+EXTENSIONS = {".csv": "csv", ".tsv": "csv", ".txt": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+
+async def _run(path: str, format: str, batch_size: int, refresh: bool) -> int:
+    try:
+        if path == "-":
+            report = await product_import.import_products(sys.stdin.buffer, format, batch_size)
+        else:
+            with open(path, "rb") as stream:
+                report = await product_import.import_products(stream, format, batch_size)
+        result = report.result()
+        print(
+            f"{result.created} created, {result.updated} updated, {result.unchanged} unchanged, "
+            f"{result.failed} failed in {result.duration_ms / 1000:.2f}s"
+        )
+        for error in result.errors:
+            print(f"  row {error.row}{f' ({error.slug})' if error.slug else ''}: {error.error}", file=sys.stderr)
+        if result.failed > len(result.errors):
+            print(f"  ... and {result.failed - len(result.errors)} more", file=sys.stderr)
+        if refresh and report.changed:
+            await product_import.refresh_catalog_caches()
+            print("Rebuilt similar products and sitemaps")
+    finally:
+        await engine.dispose()
+    return 1 if result.failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="CSV or NDJSON file, or - for standard input")
+    parser.add_argument("--format", choices=product_import.FORMATS, help="Defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, help="Rows per upsert (default PRODUCT_IMPORT_BATCH_SIZE)")
+    parser.add_argument("--no-refresh", action="store_true", help="Skip rebuilding similar products and sitemaps")
+    args = parser.parse_args()
+
+    format = args.format or EXTENSIONS.get(Path(args.path).suffix.lower())
+    if format is None:
+        parser.error("cannot tell the format from the file name; pass --format")
+    try:
+        status = asyncio.run(_run(args.path, format, args.batch_size, not args.no_refresh))
+    except product_import.ImportFormatError as e:
+        parser.exit(2, f"error: {e}\n")
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,81 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
+import hmac
 import uvicorn
 
 from app.core.config import settings
 from app.api.api_v1.api import api_router
+from app.api import media, sitemaps
 from app.core.database import engine
+from app.core.admission import AdmissionController, AdmissionMiddleware, TrafficClass
+from app.core.compression import CompressionMiddleware
+from app.core.metrics import MetricsMiddleware, instrument_engine, registry
+from app.core import profiler
+from app.core.scheduler import Scheduler
+from app.core.staticfiles import PrecompressedStaticFiles
 from app.models import Base
+from app.services import activity, cart, images, order_events, recommendations, scoring, similarity, sitemap, webhooks
+
+
+# Periodic background jobs
+scheduler = Scheduler(engine)
+# Every worker serves recommendations from its own in-memory index; load it right away
+scheduler.add_job(
+    "rebuild_recommendations",
+    recommendations.rebuild_index,
+    interval=settings.RECOMMENDATION_REBUILD_INTERVAL,
+    timeout=600,
+    leader_only=False,
+    run_at_startup=True
+)
+scheduler.add_job(
+    "recompute_product_scores",
+    scoring.recompute_product_scores,
+    interval=settings.PRODUCT_SCORES_INTERVAL,
+    timeout=300
+)
+scheduler.add_job(
+    "rebuild_similar_products",
+    similarity.rebuild_similarity_index,
+    interval=settings.SIMILARITY_REBUILD_INTERVAL,
+    timeout=1800
+)
+scheduler.add_job(
+    "regenerate_sitemaps",
+    sitemap.regenerate_sitemaps,
+    interval=settings.SITEMAP_REGENERATE_INTERVAL,
+    timeout=900
+)
+# Recently viewed products are buffered per worker
+scheduler.add_job(
+    "flush_recently_viewed",
+    activity.flush_recently_viewed,
+    interval=settings.RECENTLY_VIEWED_FLUSH_INTERVAL,
+    timeout=60,
+    leader_only=False
+)
+scheduler.add_job(
+    "delete_expired_carts",
+    cart.delete_expired_carts,
+    interval=settings.CART_CLEANUP_INTERVAL,
+    timeout=600
+)
+scheduler.add_job(
+    "delete_old_webhook_events",
+    webhooks.delete_old_events,
+    interval=settings.WEBHOOK_CLEANUP_INTERVAL,
+    timeout=600
+)
+scheduler.add_job(
+    "deliver_webhooks",
+    webhooks.deliver_pending,
+    interval=settings.WEBHOOK_POLL_INTERVAL,
+    timeout=120,
+    jitter=0.2,
+    run_at_startup=True
+)
 
 
 @asynccontextmanager
@@ -15,8 +83,16 @@ async def lifespan(app: FastAPI):
     # Create tables on startup
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    await order_events.broker.start()
+    if settings.SCHEDULER_ENABLED:
+        await scheduler.start()
     yield
     # Cleanup on shutdown
+    await scheduler.stop()
+    await order_events.broker.stop()
+    await activity.flush_recently_viewed()
+    await webhooks.close_client()
+    images.shutdown_executor()
     await engine.dispose()
 
 
@@ -36,12 +112,56 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount static files
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# Opt-in per-request SQL profiler
+if settings.PROFILER_ENABLED:
+    profiler.instrument_engine(engine)
+    app.add_middleware(profiler.SQLProfilerMiddleware, engine=engine)
+
+# Response compression
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        content_types=settings.COMPRESSION_CONTENT_TYPES
+    )
+
+# Load shedding: bounded per-class queues, checkout and login served first
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(
+        AdmissionMiddleware,
+        controller=AdmissionController(settings.ADMISSION_CAPACITY, [
+            TrafficClass(
+                name,
+                limit=limit,
+                queue_size=settings.ADMISSION_QUEUE_SIZES[name],
+                timeout=settings.ADMISSION_QUEUE_TIMEOUTS[name]
+            )
+            for name, limit in settings.ADMISSION_LIMITS.items()
+        ]),
+        critical_paths=settings.ADMISSION_CRITICAL_PATHS,
+        browse_paths=settings.ADMISSION_BROWSE_PATHS,
+        retry_after=settings.ADMISSION_RETRY_AFTER
+    )
+
+# Request and DB timing metrics
+if settings.METRICS_ENABLED:
+    instrument_engine(engine)
+    app.add_middleware(MetricsMiddleware)
+
+# Mount static files (precompressed siblings come from compress_static.py)
+app.mount("/static", PrecompressedStaticFiles(directory="static"), name="static")
 
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
+# On-demand resized images
+app.include_router(media.router)
+
+# Sitemap index and shards
+app.include_router(sitemaps.router)
+
 
 @app.get("/")
 async def root():
@@ -53,6 +173,28 @@ async def health_check():
     return {"status": "healthy"}
 
 
+def _metrics_allowed(request: Request) -> bool:
+    if request.client and request.client.host in settings.METRICS_ALLOWED_HOSTS:
+        return True
+    if settings.METRICS_TOKEN:
+        expected = f"Bearer {settings.METRICS_TOKEN}"
+        return hmac.compare_digest(request.headers.get("authorization", "").encode(), expected.encode())
+    return False
+
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics(request: Request):
+        """Prometheus scrape endpoint
+
+        Every worker keeps its own registry, so under serve.py with several workers a
+        scrape returns the counters of whichever worker accepted the connection.
+        """
+        if not _metrics_allowed(request):
+            raise HTTPException(status_code=404)
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
@@ -0,0 +1,76 @@
+"""Indexes for the storefront, order history and review queries
+
+The tables themselves are created by the app on startup; create_all does not add
+indexes to tables that already exist, so existing databases get them here. Every
+statement is IF [NOT] EXISTS, so databases created after these indexes were added
+to the models pass through unchanged. On PostgreSQL the indexes are built
+CONCURRENTLY, without blocking writes to the live tables.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# name, table, columns, boolean columns that must be true (partial index)
+INDEXES = [
+    ("ix_products_active_created", "products", ["created_at DESC"], ("is_active",)),
+    ("ix_products_active_category_created", "products", ["category_id", "created_at DESC"], ("is_active",)),
+    ("ix_products_active_featured_created", "products", ["created_at DESC"], ("is_active", "is_featured")),
+    ("ix_product_images_product_sort", "product_images", ["product_id", "sort_order"], None),
+    ("ix_orders_user_created_at", "orders", ["user_id", "created_at DESC", "id DESC"], None),
+    ("ix_orders_created_at", "orders", ["created_at DESC"], None),
+    ("ix_order_items_order_id", "order_items", ["order_id"], None),
+    ("ix_order_items_product_id", "order_items", ["product_id"], None),
+    ("ix_reviews_product_user", "reviews", ["product_id", "user_id"], None),
+    ("ix_reviews_user_created", "reviews", ["user_id", "created_at"], None),
+    ("ix_reviews_product_approved_created", "reviews", ["product_id", "created_at DESC"], ("is_approved",)),
+    ("ix_users_created_at", "users", ["created_at"], None),
+]
+
+
+def _predicate(flags, dialect):
+    """Rendered like the models' ``column == True`` so SQLite matches it against the queries"""
+    true = "1" if dialect == "sqlite" else "true"
+    return sa.text(" AND ".join(f"{flag} = {true}" for flag in flags))
+
+
+def upgrade():
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+    tables = set(sa.inspect(bind).get_table_names())
+    indexed = set()
+    with op.get_context().autocommit_block():
+        for name, table, columns, flags in INDEXES:
+            if table not in tables:
+                # Created with all its indexes on the next app startup
+                continue
+            predicate = _predicate(flags, dialect) if flags else None
+            op.create_index(
+                name,
+                table,
+                [sa.text(column) for column in columns],
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                postgresql_where=predicate,
+                sqlite_where=predicate,
+            )
+            indexed.add(table)
+        if dialect == "postgresql":
+            # Fresh statistics for the partial index predicates
+            for table in sorted(indexed):
+                op.execute(f"ANALYZE {table}")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,65 @@
+"""Columns and indexes added to existing tables: image dimensions, trending scores, order discount codes, foreign keys
+
+create_all only creates missing tables, so databases from before these columns
+and indexes were added to the models need them here. Each column is added only
+when it is missing and every index is IF NOT EXISTS, so databases created since
+pass through unchanged.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+COLUMNS = [
+    ("product_images", sa.Column("width", sa.Integer())),
+    ("product_images", sa.Column("height", sa.Integer())),
+    ("product_images", sa.Column("variants", sa.JSON())),
+    ("products", sa.Column("trending_score", sa.Float(), nullable=False, server_default="0")),
+    ("orders", sa.Column("discount_code", sa.String(50))),
+]
+
+# name, table, columns
+INDEXES = [
+    # Backs sort=trending on the product listing
+    ("ix_products_active_trending", "products", ["is_active", "trending_score"]),
+    # Foreign keys that lookups, deletes and cascades filter on
+    ("ix_products_category_id", "products", ["category_id"]),
+    ("ix_product_similarities_similar_product_id", "product_similarities", ["similar_product_id"]),
+    ("ix_webhook_deliveries_event_id", "webhook_deliveries", ["event_id"]),
+    ("ix_webhook_deliveries_endpoint_id", "webhook_deliveries", ["endpoint_id"]),
+]
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    for table, column in COLUMNS:
+        if table not in tables:
+            # Created with all its columns on the next app startup
+            continue
+        if column.name not in {existing["name"] for existing in inspector.get_columns(table)}:
+            op.add_column(table, column)
+
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            if table in tables:
+                op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+    inspector = sa.inspect(op.get_bind())
+    for table, column in reversed(COLUMNS):
+        if column.name in {existing["name"] for existing in inspector.get_columns(table)}:
+            op.drop_column(table, column.name)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Casa Petrada Production Server
+
+Runs the API with several uvicorn workers on one socket, uvloop and httptools
+when installed, and a supervisor that replaces workers after
+SERVER_MAX_REQUESTS requests (with jitter) or when they crash. SIGTERM drains:
+workers stop accepting, close open event streams, finish in-flight requests
+within SERVER_GRACEFUL_TIMEOUT seconds and dispose their database pools.
+Defaults come from the SERVER_* settings; flags override them.
+
+    python serve.py
+    python serve.py --workers 4 --port 8080
+    python serve.py --workers 1 --max-requests 0   # single process, no recycling
+"""
+
+import argparse
+import os
+from pathlib import Path
+
+from app.core.config import settings
+from app.core.server import build_config, serve
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS, help="0 = one per CPU")
+    parser.add_argument("--loop", choices=("auto", "asyncio", "uvloop"), default=settings.SERVER_LOOP)
+    parser.add_argument("--http", choices=("auto", "h11", "httptools"), default=settings.SERVER_HTTP)
+    parser.add_argument("--backlog", type=int, default=settings.SERVER_BACKLOG)
+    parser.add_argument("--keep-alive", type=int, default=settings.SERVER_KEEPALIVE_TIMEOUT,
+                        help="Seconds an idle keep-alive connection stays open")
+    parser.add_argument("--limit-concurrency", type=int, default=settings.SERVER_LIMIT_CONCURRENCY,
+                        help="Connections per worker before answering 503")
+    parser.add_argument("--max-requests", type=int, default=settings.SERVER_MAX_REQUESTS,
+                        help="Recycle a worker after this many requests (0 = never)")
+    parser.add_argument("--max-requests-jitter", type=int, default=settings.SERVER_MAX_REQUESTS_JITTER)
+    parser.add_argument("--graceful-timeout", type=int, default=settings.SERVER_GRACEFUL_TIMEOUT,
+                        help="Seconds to finish in-flight requests on shutdown")
+    parser.add_argument("--access-log", action="store_true", default=settings.SERVER_ACCESS_LOG)
+    args = parser.parse_args()
+
+    # Workers import "main:app" relative to the backend directory
+    os.chdir(Path(__file__).parent)
+    config = build_config(
+        host=args.host,
+        port=args.port,
+        workers=args.workers or os.cpu_count() or 1,
+        loop=args.loop,
+        http=args.http,
+        backlog=args.backlog,
+        timeout_keep_alive=args.keep_alive,
+        limit_concurrency=args.limit_concurrency,
+        limit_max_requests=args.max_requests or None,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        access_log=args.access_log,
+    )
+    serve(config, max_requests_jitter=args.max_requests_jitter if args.max_requests else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Casa Petrada Webhook Receiver
+
+A local stand-in for a partner endpoint: verifies the signature of every
+delivery, prints the events and can fail a share of requests to exercise the
+retry path.
+
+    python webhook_receiver.py --secret whsec_... --port 9000
+    python webhook_receiver.py --secret whsec_... --fail-rate 0.3
+"""
+
+import argparse
+import json
+import random
+
+import uvicorn
+from fastapi import FastAPI, Request, Response
+
+from app.services.webhooks import SIGNATURE_HEADER, verify_signature
+
+
+def create_app(secret: str, fail_rate: float = 0.0) -> FastAPI:
+    app = FastAPI(title="Webhook receiver")
+
+    @app.post("/")
+    async def receive(request: Request):
+        body = await request.body()
+        if not verify_signature(secret, request.headers.get(SIGNATURE_HEADER, ""), body):
+            print("rejected: bad signature")
+            return Response(status_code=401)
+        if random.random() < fail_rate:
+            print("failing on purpose")
+            return Response(status_code=503)
+        for event in json.loads(body)["events"]:
+            print(f"{event['id']:>8} {event['type']:<24} {json.dumps(event['data'])}")
+        return Response(status_code=204)
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--secret", required=True, help="Signing secret returned when the endpoint was registered")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of requests answered with 503")
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.secret, args.fail_rate), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -163,6 +163,22 @@ class ApiService {
     return this.request(`/products/slug/${slug}`);
   }
 
+  // Hydrates cart, wishlist, comparison and recently viewed lists in one request (at most 100 products)
+  async getProductsBatch(params: { ids?: Array<string | number>; slugs?: string[] }): Promise<ApiResponse<{
+    products: any[];
+    missing_ids: number[];
+    missing_slugs: string[];
+  }>> {
+    const queryParams = new URLSearchParams();
+    if (params.ids?.length) {
+      queryParams.append('ids', params.ids.join(','));
+    }
+    if (params.slugs?.length) {
+      queryParams.append('slugs', params.slugs.join(','));
+    }
+    return this.request(`/products/batch?${queryParams.toString()}`);
+  }
+
   async getCategories(): Promise<ApiResponse<any[]>> {
     return this.request('/products/categories');
   }
@@ -238,8 +254,18 @@ class ApiService {
     });
   }
 
-  async getOrders(): Promise<ApiResponse<any[]>> {
-    return this.request('/orders');
+  // Newest first; pass the returned next_cursor back as cursor for the next page
+  async getOrders(params: { cursor?: string; limit?: number; view?: 'full' | 'summary' } = {}): Promise<ApiResponse<{
+    orders: any[];
+    next_cursor: string | null;
+  }>> {
+    const queryParams = new URLSearchParams();
+    Object.entries(params).forEach(([key, value]) => {
+      if (value !== undefined && value !== null) {
+        queryParams.append(key, value.toString());
+      }
+    });
+    return this.request(`/orders/?${queryParams.toString()}`);
   }
 
   async getOrder(orderId: string): Promise<ApiResponse<any>> {
@@ -149,6 +149,13 @@ export interface TrackingEvent {
   details?: string;
 }
 
+export interface OrderStatusEvent {
+  order_id: number;
+  order_number: string;
+  status: string;
+  previous_status?: string | null;
+}
+
 export interface OrderFilters {
   orderNumber?: string;
   customerId?: string;
@@ -750,6 +757,29 @@ class OrderTrackingService {
       };
     }
   }
+
+  // Subscribe to status changes of the customer's orders (Server-Sent Events instead of polling).
+  // The first event is a snapshot of open orders; "resync" means updates may have been missed.
+  subscribeToOrderUpdates(
+    accessToken: string,
+    onUpdate: (update: OrderStatusEvent) => void,
+    onResync?: () => void
+  ): () => void {
+    const source = new EventSource(
+      `${this.baseUrl}/api/v1/orders/events?token=${encodeURIComponent(accessToken)}`
+    );
+
+    source.addEventListener('snapshot', (event) => {
+      const orders: OrderStatusEvent[] = JSON.parse((event as MessageEvent).data).orders;
+      orders.forEach(onUpdate);
+    });
+    source.addEventListener('order.status', (event) => {
+      onUpdate(JSON.parse((event as MessageEvent).data));
+    });
+    source.addEventListener('resync', () => onResync?.());
+
+    return () => source.close();
+  }
 }
 
 export const orderTrackingService = new OrderTrackingService();
@@ -97,6 +97,15 @@ fi
 
 print_status "Backend dependencies installed successfully!"
 
+# Existing databases only get new indexes through migrations; a fresh one is created on startup
+print_status "Applying database migrations..."
+alembic upgrade head
+
+if [ $? -ne 0 ]; then
+    print_error "Database migration failed!"
+    exit 1
+fi
+
 # Step 4: Create systemd service for backend
 print_status "Creating systemd service for Casa Petrada backend..."
 
@@ -111,7 +120,10 @@ User=www-data
 Group=www-data
 WorkingDirectory=${PROJECT_ROOT}/backend
 Environment=PATH=${PROJECT_ROOT}/backend/venv/bin
-ExecStart=${PROJECT_ROOT}/backend/venv/bin/uvicorn main:app --host 0.0.0.0 --port ${BACKEND_PORT}
+ExecStart=${PROJECT_ROOT}/backend/venv/bin/python serve.py --port ${BACKEND_PORT}
+# SIGTERM only to the supervisor, which drains the workers; SIGKILL stragglers after the graceful timeout
+KillMode=mixed
+TimeoutStopSec=45
 Restart=always
 RestartSec=10
 